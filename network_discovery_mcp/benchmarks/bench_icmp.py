@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Microbenchmark: ICMP engine vs. per-host ``ping`` subprocesses.
+
+Sweeps loopback addresses (every 127.0.0.0/8 address answers echo requests)
+and reports hosts/sec for both liveness paths used by ``NetworkScanner``.
+
+    python benchmarks/bench_icmp.py --hosts 254 --rounds 3
+"""
+
+import argparse
+import asyncio
+import shutil
+import time
+
+from network_discovery_mcp.scanner import NetworkScanner, ProbeScheduler
+
+
+async def _sweep(ping, hosts: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    results = await asyncio.gather(*(ping(host, 1) for host in hosts))
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(1 for alive, _ in results if alive)
+
+
+async def run(host_count: int, rounds: int) -> None:
+    hosts = [f"127.0.{i // 254}.{i % 254 + 1}" for i in range(host_count)]
+    # Lift the probe scheduler's pacing so the liveness paths themselves are measured.
+    unthrottled = ProbeScheduler(rate=1e9, burst=host_count, initial_window=host_count, max_window=host_count)
+    scanner = NetworkScanner(scheduler=unthrottled)
+
+    paths = {"icmp-engine": scanner.ping_host}
+    if shutil.which("ping"):
+        paths["subprocess"] = scanner._ping_subprocess
+    else:
+        print("system ping not found, skipping subprocess path")
+
+    for name, ping in paths.items():
+        best = float("inf")
+        alive = 0
+        for _ in range(rounds):
+            elapsed, alive = await _sweep(ping, hosts)
+            best = min(best, elapsed)
+        engine = "raw" if scanner._icmp and scanner._icmp.raw else "datagram"
+        label = f"{name} ({engine})" if name == "icmp-engine" and scanner._icmp else name
+        print(f"{label:28s} {host_count / best:10.0f} hosts/sec  ({alive}/{host_count} alive, best of {rounds})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=254)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.hosts, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark: socket-level connect engine vs. ``asyncio.open_connection`` probes.
+
+Opens thousands of loopback listeners, then scans the whole port span on
+127.0.0.1 with both approaches and reports ports/sec.
+
+    python benchmarks/bench_portscan.py --listeners 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+from network_discovery_mcp.scanner import NetworkScanner, ProbeScheduler
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+async def _stream_scan(host: str, ports: list[int], concurrency: int) -> list[int]:
+    """The previous implementation: a full stream per probe."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def scan_port(port: int) -> int | None:
+        async with semaphore:
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=1.0)
+                writer.close()
+                await writer.wait_closed()
+                return port
+            except (asyncio.TimeoutError, OSError):
+                return None
+
+    results = await asyncio.gather(*(scan_port(port) for port in ports))
+    return [port for port in results if port is not None]
+
+
+async def run(listener_count: int, concurrency: int) -> None:
+    if resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    servers = []
+    for _ in range(listener_count):
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        servers.append(server)
+    listening = sorted(server.sockets[0].getsockname()[1] for server in servers)
+    ports = list(range(listening[0], listening[-1] + 1))
+    print(f"{listener_count} listeners spread over {len(ports)} ports")
+
+    scheduler = ProbeScheduler(rate=1e9, burst=concurrency, initial_window=concurrency, max_window=concurrency)
+    scanner = NetworkScanner(scheduler=scheduler, max_connections=concurrency, max_connections_per_host=concurrency)
+
+    try:
+        start = time.perf_counter()
+        found = await scanner.scan_common_ports("127.0.0.1", ports)
+        engine = time.perf_counter() - start
+        print(f"{'connect engine':18s} {len(ports) / engine:10.0f} ports/sec  ({len(found)} open)")
+
+        start = time.perf_counter()
+        found = await _stream_scan("127.0.0.1", ports, concurrency)
+        streams = time.perf_counter() - start
+        print(f"{'open_connection':18s} {len(ports) / streams:10.0f} ports/sec  ({len(found)} open)")
+    finally:
+        for server in servers:
+            server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--listeners", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    args = parser.parse_args()
+    asyncio.run(run(args.listeners, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
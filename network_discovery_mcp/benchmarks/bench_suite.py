@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite: sweeps, port scans, identification and MCP tool latency.
+
+Runs entirely against the loopback stand-in network in ``standins.py`` (no
+packets leave the machine) and writes the results as JSON, so runs on two
+commits can be compared:
+
+    python benchmarks/bench_suite.py                      # writes benchmarks/results/<commit>.json
+    python benchmarks/bench_suite.py --compare benchmarks/results/abc1234.json
+
+Throughputs are the best of ``--rounds``; latencies are percentiles over
+every call. ``--compare`` exits non-zero when a metric regressed by more
+than ``--threshold``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from mcp.types import CallToolRequest, CallToolRequestParams
+from standins import SERVICE_PORTS, StandInNetwork
+
+from network_discovery_mcp import server as server_module
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Metric name suffix -> whether a larger value is better
+_DIRECTIONS = {"_per_second": True, "_ms": False}
+# Latency changes smaller than this are timer noise, whatever their ratio
+_NOISE_FLOOR_MS = 1.0
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples: list[float]) -> dict[str, float]:
+    return {
+        "calls": len(samples),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+async def bench_sweep(network: StandInNetwork, rounds: int) -> dict[str, float]:
+    """hosts/sec for ``scan_network_range`` over the whole stand-in /24."""
+    best = float("inf")
+    found = 0
+    for _ in range(rounds):
+        # A fresh scanner each round: no RTT history, name or DNS cache carried over.
+        scanner = network.scanner()
+        try:
+            started = time.perf_counter()
+            found = len(await scanner.scan_network_range(str(network.network)))
+            best = min(best, time.perf_counter() - started)
+        finally:
+            scanner.resolver.close()
+            scanner.close()
+    hosts = network.network.num_addresses - 2
+    return {"hosts": hosts, "found": found, "seconds": round(best, 4), "hosts_per_second": round(hosts / best, 1)}
+
+
+async def bench_ports(network: StandInNetwork, rounds: int, port_count: int) -> dict[str, float]:
+    """ports/sec for ``scan_common_ports`` over a span of mostly closed ports on one host."""
+    host = network.first_host
+    ports = sorted(set(range(20000, 20000 + port_count)) | set(host.ports))
+    scanner = network.scanner(max_connections=512, max_connections_per_host=512)
+    best = float("inf")
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            found = await scanner.scan_common_ports(host.address, ports)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        scanner.resolver.close()
+        scanner.close()
+    return {
+        "ports": len(ports), "open": len(found), "seconds": round(best, 4),
+        "ports_per_second": round(len(ports) / best, 1),
+    }
+
+
+async def bench_identify(network: StandInNetwork, calls: int) -> dict[str, float]:
+    """Latency of ``identify_device_services`` for each stand-in host's open ports."""
+    scanner = network.scanner()
+    samples = []
+    try:
+        hosts = list(network.hosts.values())
+        for index in range(calls):
+            host = hosts[index % len(hosts)]
+            started = time.perf_counter()
+            await scanner.identify_device_services(host.address, host.ports)
+            samples.append(time.perf_counter() - started)
+    finally:
+        scanner.resolver.close()
+        scanner.close()
+    return latency_summary(samples)
+
+
+async def bench_tools(network: StandInNetwork, calls: int) -> dict[str, dict[str, float]]:
+    """End-to-end latency of every MCP tool, through ``handle_call_tool``."""
+    host = network.first_host.address
+    target = str(network.network)
+    tool_calls = {
+        "get_network_interfaces": {},
+        "ping_host": {"host": host},
+        "scan_network": {"network": target, "format": "compact"},
+        "rescan_network": {"network": target},
+        "get_device_details": {"ip_address": host},
+        "scan_device_ports": {"host": host, "port_range": ",".join(map(str, SERVICE_PORTS))},
+        # Loopback networks are never auto-discovered, so this measures the tool's fixed overhead.
+        "discover_local_network": {},
+    }
+    scanner = network.scanner()
+    original = server_module.scanner
+    server_module.scanner = scanner
+    results = {}
+    try:
+        for name, arguments in tool_calls.items():
+            request = CallToolRequest(
+                method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments)
+            )
+            samples = []
+            for _ in range(calls):
+                started = time.perf_counter()
+                result = await server_module.handle_call_tool(request)
+                samples.append(time.perf_counter() - started)
+                if result.content[0].text.startswith("Error executing"):
+                    raise RuntimeError(result.content[0].text)
+            results[name] = latency_summary(samples)
+    finally:
+        server_module.scanner = original
+        scanner.resolver.close()
+        scanner.close()
+    return results
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with StandInNetwork(alive=args.alive) as network:
+        benchmarks = {
+            "scan_network_range": await bench_sweep(network, args.rounds),
+            "scan_common_ports": await bench_ports(network, args.rounds, args.ports),
+            "identify_device_services": await bench_identify(network, args.calls),
+            "tools": await bench_tools(network, args.calls),
+        }
+    return {
+        "commit": _commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {"alive_hosts": args.alive, "ports": args.ports, "rounds": args.rounds, "calls": args.calls},
+        "benchmarks": benchmarks,
+    }
+
+
+def _metrics(results: dict, prefix: str = "") -> dict[str, float]:
+    """Flatten the benchmark tree into ``path -> value`` for the comparable metrics."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_metrics(value, f"{prefix}{key}."))
+        elif any(key.endswith(suffix) for suffix in _DIRECTIONS) and isinstance(value, int | float):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Print each metric against the baseline; return the names of those that regressed."""
+    before = _metrics(baseline["benchmarks"])
+    after = _metrics(current["benchmarks"])
+    regressed = []
+    print(f"{'metric':55s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        higher_is_better = next(better for suffix, better in _DIRECTIONS.items() if name.endswith(suffix))
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        if not higher_is_better and new - old < _NOISE_FLOOR_MS:
+            worse = 0.0
+        flag = "  REGRESSED" if worse > threshold else ""
+        if flag:
+            regressed.append(name)
+        print(f"{name:55s} {old:12.3f} {new:12.3f} {change:+8.1%}{flag}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--alive", type=int, default=64, help="stand-in hosts that answer (of a /24)")
+    parser.add_argument("--ports", type=int, default=2000, help="ports in the port scan span")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per throughput benchmark (best is kept)")
+    parser.add_argument("--calls", type=int, default=20, help="calls per latency benchmark")
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown reported as a regression (default: 0.2)")
+    args = parser.parse_args()
+    # The server logs every tool call at INFO.
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+    output = args.output or RESULTS_DIR / f"{results['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        regressed = compare(json.loads(args.compare.read_text()), results, args.threshold)
+        if regressed:
+            print(f"{len(regressed)} metrics regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+    else:
+        print(json.dumps(results["benchmarks"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
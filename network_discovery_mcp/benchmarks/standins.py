@@ -0,0 +1,197 @@
+"""Stand-in targets for offline benchmarks: a fake LAN on loopback addresses.
+
+Every address in 127.0.0.0/8 is local on Linux, so each stand-in host gets
+its own 127.x.y.z address with asyncio TCP listeners that speak real service
+banners. Liveness comes from a fake ICMP engine, names from a loopback DNS
+stand-in, and MAC addresses from a fixed neighbour table, so a benchmarked
+scanner never sends a packet off the machine.
+"""
+
+import asyncio
+import ipaddress
+import random
+import struct
+from dataclasses import dataclass, field
+
+from network_discovery_mcp.interfaces import NetworkInterface
+from network_discovery_mcp.names import MulticastNameResolver
+from network_discovery_mcp.resolver import CLASS_IN, TYPE_PTR, ReverseResolver, decode_name, encode_name
+from network_discovery_mcp.scanner import NetworkDevice, NetworkScanner, ProbeScheduler
+
+# Port -> what the service says when a client connects (or, for HTTP, after a request)
+BANNERS = {
+    2121: b"220 (vsFTPd 3.0.5)\r\n",
+    2222: b"SSH-2.0-OpenSSH_9.6p1 Ubuntu-3ubuntu13\r\n",
+    2525: b"220 mail.standin.lan ESMTP Postfix (Ubuntu)\r\n",
+    5900: b"RFB 003.008\n",
+}
+HTTP_PORT = 8080
+HTTP_RESPONSE = b"HTTP/1.1 200 OK\r\nServer: nginx/1.24.0\r\nContent-Length: 0\r\n\r\n"
+# Accepts connections but never speaks
+SILENT_PORT = 9999
+SERVICE_PORTS = sorted([*BANNERS, HTTP_PORT, SILENT_PORT])
+
+
+@dataclass
+class StandInHost:
+    address: str
+    mac_address: str
+    hostname: str
+    rtt: float
+    ports: list[int] = field(default_factory=list)
+
+
+class FakeIcmpEngine:
+    """Answers echo requests for the stand-in hosts after their RTT; everything else times out."""
+
+    raw = False
+
+    def __init__(self, hosts: dict[str, StandInHost]) -> None:
+        self.hosts = hosts
+        self.sent = 0
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    async def ping(self, host: str, timeout: float = 1.0) -> float | None:
+        self.sent += 1
+        target = self.hosts.get(host)
+        if target is None or target.rtt > timeout:
+            await asyncio.sleep(timeout)
+            return None
+        await asyncio.sleep(target.rtt)
+        return target.rtt
+
+
+class _DnsStandIn(asyncio.DatagramProtocol):
+    """Answers PTR queries for the stand-in hosts, NXDOMAIN for the rest."""
+
+    def __init__(self, names: dict[str, str]) -> None:
+        self.names = names
+        self.transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        query_id = struct.unpack_from("!H", data)[0]
+        name, end = decode_name(data, 12)
+        question = data[12:end + 4]
+        hostname = self.names.get(name)
+        if hostname is None:
+            self.transport.sendto(struct.pack("!HHHHHH", query_id, 0x8183, 1, 0, 0, 0) + question, addr)
+            return
+        rdata = encode_name(hostname)
+        answer = b"\xc0\x0c" + struct.pack("!HHIH", TYPE_PTR, CLASS_IN, 600, len(rdata)) + rdata
+        self.transport.sendto(struct.pack("!HHHHHH", query_id, 0x8180, 1, 1, 0, 0) + question + answer, addr)
+
+
+class _Silent(asyncio.DatagramProtocol):
+    """Swallows link-local name queries: the stand-in LAN has no mDNS/NetBIOS/LLMNR responders."""
+
+
+class StandInScanner(NetworkScanner):
+    """A ``NetworkScanner`` whose link layer is the stand-in network."""
+
+    def __init__(self, network: "StandInNetwork", **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.network = network
+        self._icmp = network.icmp
+
+    async def get_network_interfaces(self) -> list[NetworkInterface]:
+        return [self.network.interface]
+
+    async def resolve_mac_addresses(self, devices: list[NetworkDevice]) -> None:
+        # Stands in for the kernel neighbour table; never falls through to an ARP sweep.
+        for device in devices:
+            if not device.mac_address and device.ip_address in self.network.hosts:
+                device.mac_address = self.network.hosts[device.ip_address].mac_address
+
+
+class StandInNetwork:
+    """A /24 of loopback addresses, ``alive`` of which run the stand-in services.
+
+    Use as ``async with StandInNetwork(...) as network`` and build scanners
+    with ``network.scanner()``.
+    """
+
+    def __init__(self, network: str = "127.77.0.0/24", alive: int = 64, services_per_host: int = 3,
+                 seed: int = 1) -> None:
+        self.network = ipaddress.IPv4Network(network)
+        rng = random.Random(seed)
+        addresses = list(self.network.hosts())[:-1]
+        chosen = sorted(rng.sample(addresses, min(alive, len(addresses))))
+        self.hosts: dict[str, StandInHost] = {}
+        for index, address in enumerate(chosen):
+            self.hosts[str(address)] = StandInHost(
+                address=str(address),
+                mac_address=f"00:1b:21:{index >> 16 & 0xFF:02x}:{index >> 8 & 0xFF:02x}:{index & 0xFF:02x}",
+                hostname=f"host{index}.standin.lan",
+                rtt=rng.uniform(0.0002, 0.002),
+                ports=rng.sample(SERVICE_PORTS, min(services_per_host, len(SERVICE_PORTS))),
+            )
+        local = str(list(self.network.hosts())[-1])
+        self.interface = NetworkInterface(
+            name="standin0", ip_address=local, netmask=str(self.network.netmask), network=str(self.network)
+        )
+        self.icmp = FakeIcmpEngine(self.hosts)
+        self._servers: list[asyncio.base_events.Server] = []
+        self._transports: list[asyncio.DatagramTransport] = []
+        self.dns_port = 0
+        self.names_port = 0
+
+    @property
+    def first_host(self) -> StandInHost:
+        return next(iter(self.hosts.values()))
+
+    async def __aenter__(self) -> "StandInNetwork":
+        loop = asyncio.get_running_loop()
+        for host in self.hosts.values():
+            for port in host.ports:
+                self._servers.append(await asyncio.start_server(self._service(port), host.address, port))
+        names = {ipaddress.ip_address(h.address).reverse_pointer: h.hostname for h in self.hosts.values()}
+        dns, _ = await loop.create_datagram_endpoint(lambda: _DnsStandIn(names), local_addr=("127.0.0.1", 0))
+        silent, _ = await loop.create_datagram_endpoint(_Silent, local_addr=("127.0.0.1", 0))
+        self._transports += [dns, silent]
+        self.dns_port = dns.get_extra_info("sockname")[1]
+        self.names_port = silent.get_extra_info("sockname")[1]
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for server in self._servers:
+            server.close()
+        await asyncio.gather(*(server.wait_closed() for server in self._servers))
+        for transport in self._transports:
+            transport.close()
+
+    @staticmethod
+    def _service(port: int):
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            try:
+                if port in BANNERS:
+                    writer.write(BANNERS[port])
+                elif port == HTTP_PORT:
+                    await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5.0)
+                    writer.write(HTTP_RESPONSE)
+                else:
+                    await reader.read(1)
+                await writer.drain()
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                pass
+            finally:
+                writer.close()
+
+        return handle
+
+    def scanner(self, **kwargs) -> StandInScanner:
+        """A scanner wired to the stand-ins, with the probe pacing lifted unless ``scheduler`` is given."""
+        kwargs.setdefault("scheduler", ProbeScheduler(rate=1e6, burst=1024, initial_window=1024, max_window=4096))
+        kwargs.setdefault("resolver", ReverseResolver(nameservers=["127.0.0.1"], port=self.dns_port, timeout=0.2))
+        kwargs.setdefault("names", MulticastNameResolver(
+            window=0.02, mdns_address=("127.0.0.1", self.names_port), nbns_port=self.names_port,
+            llmnr_port=self.names_port,
+        ))
+        return StandInScanner(self, **kwargs)
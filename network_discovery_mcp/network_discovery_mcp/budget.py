@@ -0,0 +1,166 @@
+"""Time budgets for scans: stop at a deadline and keep what was found.
+
+A budget is set around any scanner call with ``with time_budget(30) as
+budget:``. Inside it, probe pools started with ``run_within`` are cancelled
+when the deadline passes, probe timeouts are clamped to the time left and
+loops stop taking new work, so the call returns promptly with what it has.
+``budget.exhausted`` then tells the caller that the result is partial.
+
+Like ``metrics.phase_breakdown``, the budget lives in a context variable and
+so reaches every task the call starts.
+"""
+
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator, Awaitable, Iterator
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class TimeBudget:
+    """A deadline shared by everything one call runs."""
+
+    def __init__(self, seconds: float | None, parent: "TimeBudget | None" = None) -> None:
+        self.seconds = seconds
+        self.parent = parent
+        expires = math.inf if seconds is None else time.monotonic() + max(0.0, seconds)
+        self.expires = min(expires, parent.expires) if parent is not None else expires
+        # Set once any work was skipped or cut short because time ran out
+        self.exhausted = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires
+
+    def exhaust(self) -> None:
+        """Mark this budget, and the budgets it is nested in, as cut short."""
+        budget: TimeBudget | None = self
+        while budget is not None:
+            budget.exhausted = True
+            budget = budget.parent
+
+
+_budget: ContextVar[TimeBudget | None] = ContextVar("time_budget", default=None)
+
+
+@contextmanager
+def time_budget(seconds: float | None = None) -> Iterator[TimeBudget]:
+    """Bound everything run in the block, and the tasks it starts, to ``seconds``.
+
+    Budgets nest: an inner block never outlives the one around it, and
+    ``seconds=None`` just inherits the outer deadline, which is handy to
+    learn whether one part of a call was cut short.
+    """
+    budget = TimeBudget(seconds, _budget.get())
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+@contextmanager
+def no_budget() -> Iterator[None]:
+    """Run the block, and the tasks it starts, outside any enclosing budget."""
+    token = _budget.set(None)
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+def current_budget() -> TimeBudget | None:
+    return _budget.get()
+
+
+def out_of_time() -> bool:
+    """True once the current budget has run out; the result is then marked partial.
+
+    Call it before starting each piece of work that can be skipped.
+    """
+    budget = _budget.get()
+    if budget is None or not budget.expired:
+        return False
+    budget.exhaust()
+    return True
+
+
+def clamp(timeout: float) -> float:
+    """``timeout``, shortened to the time left in the current budget."""
+    budget = _budget.get()
+    return timeout if budget is None else min(timeout, budget.remaining())
+
+
+def exhaust() -> None:
+    """Mark the current budget (if any) as cut short."""
+    budget = _budget.get()
+    if budget is not None:
+        budget.exhaust()
+
+
+async def run_within(*aws: Awaitable[Any]) -> None:
+    """Run ``aws`` concurrently until they finish or the current budget runs out.
+
+    Whatever is still running at the deadline is cancelled and awaited, so
+    its sockets and subprocesses are closed before this returns, and the
+    budget is marked exhausted. The first exception is raised once the
+    others are cancelled; if the caller is cancelled, so are the tasks.
+    Results stay with the tasks: have them record what they find as they go.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return
+    budget = _budget.get()
+    try:
+        done, pending = await asyncio.wait(
+            tasks,
+            timeout=budget.remaining() if budget is not None and budget.expires < math.inf else None,
+            return_when=asyncio.FIRST_EXCEPTION,
+        )
+    finally:
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            await asyncio.wait(unfinished)
+
+    for task in tasks:
+        if task in done and not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+    if pending and budget is not None:
+        budget.exhaust()
+
+
+async def iter_within(items: AsyncIterator[T]) -> AsyncIterator[T]:
+    """Yield from ``items`` until the current budget runs out, then close it."""
+    budget = _budget.get()
+    async with aclosing(items):
+        while True:
+            if budget is None or budget.expires == math.inf:
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    return
+            else:
+                step = asyncio.ensure_future(items.__anext__())
+                try:
+                    await asyncio.wait([step], timeout=budget.remaining())
+                finally:
+                    if not step.done():
+                        step.cancel()
+                        await asyncio.wait([step])
+                if step.cancelled():
+                    budget.exhaust()
+                    return
+                try:
+                    item = step.result()
+                except StopAsyncIteration:
+                    return
+            yield item
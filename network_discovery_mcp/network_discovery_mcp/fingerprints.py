@@ -0,0 +1,364 @@
+"""Service-probe fingerprint database in the spirit of nmap-service-probes.
+
+The database is a text file of ``Probe`` blocks, each with the ports it is
+meant for and the ``match``/``softmatch`` lines that recognise replies::
+
+    Probe TCP NULL q||
+    match SSH m|^SSH-([\\d.]+)-OpenSSH_([\\w.]+)| p/OpenSSH/ v/$2/ i/protocol $1/
+
+    Probe TCP GetRequest q|GET / HTTP/1.0\\r\\n\\r\\n|
+    ports 80,8000,8080
+    match HTTP m|^HTTP/1\\.[01] .*\\r\\nServer: nginx/([\\d.]+)|s p/nginx/ v/$1/
+
+Matches are indexed per probe by the first byte they can match, so a reply is
+only tested against the patterns that could possibly match it. The parsed
+database is pickled into the user cache directory keyed by the source file's
+size and mtime, so later processes skip parsing.
+"""
+
+import logging
+import os
+import pickle
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE = Path(__file__).parent / "data" / "service-probes"
+NULL_PROBE = "NULL"
+
+_CACHE_FORMAT = 1
+_ESCAPES = {"r": 13, "n": 10, "t": 9, "0": 0, "a": 7, "f": 12, "v": 11}
+# Regex escapes that stand for a class of bytes rather than a literal
+_CLASS_ESCAPES = set("dDwWsSbBAZzG123456789")
+_VERSION_FIELDS = {"p": "product", "v": "version", "i": "info", "o": "os", "d": "device_type"}
+
+
+@dataclass(frozen=True)
+class ServiceIdentity:
+    """A service recognised from a reply."""
+    service: str
+    product: str | None = None
+    version: str | None = None
+    info: str | None = None
+    soft: bool = False
+
+    def __str__(self) -> str:
+        details = " ".join(part for part in (self.product, self.version) if part)
+        if self.info:
+            details = f"{details}; {self.info}" if details else self.info
+        return f"{self.service} ({details})" if details else self.service
+
+
+@dataclass
+class ServiceMatch:
+    """One ``match``/``softmatch`` line."""
+    service: str
+    pattern: bytes
+    flags: int
+    templates: dict[str, str]
+    soft: bool = False
+    _compiled: re.Pattern[bytes] | None = field(default=None, repr=False, compare=False)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_compiled"] = None
+        return state
+
+    def search(self, data: bytes) -> ServiceIdentity | None:
+        """Return the identity described by this line if ``data`` matches it."""
+        if self._compiled is None:
+            # Compiled on first use and kept, so unused signatures cost nothing.
+            self._compiled = re.compile(self.pattern, self.flags)
+        found = self._compiled.search(data)
+        if found is None:
+            return None
+
+        groups = found.groups()
+
+        def substitute(reference: re.Match[str]) -> str:
+            index = int(reference.group(1))
+            value = groups[index - 1] if 0 < index <= len(groups) else None
+            return (value or b"").decode("latin-1")
+
+        def fill(template: str | None) -> str | None:
+            if template is None:
+                return None
+            return re.sub(r"\$(\d)", substitute, template).strip() or None
+
+        return ServiceIdentity(
+            service=self.service,
+            product=fill(self.templates.get("product")),
+            version=fill(self.templates.get("version")),
+            info=fill(self.templates.get("info")),
+            soft=self.soft,
+        )
+
+
+@dataclass
+class ServiceProbe:
+    """A probe payload with the matches that recognise its replies."""
+    name: str
+    protocol: str
+    payload: bytes
+    ports: frozenset[int] = frozenset()
+    rarity: int = 5
+    matches: list[ServiceMatch] = field(default_factory=list)
+    # first byte -> positions in ``matches``; ``_anywhere`` holds patterns
+    # whose first byte is not a fixed literal.
+    _by_first_byte: dict[int, list[int]] = field(default_factory=dict, repr=False)
+    _anywhere: list[int] = field(default_factory=list, repr=False)
+
+    def add_match(self, match: ServiceMatch) -> None:
+        position = len(self.matches)
+        self.matches.append(match)
+        first = _first_bytes(match.pattern.decode("latin-1"), match.flags)
+        if first is None:
+            self._anywhere.append(position)
+        else:
+            for byte in first:
+                self._by_first_byte.setdefault(byte, []).append(position)
+
+    def candidates(self, data: bytes) -> Iterator[ServiceMatch]:
+        """Yield, in file order, only the matches that could apply to ``data``."""
+        indexed = self._by_first_byte.get(data[0], []) if data else []
+        if not indexed:
+            positions: list[int] = self._anywhere
+        elif not self._anywhere:
+            positions = indexed
+        else:
+            positions = sorted(indexed + self._anywhere)
+        for position in positions:
+            yield self.matches[position]
+
+    def match(self, data: bytes) -> ServiceIdentity | None:
+        """Return the first hard match, else the first soft match, for ``data``."""
+        soft = None
+        for candidate in self.candidates(data):
+            identity = candidate.search(data)
+            if identity is None:
+                continue
+            if not identity.soft:
+                return identity
+            soft = soft or identity
+        return soft
+
+
+class ServiceProbeDatabase:
+    """Parsed probe/match database."""
+
+    def __init__(self, probes: list[ServiceProbe]) -> None:
+        self.probes = probes
+        self._by_name = {probe.name: probe for probe in probes}
+
+    def __len__(self) -> int:
+        return sum(len(probe.matches) for probe in self.probes)
+
+    def probe(self, name: str) -> ServiceProbe | None:
+        return self._by_name.get(name)
+
+    def match(self, data: bytes, probe_name: str = NULL_PROBE) -> ServiceIdentity | None:
+        """Match a reply received for ``probe_name`` (a bare banner by default)."""
+        probe = self._by_name.get(probe_name)
+        if probe is None or not data:
+            return None
+        return probe.match(data)
+
+    def probes_for_port(self, port: int) -> list[ServiceProbe]:
+        """Payload probes hinted for ``port``, most common first."""
+        hinted = [probe for probe in self.probes if probe.payload and port in probe.ports]
+        return sorted(hinted, key=lambda probe: probe.rarity)
+
+    @classmethod
+    def parse(cls, text: str) -> "ServiceProbeDatabase":
+        """Parse database text.
+
+        Raises:
+            ValueError: On a malformed line (with its line number).
+        """
+        probes: list[ServiceProbe] = []
+        current: ServiceProbe | None = None
+
+        for number, raw in enumerate(text.splitlines(), start=1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            directive, _, rest = line.partition(" ")
+            try:
+                if directive == "Probe":
+                    protocol, name, payload = rest.split(" ", 2)
+                    if not payload.startswith("q"):
+                        raise ValueError("probe payload must be q|...|")
+                    body, _ = _delimited(payload[1:])
+                    current = ServiceProbe(name=name, protocol=protocol.upper(), payload=_unescape(body))
+                    probes.append(current)
+                elif current is None:
+                    raise ValueError(f"{directive} before any Probe")
+                elif directive == "ports":
+                    current.ports = frozenset(_parse_ports(rest))
+                elif directive == "rarity":
+                    current.rarity = int(rest)
+                elif directive in ("match", "softmatch"):
+                    current.add_match(_parse_match(rest, soft=directive == "softmatch"))
+                else:
+                    logger.debug(f"Ignoring unsupported directive on line {number}: {directive}")
+            except (ValueError, re.error) as e:
+                raise ValueError(f"line {number}: {e}") from e
+
+        return cls(probes)
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_DATABASE, cache_dir: Path | None = None) -> "ServiceProbeDatabase":
+        """Load a database, reusing the serialized copy when the source is unchanged."""
+        stat = path.stat()
+        cache_dir = cache_dir if cache_dir is not None else _default_cache_dir()
+        cache_file = cache_dir / f"{path.name}.{_CACHE_FORMAT}.{stat.st_size}.{stat.st_mtime_ns}.pickle"
+
+        try:
+            with open(cache_file, "rb") as f:
+                database = pickle.load(f)
+            if isinstance(database, cls):
+                return database
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+        database = cls.parse(path.read_text(encoding="utf-8"))
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            for stale in cache_dir.glob(f"{path.name}.*.pickle"):
+                stale.unlink(missing_ok=True)
+            temporary = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary, "wb") as f:
+                pickle.dump(database, f, protocol=pickle.HIGHEST_PROTOCOL)
+            temporary.replace(cache_file)
+        except OSError as e:
+            logger.debug(f"Cannot cache service probe database in {cache_dir}: {e}")
+        return database
+
+
+@lru_cache(maxsize=1)
+def load_default_database() -> ServiceProbeDatabase:
+    """The bundled database, loaded once per process."""
+    return ServiceProbeDatabase.load()
+
+
+def _default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "network-discovery-mcp"
+
+
+def _delimited(text: str) -> tuple[str, str]:
+    """Split ``|body|rest`` on its delimiter (the first character)."""
+    if len(text) < 2:
+        raise ValueError(f"unterminated field: {text!r}")
+    delimiter = text[0]
+    end = text.find(delimiter, 1)
+    if end < 0:
+        raise ValueError(f"unterminated field: {text!r}")
+    return text[1:end], text[end + 1:]
+
+
+def _unescape(text: str) -> bytes:
+    """Decode the C-style escapes used in probe payloads."""
+    out = bytearray()
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            escaped = text[i + 1]
+            if escaped == "x" and i + 4 <= len(text):
+                out.append(int(text[i + 2:i + 4], 16))
+                i += 4
+                continue
+            out.append(_ESCAPES.get(escaped, ord(escaped)))
+            i += 2
+            continue
+        out.append(ord(char))
+        i += 1
+    return bytes(out)
+
+
+def _parse_ports(text: str) -> set[int]:
+    ports: set[int] = set()
+    for part in text.split(","):
+        low, _, high = part.strip().partition("-")
+        ports.update(range(int(low), int(high or low) + 1))
+    return ports
+
+
+def _parse_match(text: str, soft: bool) -> ServiceMatch:
+    service, _, rest = text.partition(" ")
+    if not rest.startswith("m"):
+        raise ValueError("match pattern must be m|...|")
+    pattern, rest = _delimited(rest[1:])
+
+    flags = 0
+    while rest and rest[0] in "is":
+        flags |= re.IGNORECASE if rest[0] == "i" else re.DOTALL
+        rest = rest[1:]
+
+    templates: dict[str, str] = {}
+    rest = rest.strip()
+    while rest:
+        key = rest[0]
+        value, rest = _delimited(rest[1:])
+        if key in _VERSION_FIELDS:
+            templates[_VERSION_FIELDS[key]] = value
+        rest = rest.strip()
+
+    encoded = pattern.encode("latin-1")
+    re.compile(encoded, flags)  # validate now rather than at match time
+    return ServiceMatch(service=service, pattern=encoded, flags=flags, templates=templates, soft=soft)
+
+
+def _first_bytes(pattern: str, flags: int) -> set[int] | None:
+    """The bytes a match must start with, or None if that isn't a fixed literal."""
+    if not pattern.startswith("^") or _has_top_level_alternation(pattern):
+        return None
+
+    rest = pattern[1:]
+    if not rest:
+        return None
+    if rest[0] == "\\":
+        if len(rest) < 2 or rest[1] in _CLASS_ESCAPES:
+            return None
+        if rest[1] == "x":
+            byte, length = int(rest[2:4], 16), 4
+        else:
+            byte, length = _ESCAPES.get(rest[1], ord(rest[1])), 2
+    elif rest[0] in ".[(|?*+{)$":
+        return None
+    else:
+        byte, length = ord(rest[0]), 1
+
+    # An optional first element does not pin the first byte.
+    if rest[length:length + 1] in ("?", "*", "{"):
+        return None
+    if flags & re.IGNORECASE and chr(byte).isalpha():
+        return {ord(chr(byte).lower()), ord(chr(byte).upper())}
+    return {byte}
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
@@ -0,0 +1,208 @@
+"""Asyncio ICMP echo engine that multiplexes probes over one shared socket."""
+
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+import struct
+import time
+
+logger = logging.getLogger(__name__)
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+_HEADER = struct.Struct("!BBHHH")
+_PAYLOAD = b"network-discovery-mcp"
+# Large sweeps put hundreds of replies in flight at once; the default receive
+# buffer overflows well before a /24 has answered.
+_RECEIVE_BUFFER = 4 * 1024 * 1024
+
+
+def icmp_checksum(data: bytes) -> int:
+    """Compute the RFC 1071 internet checksum of ``data``."""
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(identifier: int, sequence: int, payload: bytes = _PAYLOAD) -> bytes:
+    """Build an ICMP echo request packet with a valid checksum."""
+    header = _HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    checksum = icmp_checksum(header + payload)
+    return _HEADER.pack(ICMP_ECHO_REQUEST, 0, checksum, identifier, sequence) + payload
+
+
+def parse_echo_reply(packet: bytes, has_ip_header: bool) -> tuple[int, int] | None:
+    """Return ``(identifier, sequence)`` for an echo reply, or None for anything else.
+
+    Raw sockets deliver the IPv4 header in front of the ICMP message, the
+    unprivileged datagram socket does not.
+    """
+    offset = 0
+    if has_ip_header:
+        if not packet:
+            return None
+        offset = (packet[0] & 0x0F) * 4
+    if len(packet) < offset + _HEADER.size:
+        return None
+    icmp_type, code, _, identifier, sequence = _HEADER.unpack_from(packet, offset)
+    if icmp_type != ICMP_ECHO_REPLY or code != 0:
+        return None
+    return identifier, sequence
+
+
+class IcmpEngine:
+    """Send and receive ICMP echo requests for many hosts over a single socket.
+
+    A raw socket is used when the process is allowed to open one; otherwise the
+    unprivileged ``SOCK_DGRAM``/``IPPROTO_ICMP`` ping socket is used. Replies are
+    matched to outstanding probes by identifier and sequence number and the RTT
+    is measured from the moment the request was handed to the kernel.
+    """
+
+    def __init__(self) -> None:
+        self._sock: socket.socket | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._raw = False
+        self._identifier = 0
+        self._sequence = random.getrandbits(16)
+        self._pending: dict[tuple[int, int], tuple[asyncio.Future[float], float, str]] = {}
+
+    @property
+    def raw(self) -> bool:
+        """Whether the engine is using a privileged raw socket."""
+        return self._raw
+
+    @property
+    def is_open(self) -> bool:
+        return self._sock is not None
+
+    def open(self) -> None:
+        """Open the shared socket on the running loop.
+
+        Raises:
+            OSError: If neither a raw nor an unprivileged ICMP socket can be opened.
+        """
+        loop = asyncio.get_running_loop()
+        if self._sock is not None and self._loop is loop:
+            return
+        self.close()
+
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self._raw = True
+            self._identifier = random.getrandbits(16)
+        except PermissionError:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            self._raw = False
+            # The kernel rewrites the identifier of ping sockets to the bound "port".
+            sock.bind(("0.0.0.0", 0))
+            self._identifier = sock.getsockname()[1]
+
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RECEIVE_BUFFER)
+        except OSError:
+            pass
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop = loop
+        loop.add_reader(sock.fileno(), self._on_readable)
+        logger.debug(f"ICMP engine opened ({'raw' if self._raw else 'datagram'} socket)")
+
+    def close(self) -> None:
+        """Close the socket and fail any outstanding probes."""
+        if self._sock is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        self._loop = None
+        for future, _, _ in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    async def ping(self, host: str, timeout: float = 1.0) -> float | None:
+        """Send one echo request and return the RTT in seconds, or None on timeout."""
+        self.open()
+        assert self._sock is not None and self._loop is not None
+
+        address = await self._resolve(host)
+        if address is None:
+            return None
+
+        key = self._next_key()
+        future: asyncio.Future[float] = self._loop.create_future()
+        packet = build_echo_request(self._identifier, key[1])
+
+        try:
+            self._pending[key] = (future, time.perf_counter(), address)
+            await self._sendto(packet, address)
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, OSError) as e:
+            if isinstance(e, OSError):
+                logger.debug(f"ICMP echo to {host} failed: {e}")
+            return None
+        finally:
+            self._pending.pop(key, None)
+
+    def _next_key(self) -> tuple[int, int]:
+        for _ in range(0x10000):
+            self._sequence = (self._sequence + 1) & 0xFFFF
+            key = (self._identifier, self._sequence)
+            if key not in self._pending:
+                return key
+        raise OSError("ICMP sequence space exhausted")
+
+    async def _resolve(self, host: str) -> str | None:
+        try:
+            return str(ipaddress.IPv4Address(host))
+        except ValueError:
+            pass
+        assert self._loop is not None
+        try:
+            infos = await self._loop.getaddrinfo(host, None, family=socket.AF_INET)
+        except socket.gaierror:
+            return None
+        return infos[0][4][0] if infos else None
+
+    async def _sendto(self, packet: bytes, address: str) -> None:
+        assert self._sock is not None
+        while True:
+            try:
+                self._sock.sendto(packet, (address, 0))
+                return
+            except BlockingIOError:
+                await asyncio.sleep(0.001)
+
+    def _on_readable(self) -> None:
+        """Drain every queued datagram and resolve the matching probes."""
+        sock = self._sock
+        while sock is not None:
+            try:
+                packet, (source, _) = sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.debug(f"ICMP receive failed: {e}")
+                return
+
+            received = time.perf_counter()
+            key = parse_echo_reply(packet, has_ip_header=self._raw)
+            if key is None:
+                continue
+            if not self._raw:
+                # Ping sockets only ever see their own replies.
+                key = (self._identifier, key[1])
+            entry = self._pending.get(key)
+            if entry is None:
+                continue
+            future, sent, address = entry
+            if source == address and not future.done():
+                future.set_result(received - sent)
@@ -0,0 +1,211 @@
+"""Cached snapshot of local interfaces and routes, invalidated by rtnetlink events."""
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from . import netlink
+
+logger = logging.getLogger(__name__)
+
+# Snapshot lifetime when change notifications are unavailable (seconds)
+SNAPSHOT_TTL = 30.0
+
+_WATCH_GROUPS = (
+    netlink.RTMGRP_LINK
+    | netlink.RTMGRP_IPV4_IFADDR
+    | netlink.RTMGRP_IPV4_ROUTE
+    | netlink.RTMGRP_IPV6_IFADDR
+    | netlink.RTMGRP_IPV6_ROUTE
+)
+_CHANGE_TYPES = {
+    netlink.RTM_NEWLINK,
+    netlink.RTM_DELLINK,
+    netlink.RTM_NEWADDR,
+    netlink.RTM_DELADDR,
+    netlink.RTM_NEWROUTE,
+    netlink.RTM_DELROUTE,
+}
+
+
+@dataclass
+class NetworkInterface:
+    """Represents a network interface."""
+    name: str
+    ip_address: str
+    netmask: str
+    network: str
+    gateway: str | None = None
+    mac_address: str | None = None
+    is_up: bool = True
+
+
+@dataclass
+class InterfaceSnapshot:
+    """Interfaces and the routing table's gateways at one point in time."""
+    interfaces: list[NetworkInterface]
+    gateways: dict[Any, Any] = field(default_factory=dict)
+
+
+def _ipv6_network(address: str, netmask: str) -> ipaddress.IPv6Network:
+    """netifaces reports IPv6 masks as ``ffff:ffff:ffff:ffff::/64``; older versions omit the length."""
+    _, slash, prefix = netmask.rpartition("/")
+    if not slash:
+        prefix = str(bin(int(ipaddress.IPv6Address(netmask))).count("1"))
+    return ipaddress.IPv6Network(f"{address.partition('%')[0]}/{prefix}", strict=False)
+
+
+def read_snapshot(netifaces: Any) -> InterfaceSnapshot:
+    """Enumerate IPv4 and IPv6 interfaces through ``netifaces``, reading the gateways once.
+
+    Loopback addresses are left out. IPv6 link-local addresses keep their
+    ``%interface`` scope.
+    """
+    gateways = netifaces.gateways()
+    af_inet6 = getattr(netifaces, "AF_INET6", None)
+    default_gateways = {}
+    for family in (netifaces.AF_INET, af_inet6):
+        if family is not None and family in gateways.get('default', {}):
+            default_gateways[family] = gateways['default'][family][0]
+
+    interfaces = []
+    for interface_name in netifaces.interfaces():
+        interface_info = netifaces.ifaddresses(interface_name)
+
+        mac_addr = None
+        if netifaces.AF_LINK in interface_info:
+            mac_addr = interface_info[netifaces.AF_LINK][0].get('addr')
+
+        for addr_info in interface_info.get(netifaces.AF_INET, []):
+            ip_addr = addr_info.get('addr')
+            netmask = addr_info.get('netmask')
+            if not ip_addr or not netmask or ip_addr.startswith('127.'):
+                continue
+            network = ipaddress.IPv4Network(f"{ip_addr}/{netmask}", strict=False)
+            interfaces.append(NetworkInterface(
+                name=interface_name,
+                ip_address=ip_addr,
+                netmask=netmask,
+                network=str(network),
+                gateway=default_gateways.get(netifaces.AF_INET),
+                mac_address=mac_addr
+            ))
+
+        for addr_info in interface_info.get(af_inet6, []):
+            ip_addr = addr_info.get('addr')
+            netmask = addr_info.get('netmask')
+            if not ip_addr or not netmask:
+                continue
+            network = _ipv6_network(ip_addr, netmask)
+            if network.network_address.is_loopback:
+                continue
+            interfaces.append(NetworkInterface(
+                name=interface_name,
+                ip_address=ip_addr,
+                netmask=netmask,
+                network=str(network),
+                gateway=default_gateways.get(af_inet6),
+                mac_address=mac_addr
+            ))
+
+    return InterfaceSnapshot(interfaces, gateways)
+
+
+def is_change_event(data: bytes) -> bool:
+    """Whether a netlink datagram reports a link, address or route change."""
+    return any(msg_type in _CHANGE_TYPES for msg_type, _ in netlink.iter_messages(data))
+
+
+class InterfaceCache:
+    """Holds one interface snapshot until the system's interfaces change.
+
+    On Linux, the first lookup inside a running event loop subscribes to
+    rtnetlink link/address/route notifications and any such event drops the
+    snapshot. Elsewhere (or if the subscription fails) the snapshot expires
+    after ``ttl`` seconds.
+    """
+
+    def __init__(
+        self, loader: Callable[[], InterfaceSnapshot], ttl: float = SNAPSHOT_TTL, subscribe: bool = True
+    ) -> None:
+        self.loader = loader
+        self.ttl = ttl
+        self.loads = 0
+        self._snapshot: InterfaceSnapshot | None = None
+        self._loaded = 0.0
+        self._sock: socket.socket | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscribe = subscribe
+
+    @property
+    def watching(self) -> bool:
+        return self._sock is not None
+
+    def get(self) -> InterfaceSnapshot:
+        """The current snapshot, loading a new one if there is none or it has expired."""
+        if self._subscribe:
+            self._start_watching()
+        now = time.monotonic()
+        if self._snapshot is None or (not self.watching and now - self._loaded > self.ttl):
+            self._snapshot = self.loader()
+            self._loaded = now
+            self.loads += 1
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    def watch(self, sock: socket.socket) -> None:
+        """Invalidate on change events read from ``sock`` (a subscribed netlink socket)."""
+        loop = asyncio.get_running_loop()
+        self.close()
+        sock.setblocking(False)
+        loop.add_reader(sock.fileno(), self._on_readable)
+        self._sock = sock
+        self._loop = loop
+        # Anything may have changed while nobody was listening.
+        self.invalidate()
+
+    def close(self) -> None:
+        if self._sock is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        self._loop = None
+
+    def _start_watching(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is loop:
+            return
+        try:
+            self.watch(netlink.subscribe(_WATCH_GROUPS))
+            logger.debug("Watching rtnetlink for interface changes")
+        except OSError as e:
+            logger.debug(f"Interface change notifications unavailable, using a {self.ttl:.0f}s TTL: {e}")
+            self._subscribe = False
+
+    def _on_readable(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(65536)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                # ENOBUFS: events were dropped, so assume something changed.
+                logger.debug(f"Interface notification socket error: {e}")
+                self.invalidate()
+                return
+            if not data:
+                return
+            if is_change_event(data):
+                self.invalidate()
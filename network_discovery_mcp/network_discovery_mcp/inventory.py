@@ -0,0 +1,175 @@
+"""Persistent device inventory backed by SQLite."""
+
+import ipaddress
+import json
+import logging
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator, MutableMapping
+from contextlib import contextmanager
+from dataclasses import fields
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .scanner import NetworkDevice
+
+logger = logging.getLogger(__name__)
+
+# Devices not seen for this long are dropped (seconds)
+DEFAULT_RETENTION = 7 * 24 * 3600
+DEFAULT_MAX_DEVICES = 65536
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    ip TEXT PRIMARY KEY,
+    ip_key BLOB NOT NULL,
+    mac TEXT,
+    last_seen REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS devices_ip_key ON devices (ip_key);
+CREATE INDEX IF NOT EXISTS devices_mac ON devices (mac);
+CREATE INDEX IF NOT EXISTS devices_last_seen ON devices (last_seen);
+"""
+
+
+class DeviceInventory(MutableMapping[str, "NetworkDevice"]):
+    """Mapping of IP address to ``NetworkDevice`` stored in SQLite.
+
+    Rows are read straight from the database, so a server restarted on an
+    existing file answers lookups immediately without loading everything
+    first. Addresses are also stored in packed form, so any subnet is a range
+    scan on an index rather than a full table walk.
+
+    Values are copies: a device changed after it was read must be stored
+    again to persist the change.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        retention: float | None = DEFAULT_RETENTION,
+        max_devices: int | None = DEFAULT_MAX_DEVICES,
+    ) -> None:
+        self.path = path
+        self.retention = retention
+        self.max_devices = max_devices
+        self._db = sqlite3.connect(path, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.prune()
+
+    def __getitem__(self, ip_address: str) -> "NetworkDevice":
+        row = self._db.execute("SELECT data FROM devices WHERE ip = ?", (ip_address,)).fetchone()
+        if row is None:
+            raise KeyError(ip_address)
+        return _decode(row[0])
+
+    def __setitem__(self, ip_address: str, device: "NetworkDevice") -> None:
+        with self._transaction():
+            self._write(ip_address, device)
+        self.prune()
+
+    def __delitem__(self, ip_address: str) -> None:
+        cursor = self._db.execute("DELETE FROM devices WHERE ip = ?", (ip_address,))
+        if cursor.rowcount == 0:
+            raise KeyError(ip_address)
+
+    def __contains__(self, ip_address: object) -> bool:
+        return self._db.execute("SELECT 1 FROM devices WHERE ip = ?", (ip_address,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (ip_address,) in self._db.execute("SELECT ip FROM devices ORDER BY ip_key").fetchall():
+            yield ip_address
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM devices").fetchone()[0]
+
+    def put_many(self, devices: Iterable["NetworkDevice"]) -> None:
+        """Store a batch of devices in a single transaction."""
+        with self._transaction():
+            for device in devices:
+                self._write(device.ip_address, device)
+        self.prune()
+
+    def by_mac(self, mac_address: str) -> list["NetworkDevice"]:
+        """Devices last seen with ``mac_address``."""
+        rows = self._db.execute("SELECT data FROM devices WHERE mac = ?", (mac_address.lower(),))
+        return [_decode(data) for (data,) in rows.fetchall()]
+
+    def in_network(self, network: str) -> list["NetworkDevice"]:
+        """Devices whose address falls inside ``network`` (CIDR), in address order."""
+        net = ipaddress.ip_network(network, strict=False)
+        rows = self._db.execute(
+            "SELECT data FROM devices WHERE ip_key BETWEEN ? AND ? AND length(ip_key) = ? ORDER BY ip_key",
+            (net.network_address.packed, net.broadcast_address.packed, len(net.network_address.packed)),
+        )
+        return [_decode(data) for (data,) in rows.fetchall()]
+
+    def seen_since(self, timestamp: float) -> list["NetworkDevice"]:
+        """Devices seen at or after ``timestamp``, most recent first."""
+        rows = self._db.execute(
+            "SELECT data FROM devices WHERE last_seen >= ? ORDER BY last_seen DESC", (timestamp,)
+        )
+        return [_decode(data) for (data,) in rows.fetchall()]
+
+    def prune(self) -> int:
+        """Apply the retention and size limits; returns the number of devices evicted."""
+        evicted = 0
+        with self._transaction():
+            if self.retention is not None:
+                cursor = self._db.execute(
+                    "DELETE FROM devices WHERE last_seen < ?", (time.time() - self.retention,)
+                )
+                evicted += cursor.rowcount
+            if self.max_devices is not None:
+                # Least recently seen go first.
+                cursor = self._db.execute(
+                    "DELETE FROM devices WHERE ip IN ("
+                    "SELECT ip FROM devices ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+                    (self.max_devices,),
+                )
+                evicted += cursor.rowcount
+        if evicted:
+            logger.debug(f"Evicted {evicted} devices from inventory {self.path}")
+        return evicted
+
+    def close(self) -> None:
+        self._db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # The connection runs in autocommit mode; writes are grouped explicitly.
+        self._db.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _write(self, ip_address: str, device: "NetworkDevice") -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO devices (ip, ip_key, mac, last_seen, data) VALUES (?, ?, ?, ?, ?)",
+            (
+                ip_address,
+                ipaddress.ip_address(ip_address).packed,
+                device.mac_address.lower() if device.mac_address else None,
+                device.last_seen or time.time(),
+                json.dumps(device.to_dict(), separators=(",", ":")),
+            ),
+        )
+
+
+def _decode(data: str) -> "NetworkDevice":
+    from .scanner import NetworkDevice
+
+    values = json.loads(data)
+    known = {f.name for f in fields(NetworkDevice)}
+    values = {key: value for key, value in values.items() if key in known}
+    if values.get("services"):
+        # JSON object keys are strings; ports are ints everywhere else.
+        values["services"] = {int(port): name for port, name in values["services"].items()}
+    return NetworkDevice(**values)
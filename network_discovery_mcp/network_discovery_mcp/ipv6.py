@@ -0,0 +1,203 @@
+"""IPv6 host discovery: all-nodes echo and Neighbor Discovery (NDP) listening.
+
+An IPv6 /64 cannot be swept address by address, so hosts are found by
+sending one echo request to the all-nodes multicast group and collecting
+everything that answers or announces itself through NDP while we listen.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+import struct
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+ICMPV6_ECHO_REQUEST = 128
+ICMPV6_ECHO_REPLY = 129
+ND_ROUTER_ADVERT = 134
+ND_NEIGHBOR_SOLICIT = 135
+ND_NEIGHBOR_ADVERT = 136
+
+ND_OPT_SOURCE_LINKADDR = 1
+ND_OPT_TARGET_LINKADDR = 2
+
+ALL_NODES = "ff02::1"
+
+# How long to listen for replies and NDP traffic after the echo (seconds)
+LISTEN_TIME = 2.0
+
+_HEADER = struct.Struct("!BBHHH")
+_PAYLOAD = b"network-discovery-mcp"
+# Offset of the options in each NDP message type (RFC 4861 section 4)
+_OPTIONS_OFFSET = {ND_ROUTER_ADVERT: 16, ND_NEIGHBOR_SOLICIT: 24, ND_NEIGHBOR_ADVERT: 24}
+_RECEIVE_BUFFER = 1024 * 1024
+
+
+@dataclass
+class Ipv6Neighbour:
+    """An IPv6 address seen on a link, with its MAC if NDP revealed it."""
+    address: str
+    mac_address: str | None = None
+    response_time: float | None = None
+
+
+def build_echo_request_v6(identifier: int, sequence: int, payload: bytes = _PAYLOAD) -> bytes:
+    """Build an ICMPv6 echo request.
+
+    The checksum is left at zero: it covers an IPv6 pseudo-header, so the
+    kernel fills it in for both raw and ping sockets.
+    """
+    return _HEADER.pack(ICMPV6_ECHO_REQUEST, 0, 0, identifier, sequence) + payload
+
+
+def parse_echo_reply_v6(message: bytes) -> tuple[int, int] | None:
+    """Return ``(identifier, sequence)`` for an echo reply, or None for anything else."""
+    if len(message) < _HEADER.size:
+        return None
+    icmp_type, code, _, identifier, sequence = _HEADER.unpack_from(message)
+    if icmp_type != ICMPV6_ECHO_REPLY or code != 0:
+        return None
+    return identifier, sequence
+
+
+def _link_layer_option(message: bytes, offset: int, wanted: int) -> str | None:
+    """Find a source/target link-layer address option in an NDP message."""
+    while offset + 2 <= len(message):
+        option_type, length = message[offset], message[offset + 1]
+        if length == 0:
+            return None
+        if option_type == wanted and length * 8 >= 8 and offset + 8 <= len(message):
+            return ":".join(f"{b:02x}" for b in message[offset + 2:offset + 8])
+        offset += length * 8
+    return None
+
+
+def _scoped(address: str, source: str) -> str:
+    """Give a link-local ``address`` the ``%interface`` scope of the packet's source."""
+    _, percent, scope = source.partition("%")
+    if percent and ipaddress.IPv6Address(address).is_link_local:
+        return f"{address}%{scope}"
+    return address
+
+
+def parse_ndp(message: bytes, source: str) -> tuple[str, str] | None:
+    """Return ``(address, mac)`` announced by a router/neighbour solicitation or advertisement.
+
+    Neighbour advertisements describe their target address; solicitations
+    and router advertisements describe their sender. Duplicate address
+    detection probes (sent from ``::``) carry no usable address.
+    """
+    if not message or message[0] not in _OPTIONS_OFFSET or message[1] != 0:
+        return None
+    icmp_type = message[0]
+    offset = _OPTIONS_OFFSET[icmp_type]
+    if len(message) < offset:
+        return None
+
+    if icmp_type == ND_NEIGHBOR_ADVERT:
+        address = _scoped(socket.inet_ntop(socket.AF_INET6, message[8:24]), source)
+        mac = _link_layer_option(message, offset, ND_OPT_TARGET_LINKADDR)
+    else:
+        address = source
+        mac = _link_layer_option(message, offset, ND_OPT_SOURCE_LINKADDR)
+    if mac is None or address.partition("%")[0] == "::":
+        return None
+    return address, mac
+
+
+class NeighbourCollector:
+    """Accumulates the hosts seen in echo replies and NDP messages."""
+
+    def __init__(self, identifier: int, sent: float | None = None) -> None:
+        self.identifier = identifier
+        self.sent = sent
+        self.neighbours: dict[str, Ipv6Neighbour] = {}
+
+    def feed(self, message: bytes, source: str, received: float | None = None) -> None:
+        """Record what one received ICMPv6 message says about its link."""
+        reply = parse_echo_reply_v6(message)
+        if reply is not None:
+            if reply[0] != self.identifier:
+                return
+            neighbour = self._neighbour(source)
+            if neighbour.response_time is None and self.sent is not None:
+                neighbour.response_time = (received or time.monotonic()) - self.sent
+            return
+
+        announced = parse_ndp(message, source)
+        if announced is not None:
+            address, mac = announced
+            self._neighbour(address).mac_address = mac
+
+    def _neighbour(self, address: str) -> Ipv6Neighbour:
+        if address not in self.neighbours:
+            self.neighbours[address] = Ipv6Neighbour(address)
+        return self.neighbours[address]
+
+
+def _open_socket() -> tuple[socket.socket, bool]:
+    """Open a raw ICMPv6 socket (which also sees NDP), else an unprivileged ping socket."""
+    try:
+        return socket.socket(socket.AF_INET6, socket.SOCK_RAW, socket.IPPROTO_ICMPV6), True
+    except PermissionError:
+        logger.debug("Raw ICMPv6 unavailable, using a ping socket (echo replies only, no NDP)")
+        return socket.socket(socket.AF_INET6, socket.SOCK_DGRAM, socket.IPPROTO_ICMPV6), False
+
+
+async def discover_neighbours(
+    interface: str | None, destination: str = ALL_NODES, listen_time: float = LISTEN_TIME
+) -> dict[str, Ipv6Neighbour]:
+    """Ping ``destination`` out of ``interface`` and collect every host heard from.
+
+    Hosts answering a multicast echo first resolve our address with a
+    neighbour solicitation carrying their MAC, so a raw socket learns most
+    MACs without sending anything else.
+
+    Raises:
+        OSError: If no ICMPv6 socket can be opened or the echo cannot be sent.
+    """
+    loop = asyncio.get_running_loop()
+    sock, raw = _open_socket()
+    with sock:
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RECEIVE_BUFFER)
+        ifindex = socket.if_nametoindex(interface) if interface else 0
+        if ifindex:
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_MULTICAST_IF, ifindex)
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_MULTICAST_HOPS, 1)
+        if raw:
+            identifier = random.getrandbits(16)
+        else:
+            # The kernel replaces the identifier of a ping socket with its port.
+            sock.bind(("::", 0))
+            identifier = sock.getsockname()[1]
+
+        collector = NeighbourCollector(identifier)
+
+        def on_readable() -> None:
+            while True:
+                try:
+                    message, address = sock.recvfrom(65536)
+                except (BlockingIOError, InterruptedError):
+                    return
+                except OSError as e:
+                    logger.debug(f"ICMPv6 receive error: {e}")
+                    return
+                collector.feed(message, address[0], time.monotonic())
+
+        target = ipaddress.IPv6Address(destination)
+        scope_id = ifindex if target.is_multicast or target.is_link_local else 0
+        loop.add_reader(sock.fileno(), on_readable)
+        try:
+            collector.sent = time.monotonic()
+            sock.sendto(build_echo_request_v6(identifier, random.getrandbits(16)), (destination, 0, 0, scope_id))
+            await asyncio.sleep(listen_time)
+        finally:
+            loop.remove_reader(sock.fileno())
+
+    logger.debug(f"IPv6 discovery on {interface or 'default interface'} heard {len(collector.neighbours)} hosts")
+    return collector.neighbours
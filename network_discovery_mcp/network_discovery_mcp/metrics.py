@@ -0,0 +1,310 @@
+"""Per-phase scanner instrumentation: latency histograms, counters and in-flight gauges.
+
+Each probe phase (ping, DNS, ARP, port connects, banner reads, ...) is timed
+with ``with metrics.phase("ping") as timer:``. A disabled ``ScannerMetrics``
+hands out one shared do-nothing timer, so instrumented code costs an
+attribute check and a context variable lookup per probe.
+
+Independently of the process-wide statistics, ``phase_breakdown()`` collects
+the phases run by one task (and the tasks it starts) so a single tool call
+can report where its time went.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+# Histogram bucket upper bounds (seconds): 100us doubling up to ~13s
+BUCKETS = tuple(0.0001 * 2 ** i for i in range(18))
+
+PROMETHEUS_PREFIX = "network_discovery"
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@dataclass
+class PhaseStats:
+    """Counters, gauges and a latency histogram for one phase."""
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    retries: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    total: float = 0.0
+    # One count per bucket in BUCKETS, plus one for anything slower
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+
+    def observe(self, seconds: float, timed_out: bool = False, error: bool = False, retries: int = 0) -> None:
+        self.calls += 1
+        self.timeouts += timed_out
+        self.errors += error
+        self.retries += retries
+        self.total += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def reset(self) -> None:
+        """Zero the counters in place, so timers still running report back here."""
+        self.calls = self.timeouts = self.errors = self.retries = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.max_in_flight = self.in_flight
+
+    def quantile(self, fraction: float) -> float | None:
+        """Upper bound of the bucket holding the ``fraction`` quantile (None if unbounded or empty)."""
+        if not self.calls:
+            return None
+        rank = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return BUCKETS[index] if index < len(BUCKETS) else None
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        p50, p99 = self.quantile(0.5), self.quantile(0.99)
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "total_seconds": round(self.total, 6),
+            "mean_ms": round(self.total / self.calls * 1000, 3) if self.calls else None,
+            "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 3) if p99 is not None else None,
+        }
+
+
+@dataclass
+class _BreakdownEntry:
+    calls: int = 0
+    timeouts: int = 0
+    total: float = 0.0
+
+
+class PhaseBreakdown:
+    """The phases run within one ``phase_breakdown()`` block."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.elapsed: float | None = None
+        self.phases: dict[str, _BreakdownEntry] = {}
+
+    def add(self, name: str, seconds: float, timed_out: bool) -> None:
+        entry = self.phases.setdefault(name, _BreakdownEntry())
+        entry.calls += 1
+        entry.timeouts += timed_out
+        entry.total += seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total_seconds": round(self.elapsed if self.elapsed is not None else time.perf_counter() - self.started, 6),
+            "phases": {
+                name: {"calls": entry.calls, "timeouts": entry.timeouts, "seconds": round(entry.total, 6)}
+                for name, entry in sorted(self.phases.items(), key=lambda item: -item[1].total)
+            },
+        }
+
+    def summary(self) -> str:
+        """One line such as ``Timings: 1.20s total; ping 254x 0.81s (190 timed out), dns 64x 0.10s``."""
+        data = self.to_dict()
+        parts = []
+        for name, phase in data["phases"].items():
+            part = f"{name} {phase['calls']}x {phase['seconds']:.3f}s"
+            if phase["timeouts"]:
+                part += f" ({phase['timeouts']} timed out)"
+            parts.append(part)
+        line = f"Timings: {data['total_seconds']:.3f}s total"
+        if parts:
+            # Probes overlap, so phase times can add up to more than the total.
+            line += "; " + ", ".join(parts) + " (concurrent phases overlap)"
+        return line
+
+
+_breakdown: ContextVar[PhaseBreakdown | None] = ContextVar("phase_breakdown", default=None)
+
+
+@contextmanager
+def phase_breakdown() -> Iterator[PhaseBreakdown]:
+    """Collect every phase timed by this task, and the tasks it starts, while the block runs."""
+    breakdown = PhaseBreakdown()
+    token = _breakdown.set(breakdown)
+    try:
+        yield breakdown
+    finally:
+        breakdown.elapsed = time.perf_counter() - breakdown.started
+        _breakdown.reset(token)
+
+
+@contextmanager
+def no_breakdown() -> Iterator[None]:
+    """Keep phases timed in the block out of any enclosing ``phase_breakdown()``."""
+    token = _breakdown.set(None)
+    try:
+        yield
+    finally:
+        _breakdown.reset(token)
+
+
+class _NullTimer:
+    """Stands in for a phase timer when nothing is being measured."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def timed_out(self) -> None:
+        pass
+
+    def retried(self, count: int = 1) -> None:
+        pass
+
+    def record_as(self, seconds: float) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _PhaseTimer:
+    __slots__ = ("_stats", "_breakdown", "_name", "_started", "_seconds", "_timed_out", "_retries")
+
+    def __init__(self, stats: PhaseStats | None, breakdown: PhaseBreakdown | None, name: str) -> None:
+        self._stats = stats
+        self._breakdown = breakdown
+        self._name = name
+        self._seconds: float | None = None
+        self._timed_out = False
+        self._retries = 0
+
+    def __enter__(self) -> "_PhaseTimer":
+        if self._stats is not None:
+            self._stats.in_flight += 1
+            self._stats.max_in_flight = max(self._stats.max_in_flight, self._stats.in_flight)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        seconds = self._seconds if self._seconds is not None else time.perf_counter() - self._started
+        if self._stats is not None:
+            self._stats.in_flight -= 1
+            # Cancellation is the caller giving up, not the phase failing.
+            error = exc_type is not None and issubclass(exc_type, Exception)
+            self._stats.observe(seconds, self._timed_out, error, self._retries)
+        if self._breakdown is not None:
+            self._breakdown.add(self._name, seconds, self._timed_out)
+
+    def timed_out(self) -> None:
+        """Count this call as a timeout."""
+        self._timed_out = True
+
+    def retried(self, count: int = 1) -> None:
+        """Count ``count`` retries made within this call."""
+        self._retries += count
+
+    def record_as(self, seconds: float) -> None:
+        """Record ``seconds`` instead of the time the block took (e.g. only its connect part)."""
+        self._seconds = seconds
+
+
+class ScannerMetrics:
+    """Process-wide probe phase and tool call statistics.
+
+    Disabled instances record nothing except into an active
+    ``phase_breakdown()``.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.started = time.time()
+        self.phases: dict[str, PhaseStats] = {}
+        self.tools: dict[str, PhaseStats] = {}
+
+    def phase(self, name: str) -> _PhaseTimer | _NullTimer:
+        """A context manager timing one call of probe phase ``name``."""
+        breakdown = _breakdown.get()
+        if not self.enabled:
+            return _NULL_TIMER if breakdown is None else _PhaseTimer(None, breakdown, name)
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        return _PhaseTimer(stats, breakdown, name)
+
+    def tool(self, name: str) -> _PhaseTimer | _NullTimer:
+        """A context manager timing one call of MCP tool ``name``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        stats = self.tools.get(name)
+        if stats is None:
+            stats = self.tools[name] = PhaseStats()
+        return _PhaseTimer(stats, None, name)
+
+    def observe(self, name: str, seconds: float, timed_out: bool = False) -> None:
+        """Record one already-measured call of phase ``name``."""
+        breakdown = _breakdown.get()
+        if breakdown is not None:
+            breakdown.add(name, seconds, timed_out)
+        if self.enabled:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats()
+            stats.observe(seconds, timed_out)
+
+    def reset(self) -> None:
+        """Forget everything recorded so far (gauges of calls still running are kept)."""
+        self.started = time.time()
+        for table in (self.phases, self.tools):
+            for stats in table.values():
+                stats.reset()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "seconds_since_reset": round(time.time() - self.started, 3),
+            "phases": {name: stats.to_dict() for name, stats in sorted(self.phases.items())},
+            "tools": {name: stats.to_dict() for name, stats in sorted(self.tools.items())},
+        }
+
+    def to_prometheus(self, extra_gauges: dict[str, float] | None = None) -> str:
+        """Render the statistics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for table, label, metric, help_text in (
+            (self.phases, "phase", "phase", "Time spent in each scanner probe phase."),
+            (self.tools, "tool", "tool", "Time spent handling each MCP tool call."),
+        ):
+            name = f"{PROMETHEUS_PREFIX}_{metric}_seconds"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for key, stats in sorted(table.items()):
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, None), stats.buckets, strict=True):
+                    cumulative += count
+                    le = "+Inf" if bound is None else f"{bound:g}"
+                    lines.append(f'{name}_bucket{{{label}="{_label(key)}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label}="{_label(key)}"}} {stats.total:.6f}')
+                lines.append(f'{name}_count{{{label}="{_label(key)}"}} {stats.calls}')
+            for counter in ("timeouts", "errors", "retries"):
+                counter_name = f"{PROMETHEUS_PREFIX}_{metric}_{counter}_total"
+                lines += [f"# HELP {counter_name} {counter.capitalize()} per {label}.", f"# TYPE {counter_name} counter"]
+                lines += [f'{counter_name}{{{label}="{_label(key)}"}} {getattr(stats, counter)}'
+                          for key, stats in sorted(table.items())]
+            gauge = f"{PROMETHEUS_PREFIX}_{metric}_in_flight"
+            lines += [f"# HELP {gauge} Calls currently in progress per {label}.", f"# TYPE {gauge} gauge"]
+            lines += [f'{gauge}{{{label}="{_label(key)}"}} {stats.in_flight}' for key, stats in sorted(table.items())]
+        for key, value in sorted((extra_gauges or {}).items()):
+            gauge = f"{PROMETHEUS_PREFIX}_{key}"
+            lines += [f"# TYPE {gauge} gauge", f"{gauge} {value}"]
+        return "\n".join(lines) + "\n"
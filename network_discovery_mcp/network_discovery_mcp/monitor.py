@@ -0,0 +1,153 @@
+"""Background monitor that keeps configured subnets warm in the device inventory."""
+
+import asyncio
+import ipaddress
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from .scanner import NetworkScanner, ProbeScheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 300.0
+DEFAULT_JITTER = 0.1
+# Probes per second for background sweeps; interactive scans are not limited by this
+DEFAULT_PACKET_RATE = 50.0
+# Fraction of one CPU the monitor may use, averaged over each sweep and the pause after it
+DEFAULT_CPU_BUDGET = 0.05
+# Hosts probed concurrently by a background sweep
+MONITOR_CONCURRENCY = 16
+
+
+@dataclass
+class MonitoredNetwork:
+    """Sweep bookkeeping for one monitored network."""
+    network: str
+    last_sweep: float | None = None
+    last_duration: float | None = None
+    sweeps: int = 0
+    devices: int = 0
+    last_error: str | None = None
+
+
+class NetworkMonitor:
+    """Periodically rescans networks at a low, bounded rate.
+
+    Sweeps run through a private scanner that shares the interactive
+    scanner's inventory and resolver but has its own probe scheduler, so the
+    packet budget applies only to background work. Each sweep is an
+    incremental ``rescan_network``; after it the monitor pauses long enough to
+    keep its CPU use within ``cpu_budget``.
+    """
+
+    def __init__(
+        self,
+        scanner: NetworkScanner,
+        networks: list[str],
+        interval: float = DEFAULT_INTERVAL,
+        jitter: float = DEFAULT_JITTER,
+        packet_rate: float = DEFAULT_PACKET_RATE,
+        cpu_budget: float = DEFAULT_CPU_BUDGET,
+        include_ports: bool = False,
+    ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in [0, 1)")
+        if cpu_budget <= 0:
+            raise ValueError("cpu_budget must be positive")
+        self.interval = interval
+        self.jitter = jitter
+        self.cpu_budget = cpu_budget
+        self.include_ports = include_ports
+        normalized = (str(ipaddress.IPv4Network(network, strict=False)) for network in networks)
+        self.networks = {network: MonitoredNetwork(network) for network in normalized}
+        scheduler = ProbeScheduler(
+            rate=packet_rate,
+            burst=max(1, int(packet_rate)),
+            initial_window=MONITOR_CONCURRENCY,
+            max_window=MONITOR_CONCURRENCY,
+        )
+        self._scanner = NetworkScanner(
+            resolver=scanner.resolver,
+            names=scanner.names,
+            metrics=scanner.metrics,
+            scheduler=scheduler,
+            max_connections=MONITOR_CONCURRENCY,
+            max_connections_per_host=2,
+            inventory=scanner.devices,
+            freshness=scanner.freshness,
+        )
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sweeping in the background (no-op if already running)."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="network-monitor")
+            logger.info(f"Monitoring {', '.join(self.networks)} every ~{self.interval:.0f}s")
+
+    async def stop(self) -> None:
+        """Cancel any sweep in progress and release the monitor's sockets."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.wait([self._task])
+            self._task = None
+        self._scanner.close()
+
+    def covers(self, network: str, include_ports: bool = False) -> MonitoredNetwork | None:
+        """The monitored network containing ``network`` if its data is current enough to answer from."""
+        if include_ports and not self.include_ports:
+            return None
+        try:
+            wanted = ipaddress.IPv4Network(network, strict=False)
+        except ValueError:
+            return None
+        for monitored in self.networks.values():
+            if monitored.last_sweep is None or time.time() - monitored.last_sweep > 2 * self.interval:
+                continue
+            if wanted.subnet_of(ipaddress.IPv4Network(monitored.network)):
+                return monitored
+        return None
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "networks": [vars(monitored).copy() for monitored in self.networks.values()],
+        }
+
+    async def _run(self) -> None:
+        while True:
+            for monitored in self.networks.values():
+                await self._sweep(monitored)
+            delay = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            await asyncio.sleep(delay)
+
+    async def _sweep(self, monitored: MonitoredNetwork) -> None:
+        started = time.monotonic()
+        cpu_started = time.process_time()
+        try:
+            diff = await self._scanner.rescan_network(monitored.network, self.include_ports, MONITOR_CONCURRENCY)
+        except Exception as e:
+            logger.warning(f"Background sweep of {monitored.network} failed: {e}")
+            monitored.last_error = str(e)
+        else:
+            monitored.last_sweep = time.time()
+            monitored.sweeps += 1
+            monitored.devices = len(diff.added) + len(diff.changed) + diff.unchanged
+            monitored.last_error = None
+        monitored.last_duration = time.monotonic() - started
+
+        # Pause so that CPU time over (sweep + pause) stays within the budget.
+        # process_time() counts the whole process, so interactive scans running
+        # at the same time only make the monitor back off further.
+        cpu_used = time.process_time() - cpu_started
+        cooldown = cpu_used / self.cpu_budget - monitored.last_duration
+        if cooldown > 0:
+            logger.debug(f"Monitor pausing {cooldown:.1f}s to stay within its CPU budget")
+            await asyncio.sleep(cooldown)
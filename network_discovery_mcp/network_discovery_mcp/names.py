@@ -0,0 +1,281 @@
+"""Batched link-local name resolution over mDNS, NetBIOS (NBNS) and LLMNR.
+
+Reverse DNS fails for most LAN hosts, one timeout per host. These protocols
+are answered by the hosts themselves: one mDNS query carries PTR questions
+for many addresses at once, and NetBIOS node status and LLMNR queries for a
+whole batch go out together and share a single answer window.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+import struct
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from .resolver import CLASS_IN, TYPE_PTR, build_query, decode_name, encode_name, iter_records
+
+logger = logging.getLogger(__name__)
+
+MDNS_ADDRESS = ("224.0.0.251", 5353)
+NBNS_PORT = 137
+LLMNR_PORT = 5355
+
+# How long to collect answers after a batch of queries (seconds)
+NAME_WINDOW = 0.5
+# mDNS questions are packed into datagrams no larger than this
+MAX_QUERY_SIZE = 1400
+
+TYPE_NBSTAT = 0x21
+# mDNS "unicast response requested" bit in the question class
+_QU = 0x8000
+_NB_GROUP = 0x8000
+# NetBIOS name status reports no TTL; keep its names this long
+_NBSTAT_TTL = 300.0
+_HEADER = struct.Struct("!HHHHHH")
+_IN_ADDR = ".in-addr.arpa"
+# "*" padded with NULs, first-level encoded
+_WILDCARD = "CK" + "A" * 30
+
+
+def encode_netbios_name(name: str, suffix: int = 0x00) -> str:
+    """First-level encode a NetBIOS name (RFC 1001 section 14.1)."""
+    raw = name.upper().ljust(15)[:15].encode("ascii") + bytes([suffix])
+    return "".join(chr(0x41 + (b >> 4)) + chr(0x41 + (b & 0x0F)) for b in raw)
+
+
+def decode_netbios_name(encoded: str) -> tuple[str, int] | None:
+    """Decode a first-level encoded NetBIOS name into ``(name, suffix)``."""
+    label = encoded.split(".", 1)[0]
+    if len(label) != 32:
+        return None
+    raw = bytes(((ord(high) - 0x41) << 4) | (ord(low) - 0x41) for high, low in zip(label[::2], label[1::2]))
+    return raw[:15].decode("ascii", errors="replace").rstrip(), raw[15]
+
+
+def _reverse_pointer(address: str) -> str:
+    return ipaddress.ip_address(address.partition("%")[0]).reverse_pointer
+
+
+def _reverse_question(name: str, suffix_offset: int | None) -> bytes:
+    if suffix_offset is not None and name.endswith(_IN_ADDR):
+        encoded = encode_name(name[:-len(_IN_ADDR)])[:-1] + struct.pack("!H", 0xC000 | suffix_offset)
+    else:
+        encoded = encode_name(name)
+    return encoded + struct.pack("!HH", TYPE_PTR, CLASS_IN | _QU)
+
+
+def build_mdns_queries(query_id: int, addresses: Iterable[str]) -> list[bytes]:
+    """Pack reverse (PTR) questions for ``addresses`` into as few mDNS queries as fit.
+
+    IPv4 questions after the first in each datagram point back at its
+    ``in-addr.arpa`` suffix, so each one costs about a dozen bytes.
+    """
+    queries = []
+    questions: list[bytes] = []
+    size = _HEADER.size
+    suffix_offset = None
+    for address in addresses:
+        name = _reverse_pointer(address)
+        question = _reverse_question(name, suffix_offset)
+        if questions and size + len(question) > MAX_QUERY_SIZE:
+            queries.append(_HEADER.pack(query_id, 0, len(questions), 0, 0, 0) + b"".join(questions))
+            questions, size, suffix_offset = [], _HEADER.size, None
+            question = _reverse_question(name, None)
+        if suffix_offset is None and name.endswith(_IN_ADDR):
+            suffix_offset = size + len(encode_name(name[:-len(_IN_ADDR)])) - 1
+        questions.append(question)
+        size += len(question)
+    if questions:
+        queries.append(_HEADER.pack(query_id, 0, len(questions), 0, 0, 0) + b"".join(questions))
+    return queries
+
+
+def build_nbstat_query(query_id: int) -> bytes:
+    """Build a NetBIOS node status request for the wildcard name ``*``."""
+    question = encode_name(_WILDCARD) + struct.pack("!HH", TYPE_NBSTAT, CLASS_IN)
+    return _HEADER.pack(query_id, 0, 1, 0, 0, 0) + question
+
+
+def parse_nbstat_response(message: bytes) -> str | None:
+    """The machine name (unique, suffix 0x00) from a node status response."""
+    for record in iter_records(message):
+        if record.rtype != TYPE_NBSTAT or record.length < 1:
+            continue
+        count = message[record.offset]
+        for index in range(count):
+            entry = record.offset + 1 + index * 18
+            if entry + 18 > record.offset + record.length:
+                break
+            name = message[entry:entry + 15].decode("ascii", errors="replace").rstrip()
+            suffix = message[entry + 15]
+            (flags,) = struct.unpack_from("!H", message, entry + 16)
+            if suffix == 0x00 and not flags & _NB_GROUP and name:
+                return name
+    return None
+
+
+def parse_ptr_answers(message: bytes) -> dict[str, tuple[str, int]]:
+    """Map each reverse name answered in a DNS-format message to ``(hostname, ttl)``."""
+    answers = {}
+    for record in iter_records(message):
+        if record.rtype == TYPE_PTR and record.rclass & 0x7FFF == CLASS_IN:
+            hostname, _ = decode_name(message, record.offset)
+            answers[record.name.rstrip(".").lower()] = (hostname.rstrip("."), record.ttl)
+    return answers
+
+
+class MulticastNameResolver:
+    """Resolve many addresses at once over mDNS, NetBIOS and LLMNR.
+
+    Each call sends every query up front over one UDP socket and collects
+    answers for ``window`` seconds (less if every address is answered).
+    Names are cached for their TTL (clamped to ``[min_ttl, max_ttl]``);
+    addresses that stayed silent through a full unicast round are cached as
+    unnamed for ``negative_ttl``. The destinations are configurable so the
+    resolver can be pointed at stand-in responders.
+    """
+
+    def __init__(
+        self,
+        window: float = NAME_WINDOW,
+        mdns_address: tuple[str, int] = MDNS_ADDRESS,
+        nbns_port: int = NBNS_PORT,
+        llmnr_port: int = LLMNR_PORT,
+        min_ttl: float = 30.0,
+        max_ttl: float = 3600.0,
+        negative_ttl: float = 300.0,
+        max_entries: int = 4096,
+    ) -> None:
+        self.window = window
+        self.mdns_address = mdns_address
+        self.nbns_port = nbns_port
+        self.llmnr_port = llmnr_port
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, tuple[float, str | None]] = OrderedDict()
+
+    def cached(self, ip_address: str) -> tuple[bool, str | None]:
+        """Return ``(hit, hostname)`` from the cache without querying."""
+        entry = self._cache.get(ip_address)
+        if entry is None:
+            return False, None
+        expires, hostname = entry
+        if expires <= time.monotonic():
+            del self._cache[ip_address]
+            return False, None
+        self._cache.move_to_end(ip_address)
+        return True, hostname
+
+    async def resolve_many(
+        self, ip_addresses: Iterable[str], unicast: bool = True, broadcast: str | None = None
+    ) -> dict[str, str | None]:
+        """Names for ``ip_addresses`` (None where unknown), querying only uncached ones.
+
+        One mDNS query (split only if it outgrows a datagram) asks for all
+        of them. With ``unicast``, each IPv4 address also gets a NetBIOS
+        node status and an LLMNR reverse query. ``broadcast``, an IPv4
+        broadcast address, gets one NetBIOS node status request.
+        """
+        results: dict[str, str | None] = {}
+        pending = []
+        for address in dict.fromkeys(ip_addresses):
+            hit, hostname = self.cached(address)
+            if hit:
+                results[address] = hostname
+            else:
+                pending.append(address)
+        if pending:
+            try:
+                answered = await self._query(pending, unicast, broadcast)
+            except OSError as e:
+                logger.debug(f"Multicast name resolution unavailable: {e}")
+                answered = {}
+            for address in pending:
+                if address in answered:
+                    hostname, ttl = answered[address]
+                    self._store(address, hostname, max(self.min_ttl, min(ttl, self.max_ttl)))
+                elif unicast:
+                    self._store(address, None, self.negative_ttl)
+                results[address] = answered.get(address, (None, 0))[0]
+        return results
+
+    def _store(self, ip_address: str, hostname: str | None, ttl: float) -> None:
+        self._cache[ip_address] = (time.monotonic() + ttl, hostname)
+        self._cache.move_to_end(ip_address)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _query(
+        self, addresses: list[str], unicast: bool, broadcast: str | None
+    ) -> dict[str, tuple[str, float]]:
+        loop = asyncio.get_running_loop()
+        wanted = set(addresses)
+        reverse = {_reverse_pointer(address): address for address in addresses}
+        answered: dict[str, tuple[str, float]] = {}
+        done = asyncio.Event()
+
+        def on_readable() -> None:
+            while True:
+                try:
+                    message, (source, port) = sock.recvfrom(4096)
+                except (BlockingIOError, InterruptedError):
+                    return
+                except OSError as e:
+                    # ICMP port unreachable from hosts without a responder.
+                    logger.debug(f"Name query receive error: {e}")
+                    continue
+                try:
+                    if port == self.nbns_port:
+                        hostname = parse_nbstat_response(message)
+                        if source in wanted and hostname and source not in answered:
+                            answered[source] = (hostname, _NBSTAT_TTL)
+                    else:
+                        for name, (hostname, ttl) in parse_ptr_answers(message).items():
+                            address = reverse.get(name)
+                            if address is not None and hostname:
+                                answered[address] = (hostname, ttl)
+                except (ValueError, IndexError, struct.error) as e:
+                    logger.debug(f"Malformed name response from {source}: {e}")
+                if len(answered) == len(wanted):
+                    done.set()
+
+        def send(data: bytes, destination: tuple[str, int]) -> None:
+            try:
+                sock.sendto(data, destination)
+            except OSError as e:
+                # No multicast route, unreachable broadcast and the like: skip that query.
+                logger.debug(f"Name query to {destination[0]} not sent: {e}")
+
+        query_id = random.getrandbits(16)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.bind(("0.0.0.0", 0))
+            loop.add_reader(sock.fileno(), on_readable)
+            try:
+                for query in build_mdns_queries(query_id, addresses):
+                    send(query, self.mdns_address)
+                nbstat = build_nbstat_query(query_id)
+                if broadcast is not None:
+                    send(nbstat, (broadcast, self.nbns_port))
+                if unicast:
+                    # NetBIOS and our socket are IPv4 only.
+                    for address in addresses:
+                        if ":" in address:
+                            continue
+                        send(nbstat, (address, self.nbns_port))
+                        send(build_query(query_id, _reverse_pointer(address), flags=0), (address, self.llmnr_port))
+                try:
+                    await asyncio.wait_for(done.wait(), self.window)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                loop.remove_reader(sock.fileno())
+        logger.debug(f"Link-local name queries answered {len(answered)} of {len(addresses)} addresses")
+        return answered
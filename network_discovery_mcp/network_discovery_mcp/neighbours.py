@@ -0,0 +1,112 @@
+"""Readers for the kernel neighbour (ARP and NDP) tables."""
+
+import logging
+import socket
+import struct
+
+from . import netlink
+
+logger = logging.getLogger(__name__)
+
+PROC_NET_ARP = "/proc/net/arp"
+
+# struct ndmsg and the attributes we care about (linux/neighbour.h)
+_NDMSG = struct.Struct("=BBHiHBB")
+NDA_DST = 1
+NDA_LLADDR = 2
+
+NUD_INCOMPLETE = 0x01
+NUD_FAILED = 0x20
+NUD_NOARP = 0x40
+
+_ATF_COMPLETE = 0x02
+_EMPTY_MAC = "00:00:00:00:00:00"
+
+
+def read_proc_arp(path: str = PROC_NET_ARP) -> dict[str, str]:
+    """Parse ``/proc/net/arp`` into an ``{ip: mac}`` map of complete entries."""
+    entries: dict[str, str] = {}
+    try:
+        with open(path, encoding="ascii") as f:
+            lines = f.read().splitlines()[1:]
+    except OSError as e:
+        logger.debug(f"Cannot read {path}: {e}")
+        return entries
+
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 4:
+            continue
+        ip_addr, _, flags, mac = fields[:4]
+        try:
+            complete = int(flags, 16) & _ATF_COMPLETE
+        except ValueError:
+            continue
+        if complete and mac != _EMPTY_MAC:
+            entries[ip_addr] = mac.lower()
+    return entries
+
+
+def _interface_name(ifindex: int) -> str:
+    try:
+        return socket.if_indextoname(ifindex)
+    except OSError:
+        return str(ifindex)
+
+
+def parse_neighbour_dump(data: bytes, family: int = socket.AF_INET, scoped: bool = False) -> dict[str, str]:
+    """Extract ``{ip: mac}`` from an ``RTM_GETNEIGH`` dump reply stream.
+
+    With ``scoped``, IPv6 link-local addresses get the ``%interface`` suffix
+    needed to reach them.
+    """
+    entries: dict[str, str] = {}
+    for msg_type, payload in netlink.iter_messages(data):
+        if msg_type != netlink.RTM_NEWNEIGH or len(payload) < _NDMSG.size:
+            continue
+        ndm_family, _, _, ifindex, state, _, _ = _NDMSG.unpack_from(payload)
+        if ndm_family != family or state & (NUD_INCOMPLETE | NUD_FAILED | NUD_NOARP):
+            continue
+        attributes = netlink.parse_attributes(payload, _NDMSG.size)
+        dst = attributes.get(NDA_DST)
+        lladdr = attributes.get(NDA_LLADDR)
+        if not dst or not lladdr or len(lladdr) != 6:
+            continue
+        mac = ":".join(f"{b:02x}" for b in lladdr)
+        if mac == _EMPTY_MAC:
+            continue
+        address = socket.inet_ntop(family, dst)
+        if scoped and family == socket.AF_INET6 and address.startswith("fe80:"):
+            address = f"{address}%{_interface_name(ifindex)}"
+        entries[address] = mac
+    return entries
+
+
+def read_netlink_neighbours(family: int = socket.AF_INET, scoped: bool = False) -> dict[str, str]:
+    """Dump the kernel neighbour table over rtnetlink."""
+    request = _NDMSG.pack(family, 0, 0, 0, 0, 0, 0)
+    try:
+        data = netlink.dump(netlink.RTM_GETNEIGH, request)
+    except OSError as e:
+        logger.debug(f"Netlink neighbour dump failed: {e}")
+        return {}
+    return parse_neighbour_dump(data, family, scoped)
+
+
+def kernel_neighbour_table(proc_path: str = PROC_NET_ARP) -> dict[str, str]:
+    """Return every IPv4 neighbour the kernel has already resolved.
+
+    This costs no packets: it merges ``/proc/net/arp`` with the netlink
+    neighbour table (which also carries permanent/static entries).
+    """
+    entries = read_proc_arp(proc_path)
+    entries.update(read_netlink_neighbours())
+    return entries
+
+
+def kernel_ipv6_neighbour_table() -> dict[str, str]:
+    """Return every IPv6 neighbour the kernel has resolved through NDP.
+
+    Link-local addresses carry their ``%interface`` scope.
+    """
+    return read_netlink_neighbours(socket.AF_INET6, scoped=True)
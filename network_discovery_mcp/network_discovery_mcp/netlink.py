@@ -0,0 +1,110 @@
+"""Minimal rtnetlink helpers (Linux only) used for kernel table snapshots."""
+
+import os
+import socket
+import struct
+from collections.abc import Iterator
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+NLM_F_REQUEST = 0x01
+NLM_F_DUMP = 0x300
+
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTM_NEWNEIGH = 28
+RTM_GETNEIGH = 30
+
+# Multicast groups for change notifications
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+NLMSG_HEADER = struct.Struct("=IHHII")
+RTATTR_HEADER = struct.Struct("=HH")
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def iter_messages(data: bytes) -> Iterator[tuple[int, bytes]]:
+    """Yield ``(message_type, payload)`` for each netlink message in ``data``."""
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size or offset + length > len(data):
+            return
+        yield msg_type, data[offset + NLMSG_HEADER.size:offset + length]
+        offset += _align(length)
+
+
+def parse_attributes(data: bytes, offset: int = 0) -> dict[int, bytes]:
+    """Parse a run of ``rtattr`` TLVs starting at ``offset``."""
+    attributes: dict[int, bytes] = {}
+    while offset + RTATTR_HEADER.size <= len(data):
+        length, attr_type = RTATTR_HEADER.unpack_from(data, offset)
+        if length < RTATTR_HEADER.size or offset + length > len(data):
+            break
+        attributes[attr_type] = data[offset + RTATTR_HEADER.size:offset + length]
+        offset += _align(length)
+    return attributes
+
+
+def build_request(msg_type: int, payload: bytes, seq: int = 1) -> bytes:
+    """Build a dump request message."""
+    header = NLMSG_HEADER.pack(
+        NLMSG_HEADER.size + len(payload), msg_type, NLM_F_REQUEST | NLM_F_DUMP, seq, 0
+    )
+    return header + payload
+
+
+def dump(msg_type: int, payload: bytes, timeout: float = 1.0) -> bytes:
+    """Run an rtnetlink dump request and return the raw reply stream.
+
+    Raises:
+        OSError: If netlink is unavailable or the kernel reports an error.
+    """
+    if not hasattr(socket, "AF_NETLINK"):
+        raise OSError("netlink is not supported on this platform")
+
+    chunks = []
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        sock.settimeout(timeout)
+        sock.bind((0, 0))
+        sock.send(build_request(msg_type, payload, seq=os.getpid() & 0xFFFF))
+        while True:
+            data = sock.recv(65536)
+            chunks.append(data)
+            for reply_type, reply in iter_messages(data):
+                if reply_type == NLMSG_DONE:
+                    return b"".join(chunks)
+                if reply_type == NLMSG_ERROR:
+                    (error,) = struct.unpack_from("=i", reply)
+                    if error:
+                        raise OSError(-error, os.strerror(-error))
+
+
+def subscribe(groups: int) -> socket.socket:
+    """Open a non-blocking rtnetlink socket joined to the multicast ``groups``.
+
+    Raises:
+        OSError: If netlink is unavailable.
+    """
+    if not hasattr(socket, "AF_NETLINK"):
+        raise OSError("netlink is not supported on this platform")
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    try:
+        sock.bind((0, groups))
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+    return sock
@@ -0,0 +1,187 @@
+"""MAC vendor lookup from a compact, memory-mapped IEEE OUI index.
+
+The IEEE assigns MAC prefixes in three sizes: 24-bit MA-L (the classic OUI),
+28-bit MA-M and 36-bit MA-S blocks. The index is built from the registry CSV
+files into a sorted binary table::
+
+    header   magic, version, record count
+    records  (prefix start << 8 | prefix bits, name offset), fixed width, sorted
+    names    length-prefixed UTF-8, each vendor stored once
+
+The table is memory-mapped and searched by bisection, longest prefix first,
+so nothing is parsed at import time and only the pages a lookup touches are
+read. Rebuild it with::
+
+    python -m network_discovery_mcp.oui oui.csv mam.csv oui36.csv
+"""
+
+import argparse
+import csv
+import logging
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent / "data"
+DEFAULT_INDEX = DATA_DIR / "oui.bin"
+DEFAULT_REGISTRY = DATA_DIR / "oui.csv"
+
+PREFIX_BITS = (36, 28, 24)
+
+_MAGIC = b"OUI\0"
+_FORMAT = 1
+_HEADER = struct.Struct(">4sHxxI")
+_RECORD = struct.Struct(">QI")
+# Assignments from these blocks are listed under their own, longer prefixes
+_REGISTRAR = "IEEE Registration Authority"
+_MAX_NAME = 255
+
+
+def mac_to_int(mac: str) -> int | None:
+    """Parse ``aa:bb:cc:dd:ee:ff`` (or ``-``/``.`` separated, or bare hex) into an integer."""
+    digits = mac.replace(":", "").replace("-", "").replace(".", "")
+    if len(digits) != 12:
+        return None
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return None
+
+
+def _key(start: int, bits: int) -> int:
+    return start << 8 | bits
+
+
+def read_registry(path: Path) -> Iterable[tuple[int, int, str]]:
+    """Yield ``(prefix start, prefix bits, organization)`` from an IEEE registry CSV.
+
+    The MA-L, MA-M and MA-S downloads share the columns ``Registry``,
+    ``Assignment`` and ``Organization Name``; the prefix length follows from
+    the length of the hex assignment.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            assignment = (row.get("Assignment") or "").strip()
+            organization = " ".join((row.get("Organization Name") or "").split())
+            bits = len(assignment) * 4
+            if bits not in PREFIX_BITS or not organization or organization == _REGISTRAR:
+                continue
+            try:
+                prefix = int(assignment, 16)
+            except ValueError:
+                logger.debug(f"Skipping malformed assignment {assignment!r} in {path}")
+                continue
+            yield prefix << (48 - bits), bits, organization
+
+
+def build_index(entries: Iterable[tuple[int, int, str]]) -> bytes:
+    """Serialize ``(prefix start, prefix bits, organization)`` entries into an index."""
+    records = {_key(start, bits): name for start, bits, name in entries}
+    offsets: dict[str, int] = {}
+    names = bytearray()
+    table = bytearray()
+    for key in sorted(records):
+        name = records[key]
+        if name not in offsets:
+            encoded = name.encode("utf-8")[:_MAX_NAME]
+            offsets[name] = len(names)
+            names += bytes([len(encoded)]) + encoded
+        table += _RECORD.pack(key, offsets[name])
+    return _HEADER.pack(_MAGIC, _FORMAT, len(records)) + bytes(table) + bytes(names)
+
+
+def write_index(paths: Iterable[Path], output: Path = DEFAULT_INDEX) -> int:
+    """Build an index from registry CSV files; return the number of prefixes written."""
+    entries = [entry for path in paths for entry in read_registry(path)]
+    data = build_index(entries)
+    # Replace atomically: running processes may have the old table mapped.
+    temporary = output.with_suffix(output.suffix + ".tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, output)
+    return _HEADER.unpack_from(data)[2]
+
+
+class _Keys:
+    """The sorted record keys of a mapped index, as a sequence for ``bisect``."""
+
+    def __init__(self, data: mmap.mmap | bytes, count: int) -> None:
+        self.data = data
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        return _RECORD.unpack_from(self.data, _HEADER.size + index * _RECORD.size)[0]
+
+
+class VendorIndex:
+    """Longest-prefix MAC vendor lookup over a memory-mapped index file."""
+
+    def __init__(self, path: Path = DEFAULT_INDEX) -> None:
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._data)
+        if magic != _MAGIC or version != _FORMAT:
+            self._data.close()
+            raise ValueError(f"{path} is not a vendor index (format {_FORMAT})")
+        self._keys = _Keys(self._data, count)
+        self._names = _HEADER.size + count * _RECORD.size
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, mac: str) -> str | None:
+        """The organization a MAC address was assigned to, if any.
+
+        Locally administered addresses (randomized or virtual MACs) never
+        belong to a vendor.
+        """
+        value = mac_to_int(mac)
+        if value is None or value >> 40 & 0x02:
+            return None
+        for bits in PREFIX_BITS:
+            key = _key(value >> (48 - bits) << (48 - bits), bits)
+            index = bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                _, offset = _RECORD.unpack_from(self._data, _HEADER.size + index * _RECORD.size)
+                start = self._names + offset
+                return self._data[start + 1:start + 1 + self._data[start]].decode("utf-8", errors="replace")
+        return None
+
+    def lookup_many(self, macs: Iterable[str | None]) -> dict[str, str | None]:
+        """Look up a batch of MAC addresses, each distinct address once."""
+        return {mac: self.lookup(mac) for mac in dict.fromkeys(macs) if mac}
+
+    def close(self) -> None:
+        self._data.close()
+
+
+@lru_cache(maxsize=1)
+def load_default_index() -> VendorIndex | None:
+    """The bundled index, mapped once per process (None if it cannot be opened)."""
+    try:
+        return VendorIndex()
+    except (OSError, ValueError) as e:
+        logger.warning(f"MAC vendor index unavailable: {e}")
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the MAC vendor index from IEEE registry CSV files.")
+    parser.add_argument("registry", nargs="*", type=Path, default=[DEFAULT_REGISTRY],
+                        help="MA-L / MA-M / MA-S CSV files (default: the bundled seed registry)")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_INDEX, help="index file to write")
+    args = parser.parse_args(argv)
+    count = write_index(args.registry, args.output)
+    print(f"Wrote {count} prefixes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
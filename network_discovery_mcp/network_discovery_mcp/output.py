@@ -0,0 +1,140 @@
+"""Encoding, field projection and pagination of tool results."""
+
+import itertools
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+FORMAT_JSON = "json"
+FORMAT_COMPACT = "compact"
+FORMAT_TABLE = "table"
+FORMATS = (FORMAT_JSON, FORMAT_COMPACT, FORMAT_TABLE)
+
+# Stored result sets kept for pagination, and for how long (seconds)
+MAX_STORED_RESULTS = 16
+RESULT_TTL = 900.0
+
+
+def project(rows: list[dict[str, Any]], fields: list[str] | None) -> list[dict[str, Any]]:
+    """Keep only ``fields`` (in that order) of each row; all fields if None."""
+    if not fields:
+        return rows
+    return [{name: row.get(name) for name in fields} for row in rows]
+
+
+@dataclass
+class EncodedRows:
+    """Rows encoded once in a given format, ready to be sliced into pages."""
+    output_format: str
+    rows: list[str]
+    header: str | None = None
+
+    @classmethod
+    def encode(
+        cls, rows: list[dict[str, Any]], output_format: str = FORMAT_JSON, fields: list[str] | None = None
+    ) -> "EncodedRows":
+        """Encode each row on its own.
+
+        ``table`` is columnar: one header line with the column names, then
+        one compact JSON array per row.
+
+        Raises:
+            ValueError: If ``output_format`` is unknown.
+        """
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(FORMATS)})")
+        rows = project(rows, fields)
+        if output_format == FORMAT_TABLE:
+            columns = fields or list(dict.fromkeys(itertools.chain.from_iterable(rows)))
+            header = json.dumps(columns, separators=(",", ":"))
+            encoded = [json.dumps([row.get(name) for name in columns], separators=(",", ":")) for row in rows]
+            return cls(output_format, encoded, header)
+        if output_format == FORMAT_COMPACT:
+            return cls(output_format, [json.dumps(row, separators=(",", ":")) for row in rows])
+        return cls(output_format, [json.dumps(row, indent=2) for row in rows])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def render(self, start: int = 0, end: int | None = None) -> str:
+        """Join the rows in ``[start, end)`` into the text of one page."""
+        rows = self.rows[start:end]
+        if self.output_format == FORMAT_TABLE:
+            return "\n".join([self.header or "[]", *rows])
+        if self.output_format == FORMAT_COMPACT:
+            return "[" + ",".join(rows) + "]"
+        return "[\n" + ",\n".join(rows) + "\n]" if rows else "[]"
+
+
+@dataclass
+class _StoredResult:
+    summary: str
+    encoded: EncodedRows
+    page_size: int
+    created: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class Page:
+    """One page of a result set."""
+    summary: str
+    text: str
+    start: int
+    end: int
+    total: int
+    next_cursor: str | None
+
+
+class ResultStore:
+    """Keeps encoded result sets so later pages are slices, not re-encodings.
+
+    Cursors have the form ``<result id>:<offset>``. The least recently used
+    result set is dropped beyond ``max_results``, and any older than ``ttl``.
+    """
+
+    def __init__(self, max_results: int = MAX_STORED_RESULTS, ttl: float = RESULT_TTL) -> None:
+        self.max_results = max_results
+        self.ttl = ttl
+        self._results: OrderedDict[str, _StoredResult] = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def first_page(self, summary: str, encoded: EncodedRows, page_size: int | None = None) -> Page:
+        """Return the first page, storing the rest when there is more than one page."""
+        if page_size is None or page_size >= len(encoded):
+            return Page(summary, encoded.render(), 0, len(encoded), len(encoded), None)
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        self._expire()
+        result_id = f"r{next(self._ids)}"
+        self._results[result_id] = _StoredResult(summary, encoded, page_size)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        return self._page(result_id, 0)
+
+    def page(self, cursor: str) -> Page:
+        """Return the page a cursor points at.
+
+        Raises:
+            ValueError: If the cursor is malformed or its result set has expired.
+        """
+        result_id, _, offset = cursor.partition(":")
+        self._expire()
+        if result_id not in self._results or not offset.isdigit():
+            raise ValueError(f"Unknown or expired cursor: {cursor}")
+        self._results.move_to_end(result_id)
+        return self._page(result_id, int(offset))
+
+    def _page(self, result_id: str, start: int) -> Page:
+        stored = self._results[result_id]
+        total = len(stored.encoded)
+        end = min(total, start + stored.page_size)
+        next_cursor = f"{result_id}:{end}" if end < total else None
+        return Page(stored.summary, stored.encoded.render(start, end), start, end, total, next_cursor)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for result_id in [rid for rid, stored in self._results.items() if stored.created < cutoff]:
+            del self._results[result_id]
@@ -0,0 +1,567 @@
+"""Passive discovery from ARP, DHCP, mDNS, SSDP, LLMNR and NetBIOS broadcasts.
+
+Nothing is sent. A packet socket with a kernel (BPF) filter receives only
+the broadcast and multicast chatter hosts emit on their own; each batch of
+frames is parsed into sightings that update the device inventory. The same
+parser reads pcap files, so captures can be replayed at full speed.
+"""
+
+import asyncio
+import ctypes
+import itertools
+import logging
+import socket
+import struct
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from .inventory import DeviceInventory
+from .names import decode_netbios_name
+from .resolver import TYPE_A, TYPE_AAAA, decode_name, iter_records
+
+logger = logging.getLogger(__name__)
+
+ETH_P_ALL = 0x0003
+ETH_P_IP = 0x0800
+ETH_P_ARP = 0x0806
+ETH_P_8021Q = 0x8100
+ETH_P_IPV6 = 0x86DD
+
+PORT_DHCP_SERVER = 67
+PORT_DHCP_CLIENT = 68
+PORT_NETBIOS_NS = 137
+PORT_NETBIOS_DGM = 138
+PORT_SSDP = 1900
+PORT_MDNS = 5353
+PORT_LLMNR = 5355
+PASSIVE_PORTS = (
+    PORT_DHCP_SERVER, PORT_DHCP_CLIENT, PORT_NETBIOS_NS, PORT_NETBIOS_DGM, PORT_SSDP, PORT_MDNS, PORT_LLMNR
+)
+
+# Frames parsed and stored together
+BATCH_SIZE = 256
+
+SO_ATTACH_FILTER = 26
+PACKET_OUTGOING = 4
+
+# Classic BPF opcodes (linux/filter.h)
+_LDH_ABS = 0x28
+_LDB_ABS = 0x30
+_LDH_IND = 0x48
+_LDXB_MSH = 0xB1
+_JEQ = 0x15
+_JSET = 0x45
+_RET = 0x06
+_SNAPLEN = 0xFFFF
+_INSTRUCTION = struct.Struct("HBBI")
+
+PCAP_MAGIC = 0xA1B2C3D4
+PCAP_MAGIC_NS = 0xA1B23C4D
+LINKTYPE_ETHERNET = 1
+_PCAP_RECORD = struct.Struct("IIII")
+
+_DHCP_MAGIC = b"\x63\x82\x53\x63"
+_DHCP_REQUEST = 3
+_EMPTY_MAC = "00:00:00:00:00:00"
+_UNSPECIFIED = ("0.0.0.0", "::")
+# NBNS opcodes whose question names the sender: registration, refresh, multi-homed registration
+_NBNS_CLAIMS = {5, 8, 9, 15}
+_NB_GROUP = 0x8000
+
+
+@dataclass
+class Sighting:
+    """What one packet revealed about a host."""
+    protocol: str
+    ip_address: str | None
+    mac_address: str | None = None
+    hostname: str | None = None
+    # Self-description: DHCP vendor class or SSDP server string
+    vendor_hint: str | None = None
+
+
+def build_filter(ports: Iterable[int] = PASSIVE_PORTS) -> list[tuple[int, int, int, int]]:
+    """Classic BPF program accepting ARP, and IPv4/IPv6 UDP from or to ``ports``.
+
+    Frames may carry one 802.1Q VLAN tag. IPv4 fragments after the first are
+    rejected since they carry no ports.
+    """
+    ports = list(ports)
+
+    def port_checks(last_miss: str | int) -> list[tuple[int, str | int, str | int, int]]:
+        checks: list[tuple[int, str | int, str | int, int]] = [(_JEQ, "accept", 0, port) for port in ports]
+        checks[-1] = (_JEQ, "accept", last_miss, ports[-1])
+        return checks
+
+    def network_layer(start: int, tag: str) -> list[Any]:
+        """Checks on the ethertype just loaded, for a network header at ``start``."""
+        return [
+            (_JEQ, "accept", 0, ETH_P_ARP),
+            (_JEQ, f"ipv4{tag}", 0, ETH_P_IP),
+            (_JEQ, f"ipv6{tag}", "reject", ETH_P_IPV6),
+            f"ipv4{tag}",
+            (_LDB_ABS, 0, 0, start + 9),
+            (_JEQ, 0, "reject", socket.IPPROTO_UDP),
+            (_LDH_ABS, 0, 0, start + 6),
+            (_JSET, "reject", 0, 0x1FFF),
+            (_LDXB_MSH, 0, 0, start),
+            (_LDH_IND, 0, 0, start),
+            *port_checks(0),
+            (_LDH_IND, 0, 0, start + 2),
+            *port_checks("reject"),
+            f"ipv6{tag}",
+            (_LDB_ABS, 0, 0, start + 6),
+            (_JEQ, 0, "reject", socket.IPPROTO_UDP),
+            (_LDH_ABS, 0, 0, start + 40),
+            *port_checks(0),
+            (_LDH_ABS, 0, 0, start + 42),
+            *port_checks("reject"),
+        ]
+
+    program: list[Any] = [
+        (_LDH_ABS, 0, 0, 12),
+        (_JEQ, "vlan", 0, ETH_P_8021Q),
+        *network_layer(14, ""),
+        "vlan",
+        (_LDH_ABS, 0, 0, 16),
+        *network_layer(18, "_vlan"),
+        "reject",
+        (_RET, 0, 0, 0),
+        "accept",
+        (_RET, 0, 0, _SNAPLEN),
+    ]
+
+    # Resolve labels into the relative jump offsets BPF uses.
+    labels: dict[str, int] = {}
+    instructions = []
+    for item in program:
+        if isinstance(item, str):
+            labels[item] = len(instructions)
+        else:
+            instructions.append(item)
+    resolved = []
+    for index, (code, jt, jf, k) in enumerate(instructions):
+        jt = labels[jt] - index - 1 if isinstance(jt, str) else jt
+        jf = labels[jf] - index - 1 if isinstance(jf, str) else jf
+        resolved.append((code, jt, jf, k))
+    return resolved
+
+
+def attach_filter(sock: socket.socket, program: list[tuple[int, int, int, int]]) -> None:
+    """Attach a classic BPF program to ``sock`` (SO_ATTACH_FILTER)."""
+    instructions = ctypes.create_string_buffer(b"".join(_INSTRUCTION.pack(*insn) for insn in program))
+    # struct sock_fprog; the kernel copies the program before setsockopt returns.
+    fprog = struct.pack("HP", len(program), ctypes.addressof(instructions))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+
+def open_capture(interface: str | None = None) -> socket.socket:
+    """Open a non-blocking packet socket receiving only what ``build_filter`` accepts.
+
+    Raises:
+        OSError: If packet sockets are unavailable or not permitted (CAP_NET_RAW).
+    """
+    if not hasattr(socket, "AF_PACKET"):
+        raise OSError("packet sockets are not supported on this platform")
+    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+    try:
+        attach_filter(sock, build_filter())
+        if interface:
+            sock.bind((interface, ETH_P_ALL))
+        sock.setblocking(False)
+        # Frames queued before the filter was attached were not filtered.
+        while True:
+            sock.recv(65535)
+    except BlockingIOError:
+        return sock
+    except OSError:
+        sock.close()
+        raise
+
+
+def _mac(data: bytes) -> str | None:
+    mac = ":".join(f"{b:02x}" for b in data)
+    return None if mac == _EMPTY_MAC else mac
+
+
+def _parse_arp(frame: bytes, offset: int) -> list[Sighting]:
+    hardware, protocol, hlen, plen, _ = struct.unpack_from("!HHBBH", frame, offset)
+    if hardware != 1 or protocol != ETH_P_IP or hlen != 6 or plen != 4:
+        return []
+    sender_ip = socket.inet_ntoa(frame[offset + 14:offset + 18])
+    if sender_ip in _UNSPECIFIED:
+        # Address probes (RFC 5227) do not claim an address yet.
+        return []
+    return [Sighting("arp", sender_ip, _mac(frame[offset + 8:offset + 14]))]
+
+
+def _parse_dhcp(payload: bytes, sender: Sighting) -> list[Sighting]:
+    if len(payload) < 240 or payload[236:240] != _DHCP_MAGIC or payload[1] != 1 or payload[2] != 6:
+        return [sender]
+    op = payload[0]
+    client = Sighting("dhcp", None, _mac(payload[28:34]))
+    options: dict[int, bytes] = {}
+    offset = 240
+    while offset < len(payload) and payload[offset] != 0xFF:
+        code = payload[offset]
+        if code == 0:
+            offset += 1
+            continue
+        length = payload[offset + 1]
+        options[code] = payload[offset + 2:offset + 2 + length]
+        offset += 2 + length
+
+    ciaddr = socket.inet_ntoa(payload[12:16])
+    yiaddr = socket.inet_ntoa(payload[16:20])
+    if op == 2:
+        # Server reply: yiaddr is the client's (new) address.
+        client.ip_address = yiaddr if yiaddr not in _UNSPECIFIED else None
+    elif ciaddr not in _UNSPECIFIED:
+        client.ip_address = ciaddr
+    elif options.get(53) == bytes([_DHCP_REQUEST]) and len(options.get(50, b"")) == 4:
+        client.ip_address = socket.inet_ntoa(options[50])
+    if 12 in options:
+        client.hostname = options[12].decode("ascii", errors="replace").strip("\x00") or None
+    if 60 in options:
+        client.vendor_hint = options[60].decode("ascii", errors="replace").strip("\x00") or None
+
+    found = [client]
+    if sender.ip_address is not None and sender.mac_address != client.mac_address:
+        found.append(sender)
+    return found
+
+
+def _parse_dns(payload: bytes, sender: Sighting) -> list[Sighting]:
+    """mDNS and LLMNR: address records in responses name the hosts they point at.
+
+    Records sharing a name with the sender's own address belong to the
+    sender too (e.g. its IPv6 addresses), so they get its MAC.
+    """
+    found = [sender]
+    if len(payload) < 12 or not payload[2] & 0x80:
+        return found
+    addresses = []
+    for record in iter_records(payload):
+        if record.rtype == TYPE_A and record.length == 4:
+            family = socket.AF_INET
+        elif record.rtype == TYPE_AAAA and record.length == 16:
+            family = socket.AF_INET6
+        else:
+            continue
+        address = socket.inet_ntop(family, payload[record.offset:record.offset + record.length])
+        addresses.append((record.name.rstrip("."), address))
+
+    own_names = {name for name, address in addresses if address == sender.ip_address}
+    for name, address in addresses:
+        mac = sender.mac_address if name in own_names else None
+        found.append(Sighting(sender.protocol, address, mac, name or None))
+    return found
+
+
+def _parse_ssdp(payload: bytes, sender: Sighting) -> list[Sighting]:
+    """SSDP announcements and searches name the sender's software in SERVER / USER-AGENT."""
+    for line in payload.decode("utf-8", errors="replace").split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().upper() in ("SERVER", "USER-AGENT") and value.strip():
+            sender.vendor_hint = value.strip()[:120]
+            break
+    return [sender]
+
+
+def _parse_nbns(payload: bytes, sender: Sighting) -> list[Sighting]:
+    """NetBIOS name registrations and positive query responses map names to addresses."""
+    found = [sender]
+    if len(payload) < 12:
+        return found
+    flags = struct.unpack_from("!H", payload, 2)[0]
+    opcode = (flags >> 11) & 0x0F
+    is_response = bool(flags & 0x8000)
+    if is_response and opcode != 0 or not is_response and opcode not in _NBNS_CLAIMS:
+        return found
+
+    for record in iter_records(payload):
+        decoded = decode_netbios_name(record.name)
+        # NB records: (flags, address) pairs; suffixes 0x00/0x20 name the machine itself.
+        if decoded is None or decoded[1] not in (0x00, 0x20) or record.length < 6:
+            continue
+        nb_flags = struct.unpack_from("!H", payload, record.offset)[0]
+        if nb_flags & _NB_GROUP:
+            continue
+        address = socket.inet_ntoa(payload[record.offset + 2:record.offset + 6])
+        mac = sender.mac_address if address == sender.ip_address else None
+        found.append(Sighting("netbios", address, mac, decoded[0] or None))
+    return found
+
+
+def _parse_nbdgm(payload: bytes, sender: Sighting) -> list[Sighting]:
+    """NetBIOS datagrams (browser announcements and the like) carry the source name."""
+    if len(payload) < 14 or payload[0] not in (0x10, 0x11, 0x12):
+        return [sender]
+    address = socket.inet_ntoa(payload[4:8])
+    decoded = decode_netbios_name(decode_name(payload, 14)[0])
+    if decoded is None or decoded[1] not in (0x00, 0x20):
+        return [sender]
+    mac = sender.mac_address if address == sender.ip_address else None
+    return [sender, Sighting("netbios", address, mac, decoded[0] or None)]
+
+
+_UDP_PARSERS = {
+    PORT_DHCP_SERVER: ("dhcp", _parse_dhcp),
+    PORT_DHCP_CLIENT: ("dhcp", _parse_dhcp),
+    PORT_NETBIOS_NS: ("netbios", _parse_nbns),
+    PORT_NETBIOS_DGM: ("netbios", _parse_nbdgm),
+    PORT_SSDP: ("ssdp", _parse_ssdp),
+    PORT_MDNS: ("mdns", _parse_dns),
+    PORT_LLMNR: ("llmnr", _parse_dns),
+}
+
+
+def _parse_frame(frame: bytes) -> list[Sighting]:
+    if len(frame) < 14:
+        return []
+    source_mac = _mac(frame[6:12])
+    ethertype = struct.unpack_from("!H", frame, 12)[0]
+    offset = 14
+    if ethertype == ETH_P_8021Q:
+        ethertype = struct.unpack_from("!H", frame, 16)[0]
+        offset = 18
+
+    if ethertype == ETH_P_ARP:
+        return _parse_arp(frame, offset)
+    if ethertype == ETH_P_IP:
+        flags_fragment = struct.unpack_from("!H", frame, offset + 6)[0]
+        if frame[offset + 9] != socket.IPPROTO_UDP or flags_fragment & 0x1FFF:
+            return []
+        source_ip = socket.inet_ntop(socket.AF_INET, frame[offset + 12:offset + 16])
+        udp = offset + (frame[offset] & 0x0F) * 4
+    elif ethertype == ETH_P_IPV6:
+        if frame[offset + 6] != socket.IPPROTO_UDP:
+            return []
+        source_ip = socket.inet_ntop(socket.AF_INET6, frame[offset + 8:offset + 24])
+        udp = offset + 40
+    else:
+        return []
+
+    source_port, destination_port, length = struct.unpack_from("!HHH", frame, udp)
+    entry = _UDP_PARSERS.get(destination_port) or _UDP_PARSERS.get(source_port)
+    if entry is None:
+        return []
+    protocol, parser = entry
+    sender = Sighting(protocol, None if source_ip in _UNSPECIFIED else source_ip, source_mac)
+    sightings = parser(frame[udp + 8:udp + max(length, 8)], sender)
+    return [s for s in sightings if s.ip_address is not None or s.mac_address is not None]
+
+
+def parse_frame(frame: bytes) -> list[Sighting]:
+    """Decode one Ethernet frame into sightings; anything malformed or uninteresting gives none."""
+    try:
+        return _parse_frame(frame)
+    except (struct.error, IndexError, ValueError) as e:
+        logger.debug(f"Skipping malformed frame: {e}")
+        return []
+
+
+def parse_frames(frames: Iterable[bytes]) -> list[Sighting]:
+    """Decode a batch of frames."""
+    return [sighting for frame in frames for sighting in parse_frame(frame)]
+
+
+def apply_sightings(inventory: DeviceInventory, sightings: list[Sighting]) -> list[Any]:
+    """Merge sightings into the inventory in one transaction; return the devices touched.
+
+    IPv4 sightings are keyed by address. IPv6 addresses and address-less
+    sightings attach to the device with the same MAC, preferring its IPv4
+    record. Names and vendor hints only fill fields that are still empty; a
+    new MAC for a known address replaces the old one and clears its vendor.
+    """
+    from .scanner import NetworkDevice, _ipv6_preference
+
+    touched: dict[str, NetworkDevice] = {}
+    by_mac: dict[str, NetworkDevice] = {}
+
+    def device_for(sighting: Sighting) -> NetworkDevice | None:
+        ip_address, mac = sighting.ip_address, sighting.mac_address
+        if ip_address is not None and ":" not in ip_address:
+            return touched.get(ip_address) or inventory.get(ip_address) or NetworkDevice(ip_address, mac)
+        if mac is not None:
+            if mac in by_mac:
+                return by_mac[mac]
+            known = sorted(inventory.by_mac(mac), key=lambda device: ":" in device.ip_address)
+            if known:
+                return touched.get(known[0].ip_address, known[0])
+        if ip_address is not None:
+            return touched.get(ip_address) or inventory.get(ip_address) or NetworkDevice(ip_address, mac)
+        return None
+
+    for sighting in sightings:
+        device = device_for(sighting)
+        if device is None:
+            continue
+        if sighting.ip_address and ":" in sighting.ip_address and sighting.ip_address not in device.ipv6_addresses:
+            device.ipv6_addresses = sorted([*device.ipv6_addresses, sighting.ip_address], key=_ipv6_preference)
+        if sighting.mac_address and sighting.mac_address != device.mac_address:
+            if device.mac_address:
+                # The address moved to another host (e.g. a new DHCP lease).
+                device.vendor = device.vendor_hint = None
+            device.mac_address = sighting.mac_address
+        if sighting.hostname and not device.hostname:
+            device.hostname = sighting.hostname
+            device.mark_refreshed("hostname")
+        if sighting.vendor_hint and not device.vendor_hint:
+            device.vendor_hint = sighting.vendor_hint
+        device.last_seen = time.time()
+        device.online = True
+        device.mark_refreshed("liveness")
+        touched[device.ip_address] = device
+        if device.mac_address:
+            by_mac.setdefault(device.mac_address, device)
+
+    inventory.put_many(touched.values())
+    return list(touched.values())
+
+
+def read_pcap(path: str) -> Iterator[bytes]:
+    """Yield the frames of a classic pcap capture of Ethernet traffic.
+
+    Raises:
+        ValueError: If the file is not pcap or its link type is not Ethernet.
+    """
+    with open(path, "rb") as f:
+        header = f.read(24)
+        if len(header) < 24:
+            raise ValueError(f"{path}: not a pcap file")
+        for endian in ("<", ">"):
+            if struct.unpack_from(f"{endian}I", header)[0] in (PCAP_MAGIC, PCAP_MAGIC_NS):
+                break
+        else:
+            raise ValueError(f"{path}: not a pcap file")
+        linktype = struct.unpack_from(f"{endian}I", header, 20)[0]
+        if linktype & 0x0FFFFFFF != LINKTYPE_ETHERNET:
+            raise ValueError(f"{path}: link type {linktype} is not Ethernet")
+
+        record = struct.Struct(endian + _PCAP_RECORD.format)
+        while len(record_header := f.read(record.size)) == record.size:
+            captured = record.unpack(record_header)[2]
+            frame = f.read(captured)
+            if len(frame) < captured:
+                return
+            yield frame
+
+
+def write_pcap(path: str, frames: Iterable[bytes]) -> None:
+    """Write frames to a classic (microsecond) pcap file."""
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", PCAP_MAGIC, 2, 4, 0, 0, _SNAPLEN, LINKTYPE_ETHERNET))
+        for frame in frames:
+            now = time.time()
+            f.write(_PCAP_RECORD.pack(int(now), int(now % 1 * 1e6), len(frame), len(frame)))
+            f.write(frame)
+
+
+def _batched(frames: Iterable[bytes], size: int) -> Iterator[list[bytes]]:
+    iterator = iter(frames)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+@dataclass
+class ReplayStats:
+    """Throughput of one pcap replay."""
+    packets: int
+    sightings: int
+    devices: int
+    seconds: float
+
+    @property
+    def packets_per_second(self) -> float:
+        return self.packets / self.seconds if self.seconds else 0.0
+
+
+def replay_pcap(path: str, inventory: DeviceInventory, batch_size: int = BATCH_SIZE) -> ReplayStats:
+    """Feed a capture through the passive parser as fast as it can be read."""
+    started = time.perf_counter()
+    packets = sightings = 0
+    devices: set[str] = set()
+    for batch in _batched(read_pcap(path), batch_size):
+        found = parse_frames(batch)
+        packets += len(batch)
+        sightings += len(found)
+        devices.update(device.ip_address for device in apply_sightings(inventory, found))
+    return ReplayStats(packets, sightings, len(devices), time.perf_counter() - started)
+
+
+class PassiveListener:
+    """Feeds the device inventory from broadcast and multicast traffic without sending anything.
+
+    Frames are read from a BPF-filtered packet socket (Linux, CAP_NET_RAW)
+    and parsed and stored ``batch_size`` at a time. Our own outgoing frames
+    are ignored.
+    """
+
+    def __init__(self, inventory: DeviceInventory, interface: str | None = None, batch_size: int = BATCH_SIZE) -> None:
+        self.inventory = inventory
+        self.interface = interface
+        self.batch_size = batch_size
+        self.packets = 0
+        self.sightings = 0
+        self._sock: socket.socket | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._sock is not None
+
+    def start(self) -> None:
+        """Start listening (no-op if already listening).
+
+        Raises:
+            OSError: If the packet socket cannot be opened.
+        """
+        if self._sock is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._sock = open_capture(self.interface)
+        self._loop = loop
+        loop.add_reader(self._sock.fileno(), self._on_readable)
+        logger.info(f"Listening passively on {self.interface or 'all interfaces'}")
+
+    def close(self) -> None:
+        if self._sock is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        self._loop = None
+
+    def ingest(self, frames: list[bytes]) -> list[Any]:
+        """Parse a batch of frames and store what they reveal."""
+        sightings = parse_frames(frames)
+        self.packets += len(frames)
+        self.sightings += len(sightings)
+        return apply_sightings(self.inventory, sightings) if sightings else []
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "interface": self.interface,
+            "packets": self.packets,
+            "sightings": self.sightings,
+        }
+
+    def _on_readable(self) -> None:
+        frames = []
+        while self._sock is not None and len(frames) < self.batch_size:
+            try:
+                frame, address = self._sock.recvfrom(65535)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                logger.debug(f"Passive capture receive error: {e}")
+                break
+            if address[2] != PACKET_OUTGOING:
+                frames.append(frame)
+        if frames:
+            self.ingest(frames)
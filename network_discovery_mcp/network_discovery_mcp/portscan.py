@@ -0,0 +1,152 @@
+"""Lightweight TCP connect-scan engine built on non-blocking sockets."""
+
+import asyncio
+import errno
+import ipaddress
+import os
+import socket
+import struct
+import time
+from collections.abc import Iterable
+from typing import NamedTuple
+
+PORT_OPEN = "open"
+PORT_CLOSED = "closed"
+PORT_FILTERED = "filtered"
+
+# Reset instead of FIN on close so probes leave nothing in TIME_WAIT.
+_LINGER_RESET = struct.pack("ii", 1, 0)
+
+# Errors that mean the port could not be reached: ICMP unreachable, local
+# firewall rejects and kernel-level connect timeouts
+_FILTERED_ERRNOS = {errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EACCES, errno.EPERM, errno.ETIMEDOUT}
+_IN_PROGRESS_ERRNOS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN}
+
+# Bytes read from a service that speaks first (or answers a probe payload)
+BANNER_SIZE = 1024
+
+
+class PortProbeResult(NamedTuple):
+    """Outcome of one connect probe."""
+    state: str
+    rtt: float | None = None
+    banner: bytes = b""
+
+
+def parse_port_spec(spec: str | Iterable[int]) -> list[int]:
+    """Expand a port spec such as ``"1-1024,8080"`` into a sorted list of ports.
+
+    Raises:
+        ValueError: If the spec is malformed or a port is outside 1-65535.
+    """
+    if isinstance(spec, str):
+        ports: set[int] = set()
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                low, _, high = part.partition("-")
+                start, end = int(low), int(high)
+                if start > end:
+                    raise ValueError(f"Invalid port range: {part}")
+                ports.update(range(start, end + 1))
+            else:
+                ports.add(int(part))
+    else:
+        ports = {int(port) for port in spec}
+
+    invalid = [port for port in ports if not 1 <= port <= 65535]
+    if invalid:
+        raise ValueError(f"Ports out of range: {sorted(invalid)[:5]}")
+    return sorted(ports)
+
+
+async def resolve_target(host: str) -> tuple[int, str]:
+    """Resolve ``host`` once to the ``(family, address)`` every probe will use."""
+    try:
+        ip = ipaddress.ip_address(host)
+        return (socket.AF_INET if ip.version == 4 else socket.AF_INET6), str(ip)
+    except ValueError:
+        pass
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    family, _, _, _, sockaddr = infos[0]
+    return family, sockaddr[0]
+
+
+def _resolve_waiter(waiter: asyncio.Future[bool], ready: bool) -> None:
+    if not waiter.done():
+        waiter.set_result(ready)
+
+
+async def _wait_ready(loop: asyncio.AbstractEventLoop, fd: int, timeout: float, write: bool) -> bool:
+    """Wait until ``fd`` is writable (or readable); False if ``timeout`` passes first."""
+    waiter: asyncio.Future[bool] = loop.create_future()
+    if write:
+        loop.add_writer(fd, _resolve_waiter, waiter, True)
+    else:
+        loop.add_reader(fd, _resolve_waiter, waiter, True)
+    timer = loop.call_later(timeout, _resolve_waiter, waiter, False)
+    try:
+        return await waiter
+    finally:
+        if write:
+            loop.remove_writer(fd)
+        else:
+            loop.remove_reader(fd)
+        timer.cancel()
+
+
+async def connect_probe(
+    family: int,
+    address: str,
+    port: int,
+    timeout: float,
+    banner_window: float = 0.0,
+    payload: bytes = b"",
+) -> PortProbeResult:
+    """Probe one port with a bare non-blocking connect and classify the result.
+
+    This is what ``loop.sock_connect`` does internally, minus the per-call
+    task that ``asyncio.wait_for`` would add: the connect is started with
+    ``connect_ex`` and completion is awaited through a writer callback and a
+    timer on the loop. With a ``banner_window`` the open socket is kept for
+    that long to capture whatever the service sends first, or its reply to
+    ``payload`` if one is given.
+    """
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+        started = time.monotonic()
+        error = sock.connect_ex((address, port))
+
+        if error in _IN_PROGRESS_ERRNOS:
+            if not await _wait_ready(loop, sock.fileno(), timeout, write=True):
+                return PortProbeResult(PORT_FILTERED)
+            error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        rtt = time.monotonic() - started
+
+        if error == errno.ECONNREFUSED:
+            return PortProbeResult(PORT_CLOSED, rtt)
+        if error in _FILTERED_ERRNOS:
+            return PortProbeResult(PORT_FILTERED)
+        if error:
+            raise OSError(error, os.strerror(error))
+
+        banner = b""
+        if payload:
+            try:
+                sock.send(payload)
+            except OSError:
+                return PortProbeResult(PORT_OPEN, rtt)
+        if banner_window > 0 and await _wait_ready(loop, sock.fileno(), banner_window, write=False):
+            try:
+                banner = sock.recv(BANNER_SIZE)
+            except OSError:
+                pass
+        return PortProbeResult(PORT_OPEN, rtt, banner)
+    finally:
+        sock.close()
@@ -0,0 +1,349 @@
+"""Non-blocking reverse DNS (PTR) resolver with a shared TTL cache."""
+
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+import struct
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+
+from .metrics import ScannerMetrics
+
+logger = logging.getLogger(__name__)
+
+RESOLV_CONF = "/etc/resolv.conf"
+
+DNS_PORT = 53
+TYPE_A = 1
+TYPE_PTR = 12
+TYPE_AAAA = 28
+CLASS_IN = 1
+RCODE_NXDOMAIN = 3
+
+_HEADER = struct.Struct("!HHHHHH")
+_RR = struct.Struct("!HHIH")
+
+
+def read_nameservers(path: str = RESOLV_CONF) -> list[str]:
+    """Return the IPv4 nameservers listed in a resolv.conf file."""
+    servers = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    try:
+                        servers.append(str(ipaddress.IPv4Address(fields[1])))
+                    except ValueError:
+                        continue
+    except OSError as e:
+        logger.debug(f"Cannot read {path}: {e}")
+    return servers
+
+
+def encode_name(name: str) -> bytes:
+    """Encode a dotted domain name in DNS wire format."""
+    labels = [label.encode("ascii") for label in name.rstrip(".").split(".") if label]
+    return b"".join(bytes([len(label)]) + label for label in labels) + b"\x00"
+
+
+def decode_name(message: bytes, offset: int) -> tuple[str, int]:
+    """Decode a (possibly compressed) name; return it and the offset after it."""
+    labels = []
+    end = None
+    for _ in range(128):
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(message[offset:offset + length].decode("ascii", errors="replace"))
+        offset += length
+    else:
+        raise ValueError("DNS name compression loop")
+    return ".".join(labels), end if end is not None else offset
+
+
+class ResourceRecord(NamedTuple):
+    """One resource record; its data is ``message[offset:offset + length]``."""
+    name: str
+    rtype: int
+    rclass: int
+    ttl: int
+    offset: int
+    length: int
+
+
+def iter_records(message: bytes) -> Iterator[ResourceRecord]:
+    """Yield the answer, authority and additional records of a DNS-format message."""
+    _, _, qdcount, ancount, nscount, arcount = _HEADER.unpack_from(message)
+    offset = _HEADER.size
+    for _ in range(qdcount):
+        _, offset = decode_name(message, offset)
+        offset += 4
+
+    for _ in range(ancount + nscount + arcount):
+        name, offset = decode_name(message, offset)
+        rtype, rclass, ttl, rdlength = _RR.unpack_from(message, offset)
+        offset += _RR.size
+        if offset + rdlength > len(message):
+            raise ValueError("DNS record runs past the end of the message")
+        yield ResourceRecord(name, rtype, rclass, ttl, offset, rdlength)
+        offset += rdlength
+
+
+def build_query(query_id: int, name: str, qtype: int = TYPE_PTR, flags: int = 0x0100) -> bytes:
+    """Build a single-question query (recursion desired unless ``flags`` says otherwise)."""
+    return _HEADER.pack(query_id, flags, 1, 0, 0, 0) + encode_name(name) + struct.pack("!HH", qtype, CLASS_IN)
+
+
+def parse_ptr_response(message: bytes) -> tuple[int, int, str | None, int]:
+    """Parse a PTR response into ``(query_id, rcode, hostname, ttl)``."""
+    query_id, flags, qdcount, ancount, _, _ = _HEADER.unpack_from(message)
+    offset = _HEADER.size
+    for _ in range(qdcount):
+        _, offset = decode_name(message, offset)
+        offset += 4
+
+    for _ in range(ancount):
+        _, offset = decode_name(message, offset)
+        rtype, rclass, ttl, rdlength = _RR.unpack_from(message, offset)
+        offset += _RR.size
+        if rtype == TYPE_PTR and rclass == CLASS_IN:
+            hostname, _ = decode_name(message, offset)
+            return query_id, flags & 0x0F, hostname, ttl
+        offset += rdlength
+
+    return query_id, flags & 0x0F, None, 0
+
+
+def _question_name(message: bytes) -> str | None:
+    """The (lowercased) name asked about by a single-question message, if it is one."""
+    try:
+        qdcount = _HEADER.unpack_from(message)[2]
+        if qdcount != 1:
+            return None
+        name, _ = decode_name(message, _HEADER.size)
+    except (ValueError, IndexError, struct.error):
+        return None
+    return name.lower()
+
+
+class ReverseResolver:
+    """Resolve PTR records concurrently without blocking the event loop.
+
+    Queries go out over one shared non-blocking UDP socket, bounded by ``concurrency``.
+    Positive answers are cached for the record TTL (clamped to
+    ``[min_ttl, max_ttl]``) and failures - NXDOMAIN, empty answers and
+    timeouts - for ``negative_ttl``. The cache is LRU-bounded to
+    ``max_entries`` and is shared by every caller of the resolver.
+    """
+
+    def __init__(
+        self,
+        nameservers: list[str] | None = None,
+        port: int = DNS_PORT,
+        concurrency: int = 64,
+        timeout: float = 1.0,
+        attempts: int = 2,
+        min_ttl: float = 30.0,
+        max_ttl: float = 3600.0,
+        negative_ttl: float = 300.0,
+        max_entries: int = 4096,
+        metrics: ScannerMetrics | None = None,
+    ) -> None:
+        self.nameservers = read_nameservers() if nameservers is None else nameservers
+        self.port = port
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.attempts = attempts
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.metrics = metrics or ScannerMetrics(enabled=False)
+
+        self._cache: OrderedDict[str, tuple[float, str | None]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[str | None]] = {}
+        # Query ID -> (response future, nameserver address, question name)
+        self._pending: dict[int, tuple[asyncio.Future[bytes], tuple[str, int], str]] = {}
+        self._sock: socket.socket | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def cached(self, ip_address: str) -> tuple[bool, str | None]:
+        """Return ``(hit, hostname)`` from the cache without querying."""
+        entry = self._cache.get(ip_address)
+        if entry is None:
+            return False, None
+        expires, hostname = entry
+        if expires <= time.monotonic():
+            del self._cache[ip_address]
+            return False, None
+        self._cache.move_to_end(ip_address)
+        return True, hostname
+
+    async def resolve(self, ip_address: str) -> str | None:
+        """Return the PTR hostname for an address, or None if it has none."""
+        hit, hostname = self.cached(ip_address)
+        if hit:
+            return hostname
+
+        # Concurrent callers for the same address share one query.
+        inflight = self._inflight.get(ip_address)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[str | None] = asyncio.get_running_loop().create_future()
+        self._inflight[ip_address] = future
+        try:
+            hostname, ttl = await self._lookup(ip_address)
+            self._store(ip_address, hostname, ttl)
+            future.set_result(hostname)
+            return hostname
+        except BaseException:
+            # The owning lookup was cancelled; waiters get an uncached miss.
+            future.set_result(None)
+            raise
+        finally:
+            del self._inflight[ip_address]
+
+    async def resolve_many(self, ip_addresses: Iterable[str]) -> dict[str, str | None]:
+        """Resolve a batch of addresses concurrently."""
+        unique = list(dict.fromkeys(ip_addresses))
+        results = await asyncio.gather(*(self.resolve(ip) for ip in unique), return_exceptions=True)
+        return {
+            ip: result if isinstance(result, str) else None
+            for ip, result in zip(unique, results, strict=True)
+        }
+
+    def close(self) -> None:
+        """Close the shared socket."""
+        if self._sock is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        self._loop = None
+        self._semaphore = None
+
+    def _store(self, ip_address: str, hostname: str | None, ttl: float) -> None:
+        if hostname is None:
+            ttl = self.negative_ttl
+        else:
+            ttl = max(self.min_ttl, min(ttl, self.max_ttl))
+        self._cache[ip_address] = (time.monotonic() + ttl, hostname)
+        self._cache.move_to_end(ip_address)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _open(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._sock is not None and self._loop is loop:
+            return
+        self.close()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("0.0.0.0", 0))
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        loop.add_reader(sock.fileno(), self._on_readable)
+
+    def _on_readable(self) -> None:
+        """Dispatch every queued response to the query it answers.
+
+        A response must carry the query's ID, come from the nameserver that
+        was asked and repeat its question; anything else is dropped.
+        """
+        sock = self._sock
+        while sock is not None:
+            try:
+                data, source = sock.recvfrom(4096)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # ICMP port unreachable from a dead nameserver surfaces here.
+                logger.debug(f"DNS receive failed: {e}")
+                return
+            if len(data) < _HEADER.size:
+                continue
+            (query_id,) = struct.unpack_from("!H", data)
+            entry = self._pending.get(query_id)
+            if entry is None:
+                continue
+            future, server, name = entry
+            if source != server or _question_name(data) != name:
+                logger.debug(f"Dropped DNS response from {source[0]} that does not match query {query_id}")
+                continue
+            if not future.done():
+                future.set_result(data)
+
+    async def _lookup(self, ip_address: str) -> tuple[str | None, float]:
+        try:
+            name = ipaddress.ip_address(ip_address).reverse_pointer
+        except ValueError:
+            return None, 0
+
+        if not self.nameservers:
+            return await self._lookup_system(ip_address), self.min_ttl
+
+        self._open()
+        assert self._semaphore is not None
+        async with self._semaphore:
+            with self.metrics.phase("dns") as timer:
+                answered = False
+                for attempt in range(self.attempts):
+                    if attempt:
+                        timer.retried()
+                    server = self.nameservers[attempt % len(self.nameservers)]
+                    response = await self._query(server, name)
+                    if response is None:
+                        continue
+                    answered = True
+                    try:
+                        _, rcode, hostname, ttl = parse_ptr_response(response)
+                    except (ValueError, IndexError, struct.error) as e:
+                        logger.debug(f"Malformed PTR response for {ip_address}: {e}")
+                        continue
+                    if rcode in (0, RCODE_NXDOMAIN):
+                        return hostname, ttl
+                if not answered:
+                    timer.timed_out()
+        return None, 0
+
+    async def _query(self, server: str, name: str) -> bytes | None:
+        assert self._sock is not None and self._loop is not None
+        query_id = random.getrandbits(16)
+        while query_id in self._pending:
+            query_id = random.getrandbits(16)
+
+        future: asyncio.Future[bytes] = self._loop.create_future()
+        self._pending[query_id] = (future, (server, self.port), name)
+        try:
+            self._sock.sendto(build_query(query_id, name), (server, self.port))
+            return await asyncio.wait_for(future, self.timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            del self._pending[query_id]
+
+    async def _lookup_system(self, ip_address: str) -> str | None:
+        """Fall back to the system resolver, run off the event loop."""
+        loop = asyncio.get_running_loop()
+        try:
+            hostname, _ = await asyncio.wait_for(
+                loop.getnameinfo((ip_address, 0), socket.NI_NAMEREQD), self.timeout * self.attempts
+            )
+        except (asyncio.TimeoutError, OSError):
+            return None
+        return hostname
@@ -3,15 +3,44 @@
 import asyncio
 import ipaddress
 import logging
+import math
 import socket
 import time
-from dataclasses import asdict, dataclass
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import asdict, dataclass, field
 from typing import Any
 
+from .budget import clamp, exhaust, iter_within, no_budget, out_of_time, run_within, time_budget
+from .fingerprints import ServiceIdentity, ServiceProbeDatabase, load_default_database
+from .icmp import IcmpEngine
+from .interfaces import InterfaceCache, NetworkInterface, read_snapshot
+from .inventory import DeviceInventory
+from .ipv6 import LISTEN_TIME, Ipv6Neighbour, discover_neighbours
+from .metrics import ScannerMetrics, no_breakdown
+from .names import MulticastNameResolver
+from .neighbours import kernel_ipv6_neighbour_table, kernel_neighbour_table
+from .oui import VendorIndex, load_default_index
+from .portscan import (
+    PORT_FILTERED,
+    PORT_OPEN,
+    PortProbeResult,
+    connect_probe,
+    parse_port_spec,
+    resolve_target,
+)
+from .resolver import ReverseResolver
+
 # Note: nmap python library requires system nmap package
 # We'll use basic socket and subprocess methods instead
 nmap = None
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 try:
     import netifaces  # type: ignore
 except ImportError:
@@ -28,6 +57,30 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Number of hosts probed concurrently by a range sweep
+SWEEP_CONCURRENCY = 256
+
+# Time a service gets to send its banner, on top of the connect timeout
+BANNER_GRACE = 0.5
+
+# File descriptors kept back from the connection budget for everything else
+RESERVED_FDS = 64
+
+# Largest on-link subnet whose addresses are all named up front by one
+# multicast/broadcast query when its sweep starts
+SUBNET_NAME_QUERY_LIMIT = 1024
+
+# Device fields compared by an incremental rescan
+DIFF_FIELDS = ("mac_address", "hostname", "open_ports", "services")
+
+# How long each part of a cached device stays fresh (seconds)
+FRESHNESS_TTLS = {
+    "liveness": 60.0,
+    "ports": 900.0,
+    "services": 3600.0,
+    "hostname": 3600.0,
+}
+
 
 @dataclass
 class NetworkDevice:
@@ -35,13 +88,24 @@ class NetworkDevice:
     ip_address: str
     mac_address: str | None = None
     hostname: str | None = None
+    # Manufacturer from the MAC prefix registry
     vendor: str | None = None
+    # What the device announces about itself (DHCP vendor class, SSDP server string)
+    vendor_hint: str | None = None
     os_guess: str | None = None
     open_ports: list[int] | None = None
     services: dict[int, str] | None = None
     device_type: str | None = None
     last_seen: float | None = None
     response_time: float | None = None
+    # Field name (see FRESHNESS_TTLS) -> time it was last probed
+    refreshed: dict[str, float] | None = None
+    # False once a rescan finds the device no longer answering
+    online: bool = True
+    # Addresses in other scanned networks that answered with the same MAC
+    aliases: list[str] | None = None
+    # Every IPv6 address seen with this device's MAC
+    ipv6_addresses: list[str] | None = None
 
     def __post_init__(self) -> None:
         if self.open_ports is None:
@@ -50,6 +114,22 @@ class NetworkDevice:
             self.services = {}
         if self.last_seen is None:
             self.last_seen = time.time()
+        if self.refreshed is None:
+            self.refreshed = {}
+        if self.aliases is None:
+            self.aliases = []
+        if self.ipv6_addresses is None:
+            self.ipv6_addresses = []
+
+    def mark_refreshed(self, *fields: str) -> None:
+        now = time.time()
+        for name in fields:
+            self.refreshed[name] = now
+
+    def age(self, field: str) -> float:
+        """Seconds since ``field`` was last probed; infinite if it never was."""
+        refreshed = self.refreshed.get(field)
+        return math.inf if refreshed is None else time.time() - refreshed
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -57,70 +137,524 @@ class NetworkDevice:
 
 
 @dataclass
-class NetworkInterface:
-    """Represents a network interface."""
-    name: str
+class DeviceChange:
+    """Fields of a device that differ between two scans, as ``(old, new)`` pairs."""
     ip_address: str
-    netmask: str
+    fields: dict[str, tuple[Any, Any]]
+
+
+@dataclass
+class ScanDiff:
+    """What an incremental rescan found compared with the previous state."""
     network: str
-    gateway: str | None = None
-    mac_address: str | None = None
-    is_up: bool = True
+    added: list[NetworkDevice]
+    removed: list[NetworkDevice]
+    changed: list[DeviceChange]
+    unchanged: int = 0
+    # The time budget ran out before every host was probed; nothing is reported removed
+    partial: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+
+@dataclass
+class SweepProgress:
+    """Live counters for one or more range sweeps, updated as hosts are probed."""
+    total: int = 0
+    probed: int = 0
+    found: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def add_network(self, network: str) -> None:
+        """Count the hosts of ``network`` towards ``total`` (IPv6 networks are not enumerable)."""
+        net = ipaddress.ip_network(network, strict=False)
+        if net.version == 6:
+            return
+        # hosts() leaves out the network and broadcast addresses except on /31 and /32.
+        self.total += net.num_addresses if net.prefixlen >= 31 else net.num_addresses - 2
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def eta(self) -> float | None:
+        """Seconds until every host is probed at the rate so far, if known."""
+        if not self.probed or not self.total:
+            return None
+        return self.elapsed / self.probed * max(0, self.total - self.probed)
+
+
+@dataclass
+class RttEstimate:
+    """Smoothed RTT and RTT variance, maintained as in TCP (RFC 6298)."""
+    srtt: float
+    rttvar: float
+
+    @classmethod
+    def from_sample(cls, rtt: float) -> "RttEstimate":
+        return cls(srtt=rtt, rttvar=rtt / 2)
+
+    def update(self, rtt: float) -> None:
+        self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+        self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    @property
+    def timeout(self) -> float:
+        return self.srtt + 4 * self.rttvar
+
+
+class Probe:
+    """A single scheduled probe; report its outcome with ``answered``/``timed_out``."""
+
+    def __init__(self, host: str, timeout: float) -> None:
+        self.host = host
+        self.timeout = timeout
+        self.sent = time.monotonic()
+        self.rtt: float | None = None
+        self.lost = False
+        # Timeout shortened by the time budget
+        self.cut_short = False
+
+    def answered(self, rtt: float | None = None) -> None:
+        """Record a reply; ``rtt`` defaults to the time since the probe started."""
+        self.rtt = time.monotonic() - self.sent if rtt is None else rtt
+
+    def timed_out(self) -> None:
+        """Record that the probe went unanswered."""
+        self.lost = True
+
+
+class ProbeScheduler:
+    """Shared pacing, RTT estimation and congestion control for every probe.
+
+    Probes wait for a token from a token bucket (``rate`` per second, up to
+    ``burst`` at once) and for room in a congestion window. Replies feed
+    per-host and per-subnet SRTT/RTTVAR estimates from which probe timeouts
+    are derived. The window grows on replies (slow start, then additive
+    increase) and halves, at most once per round trip, when a host that has
+    answered before stops answering. Silence from hosts that have never
+    answered is ordinary sweep behaviour and is not treated as congestion.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2000.0,
+        burst: int = 256,
+        initial_timeout: float = 1.0,
+        min_timeout: float = 0.1,
+        max_timeout: float = 3.0,
+        initial_window: int = 256,
+        min_window: int = 8,
+        max_window: int = 2048,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_window = min_window
+        self.max_window = max_window
+
+        self.window = float(initial_window)
+        self._ssthresh = float(max_window)
+        self._last_decrease = 0.0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._host_rtt: dict[str, RttEstimate] = {}
+        self._subnet_rtt: dict[str, RttEstimate] = {}
+        self._recent: deque[float] = deque()
+        self._sent = 0
+        self._answered = 0
+        self._timed_out = 0
+
+    @staticmethod
+    def _subnet_key(host: str) -> str:
+        try:
+            return str(ipaddress.IPv4Network(f"{host}/24", strict=False))
+        except ValueError:
+            return host
+
+    def timeout_for(self, host: str) -> float:
+        """Timeout for the next probe to ``host``, from the best estimate available."""
+        estimate = self._host_rtt.get(host) or self._subnet_rtt.get(self._subnet_key(host))
+        timeout = estimate.timeout if estimate else self.initial_timeout
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+    @asynccontextmanager
+    async def probe(self, host: str, timeout: float | None = None) -> AsyncIterator[Probe]:
+        """Wait for a send slot and yield a ``Probe`` carrying its timeout.
+
+        An explicit ``timeout`` overrides the RTT-derived one. Either is
+        shortened to what is left of the current time budget.
+        """
+        await self.pace()
+        await self._enter_window()
+        timeout = timeout if timeout is not None else self.timeout_for(host)
+        probe = Probe(host, clamp(timeout))
+        probe.cut_short = probe.timeout < timeout
+        try:
+            yield probe
+        finally:
+            self._leave_window()
+            if probe.lost and probe.cut_short:
+                exhaust()
+            self._record(probe)
+
+    async def pace(self, count: int = 1) -> None:
+        """Take ``count`` tokens from the bucket, waiting for refills as needed."""
+        for _ in range(count):
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._sent += 1
+            self._recent.append(now)
+            self._forget_before(now - 1.0)
+
+    def _forget_before(self, cutoff: float) -> None:
+        """Drop send times older than ``cutoff`` from the effective-rate window."""
+        while self._recent and self._recent[0] < cutoff:
+            self._recent.popleft()
+
+    def stats(self) -> dict[str, Any]:
+        """Report the scheduler's effective rate and congestion state."""
+        self._forget_before(time.monotonic() - 1.0)
+        return {
+            "rate_limit": self.rate,
+            "effective_rate": len(self._recent),
+            "window": round(self.window, 1),
+            "in_flight": self._in_flight,
+            "probes_sent": self._sent,
+            "probes_answered": self._answered,
+            "probes_timed_out": self._timed_out,
+            "hosts_tracked": len(self._host_rtt),
+        }
+
+    async def _enter_window(self) -> None:
+        while self._in_flight >= int(self.window):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+        self._in_flight += 1
+
+    def _leave_window(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.window) - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _record(self, probe: Probe) -> None:
+        if probe.rtt is not None:
+            self._answered += 1
+            for table, key in ((self._host_rtt, probe.host), (self._subnet_rtt, self._subnet_key(probe.host))):
+                estimate = table.get(key)
+                if estimate is None:
+                    table[key] = RttEstimate.from_sample(probe.rtt)
+                else:
+                    estimate.update(probe.rtt)
+            if self.window < self._ssthresh:
+                self.window += 1
+            else:
+                self.window += 1 / self.window
+            self.window = min(self.window, self.max_window)
+            self._wake()
+        elif probe.lost and not probe.cut_short:
+            self._timed_out += 1
+            if probe.host in self._host_rtt and probe.sent > self._last_decrease:
+                self._ssthresh = max(self.min_window, self.window / 2)
+                self.window = self._ssthresh
+                self._last_decrease = time.monotonic()
+
+
+def default_connection_limit() -> int:
+    """Size the connection budget to half of the soft ``RLIMIT_NOFILE``."""
+    if resource is None:
+        return 256
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        soft = 65536
+    return max(8, (soft - RESERVED_FDS) // 2)
+
+
+class ConnectionBudget:
+    """Scanner-wide cap on in-flight TCP connects, shared fairly between hosts.
+
+    Waiters are queued per host and slots are granted round-robin across
+    hosts, so a host with many ports (or a slow one) cannot starve the rest.
+    ``per_host`` additionally caps how many connects one host may hold.
+    """
+
+    def __init__(self, limit: int | None = None, per_host: int = 10) -> None:
+        self.limit = limit or default_connection_limit()
+        self.per_host = per_host
+        self.in_flight = 0
+        self.peak = 0
+        self._host_in_flight: dict[str, int] = {}
+        self._queues: dict[str, deque[asyncio.Future[None]]] = {}
+
+    @asynccontextmanager
+    async def connection(self, host: str) -> AsyncIterator[None]:
+        """Hold one connection slot for ``host`` for the duration of the block."""
+        await self._acquire(host)
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    def _can_grant(self, host: str) -> bool:
+        return self.in_flight < self.limit and self._host_in_flight.get(host, 0) < self.per_host
+
+    def _grant(self, host: str) -> None:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+
+    async def _acquire(self, host: str) -> None:
+        if host not in self._queues and self._can_grant(host):
+            self._grant(host)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(host, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(host)
+            else:
+                self._discard(host, waiter)
+            raise
+
+    def _discard(self, host: str, waiter: asyncio.Future[None]) -> None:
+        queue = self._queues.get(host)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[host]
+
+    def _release(self, host: str) -> None:
+        self.in_flight -= 1
+        remaining = self._host_in_flight[host] - 1
+        if remaining:
+            self._host_in_flight[host] = remaining
+        else:
+            del self._host_in_flight[host]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots round-robin over the hosts with queued waiters."""
+        granted = True
+        while granted and self.in_flight < self.limit and self._queues:
+            granted = False
+            for host in list(self._queues):
+                if self.in_flight >= self.limit:
+                    break
+                if not self._can_grant(host):
+                    continue
+                queue = self._queues[host]
+                # Skip waiters that gave up (e.g. a wait_for timeout) in the same turn.
+                waiter = queue.popleft()
+                while waiter.done() and queue:
+                    waiter = queue.popleft()
+                # Rotate the host to the back so the next grant goes elsewhere.
+                del self._queues[host]
+                if queue:
+                    self._queues[host] = queue
+                if not waiter.done():
+                    self._grant(host)
+                    waiter.set_result(None)
+                    granted = True
+
+
+def collapse_networks(networks: list[str]) -> list[str]:
+    """Drop duplicate networks and networks nested inside another entry.
+
+    e.g. ``10.0.1.0/24`` inside ``10.0.0.0/16`` is dropped. Adjacent networks
+    stay separate, so each keeps its own network and broadcast addresses.
+    IPv4 networks come first, then IPv6, each in address order.
+
+    Raises:
+        ValueError: If an entry is not an IP network.
+    """
+    parsed = sorted(
+        {ipaddress.ip_network(network, strict=False) for network in networks},
+        key=lambda net: (net.version, net.network_address, net.prefixlen),
+    )
+    kept: list[ipaddress.IPv4Network | ipaddress.IPv6Network] = []
+    for net in parsed:
+        # CIDR blocks either nest or are disjoint, and a block sorts right after any that contains it.
+        if kept and kept[-1].version == net.version and net.subnet_of(kept[-1]):
+            continue
+        kept.append(net)
+    return [str(net) for net in kept]
+
+
+def _is_link_local(address: str) -> bool:
+    return ipaddress.ip_address(address.partition("%")[0]).is_link_local
+
+
+def _ipv6_preference(address: str) -> tuple[bool, ipaddress.IPv6Address]:
+    """Sort key putting routable IPv6 addresses before link-local ones."""
+    return _is_link_local(address), ipaddress.IPv6Address(address.partition("%")[0])
+
+
+def _in_network(device: NetworkDevice, net: ipaddress.IPv4Network | ipaddress.IPv6Network) -> bool:
+    """Whether any of a device's addresses falls inside ``net``."""
+    for address in [device.ip_address, *device.ipv6_addresses]:
+        parsed = ipaddress.ip_address(address.partition("%")[0])
+        if parsed.version == net.version and parsed in net:
+            return True
+    return False
+
+
+def carry_over(known: NetworkDevice, device: NetworkDevice) -> None:
+    """Fill in what a fresh probe of ``device`` did not collect from its stored record ``known``."""
+    device.mac_address = device.mac_address or known.mac_address
+    device.vendor = device.vendor or known.vendor
+    device.vendor_hint = device.vendor_hint or known.vendor_hint
+    device.os_guess = device.os_guess or known.os_guess
+    if "hostname" not in device.refreshed:
+        device.hostname = device.hostname or known.hostname
+    if "ports" not in device.refreshed:
+        device.open_ports = known.open_ports
+    if "services" not in device.refreshed:
+        device.services = known.services
+    device.ipv6_addresses = sorted({*known.ipv6_addresses, *device.ipv6_addresses}, key=_ipv6_preference)
+    device.refreshed = {**known.refreshed, **device.refreshed}
+
+
+def merge_devices(found: list[tuple[str, NetworkDevice]]) -> list[NetworkDevice]:
+    """Merge devices found while sweeping several networks.
+
+    ``found`` holds ``(network, device)`` pairs. Devices are unique by IP; a
+    MAC seen in more than one network is one multi-homed host, reported once
+    with its other addresses in ``aliases``. Within one network a shared MAC
+    (proxy ARP, a router answering for others) is left alone.
+    """
+    merged: dict[str, NetworkDevice] = {}
+    by_mac: dict[str, tuple[str, NetworkDevice]] = {}
+    for network, device in found:
+        if device.ip_address in merged:
+            continue
+        mac = device.mac_address.lower() if device.mac_address else None
+        first = by_mac.get(mac) if mac else None
+        if first is not None and first[0] != network:
+            first[1].aliases.append(device.ip_address)
+            continue
+        merged[device.ip_address] = device
+        if mac and first is None:
+            by_mac[mac] = (network, device)
+    return list(merged.values())
+
+
+def _rtt_bucket(rtt: float | None) -> int | None:
+    """Order of magnitude of an RTT in powers of four from 100us, so jitter keeps its bucket."""
+    if rtt is None:
+        return None
+    return int(math.log(max(rtt, 1e-4) / 1e-4, 4))
+
+
+def _describe_service(identity: ServiceIdentity | None, port_name: str | None, banner: bytes) -> str:
+    """Pick the most specific name for a port from its match, port number and banner."""
+    if identity is not None and not (identity.soft and port_name):
+        return str(identity)
+    if port_name:
+        return port_name
+    banner_str = banner.decode('utf-8', errors='ignore').strip()
+    return f"Unknown ({banner_str[:30]})" if banner_str else "Unknown"
 
 
 class NetworkScanner:
     """Network scanner for device discovery."""
 
-    def __init__(self) -> None:
-        self.devices: dict[str, NetworkDevice] = {}
+    def __init__(
+        self,
+        resolver: ReverseResolver | None = None,
+        scheduler: ProbeScheduler | None = None,
+        max_connections: int | None = None,
+        max_connections_per_host: int = 10,
+        fingerprints: ServiceProbeDatabase | None = None,
+        inventory: DeviceInventory | None = None,
+        freshness: dict[str, float] | None = None,
+        names: MulticastNameResolver | None = None,
+        vendors: VendorIndex | None = None,
+        metrics: ScannerMetrics | None = None,
+    ) -> None:
+        self.metrics = metrics or ScannerMetrics(enabled=False)
+        self.devices = inventory if inventory is not None else DeviceInventory()
+        self.freshness = {**FRESHNESS_TTLS, **(freshness or {})}
+        self._refreshing: dict[str, asyncio.Task[NetworkDevice]] = {}
+        self._owns_resolver = resolver is None
+        self.resolver = resolver or ReverseResolver(metrics=self.metrics)
+        self.names = names or MulticastNameResolver()
+        self.scheduler = scheduler or ProbeScheduler()
+        self.connections = ConnectionBudget(max_connections, max_connections_per_host)
+        self._fingerprints = fingerprints
+        self._vendors = vendors
+        self._icmp: IcmpEngine | None = IcmpEngine()
+        self._interfaces = InterfaceCache(lambda: read_snapshot(netifaces))
+
+    @property
+    def fingerprints(self) -> ServiceProbeDatabase:
+        """Service probe database, loaded on first use."""
+        if self._fingerprints is None:
+            self._fingerprints = load_default_database()
+        return self._fingerprints
+
+    @property
+    def vendors(self) -> VendorIndex | None:
+        """MAC vendor index, mapped on first use."""
+        if self._vendors is None:
+            self._vendors = load_default_index()
+        return self._vendors
+
+    def close(self) -> None:
+        """Close the sockets this scanner opened."""
+        self._interfaces.close()
+        if self._icmp is not None:
+            self._icmp.close()
+        if self._owns_resolver:
+            self.resolver.close()
 
     async def get_network_interfaces(self) -> list[NetworkInterface]:
-        """Get all network interfaces on the local machine."""
-        interfaces = []
+        """Get all network interfaces on the local machine.
 
+        Served from a snapshot that is only re-read after an interface,
+        address or route change (or a TTL where changes cannot be watched).
+        """
         if netifaces is None:
             logger.warning("netifaces not available, using basic interface detection")
             return await self._get_interfaces_basic()
 
         try:
-            for interface_name in netifaces.interfaces():
-                interface_info = netifaces.ifaddresses(interface_name)
-
-                # Get IPv4 addresses
-                if netifaces.AF_INET in interface_info:
-                    for addr_info in interface_info[netifaces.AF_INET]:
-                        ip_addr = addr_info.get('addr')
-                        netmask = addr_info.get('netmask')
-
-                        if ip_addr and netmask and not ip_addr.startswith('127.'):
-                            # Calculate network
-                            network = ipaddress.IPv4Network(f"{ip_addr}/{netmask}", strict=False)
-
-                            # Get MAC address
-                            mac_addr = None
-                            if netifaces.AF_LINK in interface_info:
-                                mac_addr = interface_info[netifaces.AF_LINK][0].get('addr')
-
-                            # Get gateway
-                            gateway = None
-                            gateways = netifaces.gateways()
-                            if 'default' in gateways and netifaces.AF_INET in gateways['default']:
-                                gateway = gateways['default'][netifaces.AF_INET][0]
-
-                            interfaces.append(NetworkInterface(
-                                name=interface_name,
-                                ip_address=ip_addr,
-                                netmask=netmask,
-                                network=str(network.network_address) + "/" + str(network.prefixlen),
-                                gateway=gateway,
-                                mac_address=mac_addr
-                            ))
+            return list(self._interfaces.get().interfaces)
         except Exception as e:
             logger.error(f"Error getting network interfaces: {e}")
             return await self._get_interfaces_basic()
 
-        return interfaces
-
     async def _get_interfaces_basic(self) -> list[NetworkInterface]:
         """Basic interface detection using socket."""
         try:
@@ -143,19 +677,55 @@ class NetworkScanner:
             logger.error(f"Error with basic interface detection: {e}")
             return []
 
-    async def ping_host(self, host: str, timeout: int = 1) -> tuple[bool, float | None]:
-        """Ping a host to check if it's alive."""
+    async def ping_host(self, host: str, timeout: float | None = None) -> tuple[bool, float | None]:
+        """Ping a host to check if it's alive.
+
+        Without an explicit ``timeout`` the scheduler derives one from the
+        host's (or its subnet's) measured RTT.
+        """
+        if out_of_time():
+            return False, None
+        if self._icmp is not None:
+            try:
+                self._icmp.open()
+            except OSError as e:
+                logger.info(f"ICMP sockets unavailable ({e}), falling back to system ping")
+                self._icmp = None
+
+        async with self.scheduler.probe(host, timeout) as probe:
+            with self.metrics.phase("ping") as timer:
+                if self._icmp is not None:
+                    response_time = await self._icmp.ping(host, probe.timeout)
+                else:
+                    _, response_time = await self._ping_subprocess(host, probe.timeout)
+                if response_time is None:
+                    timer.timed_out()
+
+            if response_time is None:
+                probe.timed_out()
+            else:
+                probe.answered(response_time)
+
+        return response_time is not None, response_time
+
+    async def _ping_subprocess(self, host: str, timeout: float = 1) -> tuple[bool, float | None]:
+        """Ping a host with the system ping command (last-resort fallback)."""
         try:
             start_time = time.time()
 
-            # Use system ping command
+            # Use system ping command (-W only takes whole seconds)
             process = await asyncio.create_subprocess_exec(
-                'ping', '-c', '1', '-W', str(timeout), host,
+                'ping', '-c', '1', '-W', str(max(1, math.ceil(timeout))), host,
                 stdout=asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.DEVNULL
             )
 
-            returncode = await process.wait()
+            try:
+                returncode = await process.wait()
+            except asyncio.CancelledError:
+                # Leave no ping behind when the caller gives up.
+                process.kill()
+                raise
             response_time = time.time() - start_time
 
             return returncode == 0, response_time if returncode == 0 else None
@@ -164,34 +734,416 @@ class NetworkScanner:
             logger.debug(f"Ping failed for {host}: {e}")
             return False, None
 
-    async def scan_network_range(self, network: str, include_ports: bool = False) -> list[NetworkDevice]:
-        """Scan a network range for active devices."""
+    async def scan_network_range(
+        self, network: str, include_ports: bool = False, shards: int = 1
+    ) -> list[NetworkDevice]:
+        """Scan a network range for active devices.
+
+        With ``shards`` above one the sweep is split across that many worker
+        processes (see ``iter_sharded_batches``). Within a ``time_budget``
+        the devices found before it ran out are returned.
+        """
+        if shards > 1:
+            return [
+                device
+                async for batch in iter_within(self.iter_sharded_batches([network], shards, include_ports))
+                for device in batch
+            ]
+        return [device async for device in self.iter_network_range(network, include_ports)]
+
+    async def iter_network_range(
+        self,
+        network: str,
+        include_ports: bool = False,
+        concurrency: int = SWEEP_CONCURRENCY,
+        progress: SweepProgress | None = None,
+    ) -> AsyncIterator[NetworkDevice]:
+        """Sweep a network range, yielding devices as they are found."""
+        async with aclosing(self.iter_network_batches(network, include_ports, concurrency, progress)) as batches:
+            async for batch in batches:
+                for device in batch:
+                    yield device
+
+    async def iter_network_batches(
+        self,
+        network: str,
+        include_ports: bool = False,
+        concurrency: int = SWEEP_CONCURRENCY,
+        progress: SweepProgress | None = None,
+        hosts: Iterable[ipaddress.IPv4Address] | None = None,
+    ) -> AsyncIterator[list[NetworkDevice]]:
+        """Sweep a network range, yielding the live devices found since the last batch.
+
+        Each batch has its MAC addresses and hostnames resolved together and
+        is stored in one transaction. ``progress``, if given, is updated as
+        hosts are probed; its ``total`` is left to the caller. ``hosts``
+        restricts an IPv4 sweep to those addresses of the network.
+
+        IPv6 networks are not swept: the hosts ``discover_ipv6`` finds on the
+        local links are filtered to the network and yielded as one batch.
+        """
         try:
-            net = ipaddress.IPv4Network(network, strict=False)
+            net = ipaddress.ip_network(network, strict=False)
         except ValueError as e:
             logger.error(f"Invalid network range: {network}: {e}")
-            return []
-
-        devices = []
-        tasks = []
-
-        # Create ping tasks for all hosts in the network
-        for host in net.hosts():
-            if net.num_addresses > 256:  # Limit scan size for large networks
-                break
-            tasks.append(self._scan_single_host(str(host), include_ports))
-
-        # Execute all ping tasks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for result in results:
-            if isinstance(result, NetworkDevice):
-                devices.append(result)
-                self.devices[result.ip_address] = result
+            return
+
+        if net.version == 6:
+            batch = [device for device in await self.discover_ipv6() if _in_network(device, net)]
+            if include_ports:
+                await run_within(*(self._refresh_device(device, ["ports"], store=False) for device in batch))
+                self.devices.put_many(batch)
+            if progress is not None:
+                progress.found += len(batch)
+            if batch:
+                yield batch
+            return
+
+        # Ask the whole subnet for names while the sweep finds its hosts.
+        names = None
+        if net.num_addresses <= SUBNET_NAME_QUERY_LIMIT and await self._on_link(net):
+            names = asyncio.create_task(self._query_subnet_names(net))
+        try:
+            async with aclosing(self._sweep(net, include_ports, concurrency, progress, hosts)) as batches:
+                async for batch in batches:
+                    if names is not None:
+                        await asyncio.wait([names])
+                    await self._enrich_devices(batch)
+                    self._carry_over_known(batch)
+                    self._adopt_ipv6_records(batch)
+                    self.devices.put_many(batch)
+                    yield batch
+        finally:
+            if names is not None and not names.done():
+                names.cancel()
+                await asyncio.wait([names])
+
+    async def _on_link(self, net: ipaddress.IPv4Network) -> bool:
+        """Whether ``net`` overlaps a network one of our interfaces is attached to."""
+        for interface in await self.get_network_interfaces():
+            try:
+                local = ipaddress.ip_network(interface.network, strict=False)
+            except ValueError:
+                continue
+            if local.version == net.version and local.overlaps(net):
+                return True
+        return False
+
+    async def _query_subnet_names(self, net: ipaddress.IPv4Network) -> None:
+        """Send one mDNS query and one NetBIOS broadcast covering every host in ``net``."""
+        broadcast = str(net.broadcast_address) if net.prefixlen < 31 else None
+        hosts = (str(host) for host in net.hosts())
+        with self.metrics.phase("names"):
+            await run_within(self.names.resolve_many(hosts, unicast=False, broadcast=broadcast))
+
+    async def iter_networks_batches(
+        self,
+        networks: list[str],
+        include_ports: bool = False,
+        progress: SweepProgress | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> AsyncIterator[tuple[str, list[NetworkDevice]]]:
+        """Sweep several networks concurrently, yielding ``(network, batch)`` as batches arrive.
+
+        The sweeps share this scanner's probe scheduler and split the sweep
+        concurrency between them. Pass non-overlapping networks (see
+        ``collapse_networks``). If ``timings`` is given, each network's sweep
+        duration in seconds is stored in it as the sweep completes.
+        """
+        if not networks:
+            return
+        concurrency = max(1, SWEEP_CONCURRENCY // len(networks))
+        # Unbounded so the end marker can always be queued, even on cancellation.
+        found: asyncio.Queue[tuple[str, list[NetworkDevice]] | None] = asyncio.Queue()
+
+        async def sweep(network: str) -> None:
+            started = time.monotonic()
+            async with aclosing(self.iter_network_batches(network, include_ports, concurrency, progress)) as batches:
+                async for batch in batches:
+                    await found.put((network, batch))
+            if timings is not None:
+                timings[network] = time.monotonic() - started
+
+        async def run_sweeps() -> None:
+            try:
+                await asyncio.gather(*(sweep(network) for network in networks))
+            finally:
+                found.put_nowait(None)
 
+        sweeps = asyncio.create_task(run_sweeps())
+        try:
+            while (item := await found.get()) is not None:
+                yield item
+            await sweeps
+        finally:
+            if not sweeps.done():
+                sweeps.cancel()
+                await asyncio.wait([sweeps])
+
+    async def iter_sharded_batches(
+        self,
+        networks: list[str],
+        shards: int,
+        include_ports: bool = False,
+        progress: SweepProgress | None = None,
+    ) -> AsyncIterator[list[NetworkDevice]]:
+        """Sweep networks across ``shards`` worker processes, yielding batches as they arrive.
+
+        Each worker runs its own event loop, probe engine and enrichment;
+        batches stream back over a pipe and are merged into this scanner's
+        inventory. The packet rate is split evenly between the workers.
+        IPv6 networks are not swept and are discovered in this process.
+        """
+        # Imported here: the worker side of sharding imports this module.
+        from .sharding import iter_shard_batches
+
+        ipv4_networks = [network for network in networks if ":" not in network]
+        for network in networks:
+            if ":" in network:
+                async with aclosing(self.iter_network_batches(network, include_ports, progress=progress)) as batches:
+                    async for batch in batches:
+                        yield batch
+        if not ipv4_networks:
+            return
+        rate = self.scheduler.rate / shards
+        async with aclosing(iter_shard_batches(ipv4_networks, shards, include_ports, rate, progress)) as batches:
+            async for batch in batches:
+                self._carry_over_known(batch)
+                self._adopt_ipv6_records(batch)
+                self.devices.put_many(batch)
+                yield batch
+
+    async def _sweep(
+        self,
+        net: ipaddress.IPv4Network,
+        include_ports: bool,
+        concurrency: int,
+        progress: SweepProgress | None = None,
+        hosts: Iterable[ipaddress.IPv4Address] | None = None,
+    ) -> AsyncIterator[list[NetworkDevice]]:
+        """Probe every host in ``net`` (or just ``hosts``), yielding live devices in batches.
+
+        A fixed pool of workers pulls addresses lazily from ``net.hosts()``, so
+        memory stays flat regardless of the size of the range. When the time
+        budget runs out the workers are cancelled and the sweep ends with the
+        devices found so far.
+        """
+        addresses = iter(hosts) if hosts is not None else net.hosts()
+        found: asyncio.Queue[NetworkDevice | None] = asyncio.Queue(maxsize=concurrency)
+
+        async def worker() -> None:
+            # The generator is shared: each next() hands out a distinct address.
+            for host in addresses:
+                try:
+                    device = await self._scan_single_host(str(host), include_ports)
+                except Exception as e:
+                    logger.debug(f"Scan failed for {host}: {e}")
+                    device = None
+                if progress is not None:
+                    progress.probed += 1
+                    progress.found += device is not None
+                if device is not None:
+                    await found.put(device)
+
+        async def run_workers() -> None:
+            workers = [worker() for _ in range(max(1, min(concurrency, net.num_addresses)))]
+            await run_within(*workers)
+            await found.put(None)
+
+        sweep = asyncio.create_task(run_workers())
+        try:
+            finished = False
+            while not finished:
+                batch = [await found.get()]
+                while not found.empty():
+                    batch.append(found.get_nowait())
+                if batch[-1] is None:
+                    finished = True
+                    batch.pop()
+                if batch:
+                    yield batch
+        finally:
+            if not sweep.done():
+                sweep.cancel()
+                await asyncio.wait([sweep])
+            logger.debug(f"Sweep of {net} finished, scheduler: {self.scheduler.stats()}")
+
+    async def rescan_network(
+        self, network: str, include_ports: bool = False, concurrency: int = SWEEP_CONCURRENCY
+    ) -> ScanDiff:
+        """Re-sweep a network and report what changed since the devices already known.
+
+        Only a liveness pass runs over the whole range. Hosts that are new,
+        came back, or whose RTT moved to a different order of magnitude get
+        the deep probes (MAC, hostname and, if requested or previously
+        collected, ports); everything else just has its liveness refreshed.
+        If the time budget runs out during the liveness pass, hosts it did
+        not reach are left as they were rather than reported removed.
+        """
+        try:
+            net = ipaddress.IPv4Network(network, strict=False)
+        except ValueError as e:
+            raise ValueError(f"Invalid network range: {network}: {e}") from e
+
+        previous = {device.ip_address: device for device in self.devices.in_network(str(net))}
+        alive: list[NetworkDevice] = []
+        with time_budget() as liveness:
+            async with aclosing(self._sweep(net, False, concurrency)) as batches:
+                async for batch in batches:
+                    alive.extend(batch)
+
+        diff = ScanDiff(network=str(net), added=[], removed=[], changed=[], partial=liveness.exhausted)
+        deep: list[tuple[NetworkDevice | None, NetworkDevice]] = []
+        updated: list[NetworkDevice] = []
+        for device in alive:
+            known = previous.pop(device.ip_address, None)
+            moved = known is not None and _rtt_bucket(known.response_time) != _rtt_bucket(device.response_time)
+            if known is None or not known.online or moved:
+                deep.append((known, device))
+            else:
+                known.response_time = device.response_time
+                known.last_seen = device.last_seen
+                known.mark_refreshed("liveness")
+                updated.append(known)
+                diff.unchanged += 1
+
+        await self.resolve_mac_addresses([device for _, device in deep])
+        refreshes = []
+        for known, device in deep:
+            if known is not None:
+                # Carry over what the liveness pass does not collect.
+                carry_over(known, device)
+            fields = ["ports", "hostname"] if include_ports or device.age("ports") < math.inf else ["hostname"]
+            refreshes.append(self._refresh_device(device, fields, store=False))
+        await run_within(*refreshes)
+        self.assign_vendors([device for _, device in deep])
+
+        for known, device in deep:
+            if known is None or not known.online:
+                diff.added.append(device)
+                continue
+            changes = {
+                name: (getattr(known, name), getattr(device, name))
+                for name in DIFF_FIELDS
+                if getattr(known, name) != getattr(device, name)
+            }
+            changes["response_time"] = (known.response_time, device.response_time)
+            diff.changed.append(DeviceChange(device.ip_address, changes))
+        updated.extend(device for _, device in deep)
+
+        for device in previous.values() if not diff.partial else ():
+            if device.online:
+                device.online = False
+                device.mark_refreshed("liveness")
+                diff.removed.append(device)
+                updated.append(device)
+
+        self.devices.put_many(updated)
+        logger.info(
+            f"Rescan of {net}: {len(diff.added)} added, {len(diff.removed)} removed, "
+            f"{len(diff.changed)} changed, {diff.unchanged} unchanged"
+        )
+        return diff
+
+    async def discover_ipv6(
+        self, interfaces: list[str] | None = None, listen_time: float = LISTEN_TIME
+    ) -> list[NetworkDevice]:
+        """Find IPv6 hosts on the local links and merge them into the inventory by MAC.
+
+        Each interface (by default, every one with an IPv6 address) gets one
+        echo to the all-nodes group while replies and NDP traffic are
+        collected; the kernel's IPv6 neighbour table fills in their MACs. An
+        address whose MAC belongs to a known device, such as one found by an
+        IPv4 sweep, is added to that device's ``ipv6_addresses`` instead of
+        becoming a second device. Returns the devices that were seen.
+        """
+        if interfaces is None:
+            interfaces = sorted({
+                interface.name for interface in await self.get_network_interfaces()
+                if ":" in interface.ip_address
+            })
+
+        heard: dict[str, Ipv6Neighbour] = {}
+
+        async def listen(interface: str) -> None:
+            try:
+                with self.metrics.phase("ipv6"):
+                    heard.update(await discover_neighbours(interface, listen_time=clamp(listen_time)))
+            except OSError as e:
+                logger.info(f"IPv6 discovery on {interface} unavailable: {e}")
+
+        await self.scheduler.pace(len(interfaces))
+        if not out_of_time():
+            await run_within(*(listen(interface) for interface in interfaces))
+        # The kernel table keeps stale entries for hosts long gone, so it only
+        # fills in MACs for addresses heard in this round.
+        for address, mac in kernel_ipv6_neighbour_table().items():
+            neighbour = heard.get(address)
+            if neighbour is not None:
+                neighbour.mac_address = neighbour.mac_address or mac
+
+        # One host per MAC; without a MAC each address stands alone.
+        hosts: dict[str, list[Ipv6Neighbour]] = {}
+        for neighbour in heard.values():
+            hosts.setdefault(neighbour.mac_address or neighbour.address, []).append(neighbour)
+
+        devices = [self._ipv6_host(neighbours) for neighbours in hosts.values()]
+        # Link-local addresses have no PTR records.
+        await self.resolve_hostnames([device for device in devices if not _is_link_local(device.ip_address)])
+        self.assign_vendors(devices)
+        self.devices.put_many(devices)
+        logger.info(f"IPv6 discovery found {len(heard)} addresses on {len(devices)} hosts")
         return devices
 
-    async def _scan_single_host(self, host: str, include_ports: bool = False) -> NetworkDevice | None:
+    def _ipv6_host(self, neighbours: list[Ipv6Neighbour]) -> NetworkDevice:
+        """The inventory device for the IPv6 addresses of one host, updated with them."""
+        addresses = sorted((neighbour.address for neighbour in neighbours), key=_ipv6_preference)
+        mac = neighbours[0].mac_address
+        known = self.devices.by_mac(mac) if mac else []
+        # Prefer the IPv4 record of a dual-stack host.
+        known.sort(key=lambda device: ":" in device.ip_address)
+        device = known[0] if known else self.devices.get(addresses[0])
+        if device is None:
+            device = NetworkDevice(ip_address=addresses[0], mac_address=mac)
+
+        device.ipv6_addresses = sorted({*device.ipv6_addresses, *addresses}, key=_ipv6_preference)
+        device.last_seen = time.time()
+        device.online = True
+        if ":" in device.ip_address:
+            rtts = [neighbour.response_time for neighbour in neighbours if neighbour.response_time is not None]
+            if rtts:
+                device.response_time = min(rtts)
+            device.mark_refreshed("liveness")
+        return device
+
+    def _carry_over_known(self, devices: list[NetworkDevice]) -> None:
+        """Keep what the inventory knows about swept devices and the sweep did not re-probe."""
+        for device in devices:
+            known = self.devices.get(device.ip_address)
+            if known is not None:
+                carry_over(known, device)
+
+    def _adopt_ipv6_records(self, devices: list[NetworkDevice]) -> None:
+        """Fold IPv6 addresses known for each device's MAC into it.
+
+        Keeps the addresses of the device's previous record, and replaces
+        IPv6-only records of the same host, so a dual-stack host is one device.
+        """
+        for device in devices:
+            if not device.mac_address:
+                continue
+            for other in self.devices.by_mac(device.mac_address):
+                if other.ip_address != device.ip_address and ":" not in other.ip_address:
+                    continue
+                device.ipv6_addresses = sorted(
+                    {*device.ipv6_addresses, *other.ipv6_addresses}, key=_ipv6_preference
+                )
+                if other.ip_address != device.ip_address:
+                    del self.devices[other.ip_address]
+
+    async def _scan_single_host(
+        self, host: str, include_ports: bool = False, identify_services: bool = False
+    ) -> NetworkDevice | None:
         """Scan a single host."""
         is_alive, response_time = await self.ping_host(host)
 
@@ -199,66 +1151,215 @@ class NetworkScanner:
             return None
 
         device = NetworkDevice(ip_address=host, response_time=response_time)
+        device.mark_refreshed("liveness")
+
+        # Port scanning if requested; a scan cut short by the time budget
+        # leaves the ports unmarked so they are probed again later.
+        with time_budget() as ports:
+            if identify_services:
+                states, device.services = await self.scan_and_identify(host)
+                device.open_ports = [port for port, state in states.items() if state == PORT_OPEN]
+                if not ports.exhausted:
+                    device.mark_refreshed("ports", "services")
+            elif include_ports:
+                device.open_ports = await self.scan_common_ports(host)
+                if not ports.exhausted:
+                    device.mark_refreshed("ports")
 
-        # Try to get hostname
-        try:
-            hostname = socket.gethostbyaddr(host)[0]
-            device.hostname = hostname
-        except (socket.herror, socket.gaierror, OSError):
-            pass
-
-        # Get MAC address using ARP (if scapy is available)
-        if scapy_available and ARP and Ether and srp:
-            try:
-                arp_request = ARP(pdst=host)
-                broadcast = Ether(dst="ff:ff:ff:ff:ff:ff")
-                arp_request_broadcast = broadcast / arp_request
-                answered_list = srp(arp_request_broadcast, timeout=1, verbose=False)[0]
+        return device
 
-                if answered_list:
-                    device.mac_address = answered_list[0][1].hwsrc
-            except Exception as e:
-                logger.debug(f"ARP scan failed for {host}: {e}")
+    async def _enrich_devices(self, devices: list[NetworkDevice]) -> None:
+        """Resolve MAC addresses, vendors and hostnames for a batch of live devices."""
+        if devices:
+            await asyncio.gather(self.resolve_mac_addresses(devices), self.resolve_hostnames(devices))
+            self.assign_vendors(devices)
+
+    def assign_vendors(self, devices: list[NetworkDevice]) -> None:
+        """Fill in vendors from the MAC prefix registry, one index pass per batch."""
+        unassigned = [device for device in devices if device.mac_address and not device.vendor]
+        if not unassigned or self.vendors is None:
+            return
+        vendors = self.vendors.lookup_many(device.mac_address for device in unassigned)
+        for device in unassigned:
+            device.vendor = vendors.get(device.mac_address)
+
+    async def resolve_hostnames(self, devices: list[NetworkDevice]) -> None:
+        """Fill in hostnames for a batch of devices (see ``lookup_hostnames``)."""
+        unresolved = [device for device in devices if not device.hostname]
+        if not unresolved:
+            return
+
+        with time_budget() as lookup:
+            hostnames = await self.lookup_hostnames([device.ip_address for device in unresolved])
+        for device in unresolved:
+            device.hostname = hostnames.get(device.ip_address)
+            if device.hostname or not lookup.exhausted:
+                device.mark_refreshed("hostname")
+
+    async def lookup_hostnames(self, addresses: list[str]) -> dict[str, str | None]:
+        """Name a batch of addresses, link-local protocols first.
+
+        Addresses without a cached DNS name get one batched mDNS / NetBIOS /
+        LLMNR round; unicast PTR lookups run only for those still unnamed.
+        Rounds the time budget does not leave room for are skipped.
+        """
+        hostnames: dict[str, str | None] = {}
+        for address in addresses:
+            hit, hostname = self.resolver.cached(address)
+            if hit and hostname:
+                hostnames[address] = hostname
+
+        async def ask(resolve, pending: list[str]) -> None:
+            hostnames.update(await resolve(pending))
+
+        pending = [address for address in addresses if address not in hostnames]
+        if pending and not out_of_time():
+            with self.metrics.phase("names"):
+                await run_within(ask(self.names.resolve_many, pending))
+        remaining = [address for address in addresses if not hostnames.get(address)]
+        if remaining and not out_of_time():
+            await run_within(ask(self.resolver.resolve_many, remaining))
+        return hostnames
+
+    async def resolve_mac_addresses(self, devices: list[NetworkDevice]) -> None:
+        """Fill in MAC addresses for a batch of devices.
+
+        Hosts already present in the kernel neighbour table are resolved without
+        sending anything; the rest share a single ARP sweep that runs off the
+        event loop.
+        """
+        unresolved = [device for device in devices if not device.mac_address]
+        if not unresolved:
+            return
+
+        known = kernel_neighbour_table()
+        for device in unresolved:
+            device.mac_address = known.get(device.ip_address)
+        unresolved = [device for device in unresolved if not device.mac_address]
+
+        if not unresolved or not (scapy_available and ARP and Ether and srp) or out_of_time():
+            return
+
+        addresses = [device.ip_address for device in unresolved]
+        await self.scheduler.pace(len(addresses))
+        # The sweep runs in a thread that cannot be cancelled, so it must end by the deadline.
+        timeout = clamp(max(self.scheduler.timeout_for(address) for address in addresses))
+        try:
+            with self.metrics.phase("arp") as timer:
+                answers = await asyncio.to_thread(self._arp_sweep, addresses, timeout)
+                if len(answers) < len(addresses):
+                    timer.timed_out()
+        except Exception as e:
+            logger.debug(f"ARP sweep failed for {len(unresolved)} hosts: {e}")
+            return
 
-        # Port scanning if requested
-        if include_ports:
-            device.open_ports = await self.scan_common_ports(host)
+        for device in unresolved:
+            device.mac_address = answers.get(device.ip_address)
 
-        return device
+    @staticmethod
+    def _arp_sweep(addresses: list[str], timeout: float) -> dict[str, str]:
+        """Send one batched ARP request over all addresses (blocking)."""
+        arp_request_broadcast = Ether(dst="ff:ff:ff:ff:ff:ff") / ARP(pdst=addresses)
+        answered_list = srp(arp_request_broadcast, timeout=timeout, verbose=False)[0]
+        return {received.psrc: received.hwsrc.lower() for _, received in answered_list}
 
-    async def scan_common_ports(self, host: str, ports: list[int] | None = None) -> list[int]:
+    async def scan_common_ports(self, host: str, ports: str | list[int] | None = None) -> list[int]:
         """Scan common ports on a host."""
+        states = await self.scan_ports(host, ports)
+        return [port for port, state in states.items() if state == PORT_OPEN]
+
+    async def scan_ports(self, host: str, ports: str | list[int] | None = None) -> dict[int, str]:
+        """Connect-scan ports on a host, classifying each as open, closed or filtered.
+
+        ``ports`` may be a list or a spec such as ``"1-1024,8080"``.
+        """
+        results = await self.probe_ports(host, ports)
+        return {port: result.state for port, result in results.items()}
+
+    async def scan_and_identify(
+        self, host: str, ports: str | list[int] | None = None
+    ) -> tuple[dict[int, str], dict[int, str]]:
+        """Scan ports and identify services using one connection per port.
+
+        Banners are captured on the discovery connection itself, so
+        identification never has to reconnect. Returns ``(states, services)``.
+        """
+        results = await self.probe_ports(host, ports, grab_banners=True)
+        states = {port: result.state for port, result in results.items()}
+        banners = {port: result.banner for port, result in results.items() if result.state == PORT_OPEN}
+        services = await self.identify_device_services(host, list(banners), banners)
+        return states, services
+
+    async def probe_ports(
+        self, host: str, ports: str | list[int] | None = None, grab_banners: bool = False
+    ) -> dict[int, PortProbeResult]:
+        """Connect-probe ports on a host, optionally keeping each open socket briefly for its banner.
+
+        A pool of at most ``max_connections_per_host`` workers walks the port
+        list, so full 1-65535 ranges need no per-port tasks. Ports not reached
+        before the time budget runs out are left out of the result.
+        """
         if ports is None:
             # Common ports to scan
             ports = [21, 22, 23, 25, 53, 80, 110, 111, 135, 139, 143, 443, 993, 995, 1723, 3389, 5900]
+        port_list = parse_port_spec(ports)
 
-        open_ports = []
-        semaphore = asyncio.Semaphore(10)  # Limit concurrent connections
-
-        async def scan_port(port: int) -> int | None:
-            async with semaphore:
-                try:
-                    future = asyncio.open_connection(host, port)
-                    reader, writer = await asyncio.wait_for(future, timeout=1.0)
-                    writer.close()
-                    await writer.wait_closed()
-                    return port
-                except (asyncio.TimeoutError, OSError, ConnectionRefusedError):
-                    return None
-
-        tasks = [scan_port(port) for port in ports]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for result in results:
-            if isinstance(result, int):
-                open_ports.append(result)
-
-        return sorted(open_ports)
-
-    async def identify_device_services(self, host: str, ports: list[int]) -> dict[int, str]:
-        """Identify services running on specific ports."""
-        services = {}
-
+        try:
+            family, address = await resolve_target(host)
+        except OSError as e:
+            logger.debug(f"Cannot resolve {host}: {e}")
+            return {}
+
+        results: dict[int, PortProbeResult] = {}
+        remaining = iter(port_list)
+
+        async def worker() -> None:
+            for port in remaining:
+                results[port] = await self._probe_port(host, family, address, port, grab_banners)
+
+        workers = min(len(port_list), self.connections.per_host)
+        await run_within(*(worker() for _ in range(workers)))
+        return dict(sorted(results.items()))
+
+    async def _probe_port(
+        self, host: str, family: int, address: str, port: int, grab_banner: bool, payload: bytes = b""
+    ) -> PortProbeResult:
+        async with self.connections.connection(host), self.scheduler.probe(host) as probe:
+            # Give a service that speaks first some think time beyond the RTT.
+            banner_window = clamp(probe.timeout + BANNER_GRACE) if grab_banner or payload else 0.0
+            started = time.perf_counter()
+            try:
+                with self.metrics.phase("connect") as timer:
+                    result = await connect_probe(family, address, port, probe.timeout, banner_window, payload)
+                    if result.rtt is None:
+                        timer.timed_out()
+                    else:
+                        # The banner wait is timed as its own phase.
+                        timer.record_as(result.rtt)
+            except OSError as e:
+                logger.debug(f"Connect to {host}:{port} failed: {e}")
+                return PortProbeResult(PORT_FILTERED)
+            if result.rtt is None:
+                probe.timed_out()
+            else:
+                # A RST is still an answer and a valid RTT sample.
+                probe.answered(result.rtt)
+                if banner_window and result.state == PORT_OPEN:
+                    self.metrics.observe("banner", time.perf_counter() - started - result.rtt, not result.banner)
+            return result
+
+    async def identify_device_services(
+        self, host: str, ports: list[int], banners: dict[int, bytes] | None = None
+    ) -> dict[int, str]:
+        """Identify services running on specific ports.
+
+        A port's banner is matched against the service probe database first;
+        ports that stay silent or only give a partial match are sent the
+        probes the database hints for that port. The port-number table is the
+        fallback. Banners already captured by the port scan (even empty ones)
+        are reused instead of reconnecting. Ports still being probed when the
+        time budget runs out are named from the port-number table.
+        """
         service_map = {
             21: "FTP",
             22: "SSH",
@@ -278,49 +1379,141 @@ class NetworkScanner:
             3389: "RDP",
             5900: "VNC"
         }
+        banners = banners or {}
+        database = self.fingerprints
+        target = None
+        try:
+            target = await resolve_target(host)
+        except OSError as e:
+            logger.debug(f"Cannot resolve {host}: {e}")
+
+        identified: dict[int, str] = {}
+
+        async def identify(port: int) -> None:
+            banner = banners.get(port)
+            if banner is None and target is not None:
+                banner = (await self._probe_port(host, *target, port, grab_banner=True)).banner
+            identity = database.match(banner) if banner else None
+
+            if target is not None and (identity is None or identity.soft):
+                for service_probe in database.probes_for_port(port):
+                    reply = (await self._probe_port(host, *target, port, True, service_probe.payload)).banner
+                    found = database.match(reply, service_probe.name)
+                    if found is not None and not found.soft:
+                        identity = found
+                        break
+                    identity = identity or found
+                    banner = banner or reply
+
+            identified[port] = _describe_service(identity, service_map.get(port), banner or b"")
+
+        await run_within(*(identify(port) for port in ports))
+        return {
+            port: identified.get(port) or _describe_service(None, service_map.get(port), b"")
+            for port in ports
+        }
 
-        for port in ports:
-            if port in service_map:
-                services[port] = service_map[port]
-            else:
-                # Try to identify service by banner grabbing
-                try:
-                    reader, writer = await asyncio.wait_for(
-                        asyncio.open_connection(host, port), timeout=2.0
-                    )
-
-                    # Read banner
-                    banner = await asyncio.wait_for(reader.read(100), timeout=1.0)
-                    writer.close()
-                    await writer.wait_closed()
-
-                    banner_str = banner.decode('utf-8', errors='ignore').strip()
-                    if banner_str:
-                        services[port] = f"Unknown ({banner_str[:30]})"
-                    else:
-                        services[port] = "Unknown"
-
-                except (asyncio.TimeoutError, OSError, ConnectionRefusedError, UnicodeDecodeError):
-                    services[port] = "Unknown"
-
-        return services
-
-    async def get_device_details(self, ip_address: str) -> NetworkDevice | None:
-        """Get detailed information about a specific device."""
-        device: NetworkDevice | None = None
-
-        if ip_address in self.devices:
-            device = self.devices[ip_address]
-        else:
-            device = await self._scan_single_host(ip_address, include_ports=True)
+    async def get_device_details(self, ip_address: str, max_age: float | None = None) -> NetworkDevice | None:
+        """Get detailed information about a specific device.
+
+        A cached device is served as is while every field is within its TTL
+        (``self.freshness``). Fields that were never probed are probed before
+        returning; fields that are merely stale are returned immediately and
+        refreshed in the background. ``max_age`` (seconds) overrides the TTLs
+        and forces anything older to be re-probed before returning.
+        """
+        if ip_address not in self.devices:
+            device = await self._scan_single_host(ip_address, identify_services=True)
             if device:
+                await self._enrich_devices([device])
                 self.devices[ip_address] = device
+            return device
+
+        device = self.devices[ip_address]
+        missing = []
+        stale = []
+        for name, ttl in self.freshness.items():
+            age = device.age(name)
+            if age == math.inf or (max_age is not None and age > max_age):
+                missing.append(name)
+            elif age > ttl:
+                stale.append(name)
+
+        if missing:
+            device = await self._refresh_device(device, missing + stale)
+        elif stale and ip_address not in self._refreshing:
+            task = asyncio.create_task(self._refresh_in_background(device, stale))
+            self._refreshing[ip_address] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(ip_address, None))
+        return device
 
-        if device and device.open_ports:
-            device.services = await self.identify_device_services(ip_address, device.open_ports)
-
+    async def _refresh_in_background(self, device: NetworkDevice, fields: list[str]) -> NetworkDevice:
+        # Outlives the call that started it, so it is not bound by that call's
+        # time budget nor counted in its timing breakdown.
+        with no_budget(), no_breakdown():
+            return await self._refresh_device(device, fields)
+
+    async def _refresh_device(
+        self, device: NetworkDevice, fields: list[str], store: bool = True
+    ) -> NetworkDevice:
+        """Re-probe the given fields of a cached device and (by default) store it.
+
+        Fields the time budget cuts short keep their last known values and
+        are not marked refreshed.
+        """
+        host = device.ip_address
+        logger.debug(f"Refreshing {', '.join(fields)} for {host}")
+        try:
+            if "liveness" in fields:
+                with time_budget() as ping:
+                    is_alive, response_time = await self.ping_host(host)
+                if ping.exhausted:
+                    return device
+                device.mark_refreshed("liveness")
+                device.online = is_alive
+                if is_alive:
+                    device.response_time = response_time
+                    device.last_seen = time.time()
+                else:
+                    # Leave the rest as last known; retention ages the device out.
+                    fields = []
+
+            probes = []
+            if "ports" in fields:
+                probes.append(self._refresh_ports(device))
+            elif "services" in fields and device.open_ports:
+                probes.append(self._refresh_services(device))
+            if "hostname" in fields:
+                probes.append(self._refresh_hostname(device))
+            await run_within(*probes)
+        except Exception as e:
+            logger.debug(f"Refresh of {host} failed: {e}")
+        if store:
+            self.devices[host] = device
         return device
 
+    async def _refresh_ports(self, device: NetworkDevice) -> None:
+        with time_budget() as scan:
+            states, services = await self.scan_and_identify(device.ip_address)
+        if not scan.exhausted:
+            device.open_ports = [port for port, state in states.items() if state == PORT_OPEN]
+            device.services = services
+            device.mark_refreshed("ports", "services")
+
+    async def _refresh_services(self, device: NetworkDevice) -> None:
+        with time_budget() as scan:
+            services = await self.identify_device_services(device.ip_address, device.open_ports)
+        if not scan.exhausted:
+            device.services = services
+            device.mark_refreshed("services")
+
+    async def _refresh_hostname(self, device: NetworkDevice) -> None:
+        with time_budget() as lookup:
+            hostname = (await self.lookup_hostnames([device.ip_address])).get(device.ip_address)
+        if hostname or not lookup.exhausted:
+            device.hostname = hostname
+            device.mark_refreshed("hostname")
+
     def guess_device_type(self, device: NetworkDevice) -> str:
         """Guess device type based on open ports and services."""
         if not device.open_ports:
@@ -3,6 +3,10 @@
 import asyncio
 import json
 import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, nullcontext
 from typing import Any
 
 from mcp.server import NotificationOptions, Server
@@ -15,7 +19,32 @@ from mcp.types import (
     Tool,
 )
 
-from .scanner import NetworkScanner
+from .budget import time_budget
+from .inventory import DEFAULT_MAX_DEVICES, DEFAULT_RETENTION, DeviceInventory
+from .metrics import ScannerMetrics, phase_breakdown
+from .monitor import (
+    DEFAULT_CPU_BUDGET,
+    DEFAULT_INTERVAL,
+    DEFAULT_JITTER,
+    DEFAULT_PACKET_RATE,
+    NetworkMonitor,
+)
+from .output import FORMAT_JSON, FORMAT_TABLE, FORMATS, EncodedRows, Page, ResultStore
+from .passive import PassiveListener
+from .portscan import PORT_CLOSED, PORT_FILTERED, PORT_OPEN
+from .scanner import (
+    NetworkDevice,
+    NetworkScanner,
+    SweepProgress,
+    collapse_networks,
+    merge_devices,
+)
+
+# Seconds between progress notifications while a sweep runs
+PROGRESS_INTERVAL = 1.0
+
+# Time budget (seconds) for tool calls that do not pass one
+DEFAULT_BUDGET = float(os.environ.get("NETWORK_DISCOVERY_BUDGET") or "inf")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,8 +53,175 @@ logger = logging.getLogger(__name__)
 # Create the MCP server
 server: Server = Server("network-discovery")
 
-# Initialize the network scanner
-scanner = NetworkScanner()
+# Initialize the network scanner; set NETWORK_DISCOVERY_DB to a file path to
+# keep the device inventory across restarts and NETWORK_DISCOVERY_METRICS=0
+# to turn off probe instrumentation.
+scanner = NetworkScanner(
+    inventory=DeviceInventory(
+        os.environ.get("NETWORK_DISCOVERY_DB", ":memory:"),
+        retention=float(os.environ.get("NETWORK_DISCOVERY_RETENTION", DEFAULT_RETENTION)),
+        max_devices=int(os.environ.get("NETWORK_DISCOVERY_MAX_DEVICES", DEFAULT_MAX_DEVICES)),
+    ),
+    metrics=ScannerMetrics(
+        enabled=os.environ.get("NETWORK_DISCOVERY_METRICS", "1").lower() not in ("0", "false", "no")
+    ),
+)
+
+# Passive listener, started by main() when NETWORK_DISCOVERY_PASSIVE is set
+passive: PassiveListener | None = None
+
+# Background monitor, started by main() when NETWORK_DISCOVERY_MONITOR is set
+monitor: NetworkMonitor | None = None
+
+# Device result sets kept for cursor pagination
+results = ResultStore()
+
+# Optional output arguments shared by the device-listing tools
+OUTPUT_PROPERTIES = {
+    "format": {
+        "type": "string",
+        "enum": list(FORMATS),
+        "description": "'json' (indented), 'compact' (no whitespace) or 'table' "
+                       "(a column header line, then one array per device)",
+        "default": FORMAT_JSON,
+    },
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only include these device fields, e.g. ['ip_address', 'open_ports']",
+    },
+}
+PAGING_PROPERTIES = {
+    "page_size": {
+        "type": "integer",
+        "description": "Return at most this many devices and a cursor for the rest",
+    },
+    "cursor": {
+        "type": "string",
+        "description": "Cursor from a previous response; returns the next page without rescanning",
+    },
+}
+
+
+# Accepted by every tool that probes
+BUDGET_PROPERTIES = {
+    "budget": {
+        "type": "number",
+        "description": "Stop after about this many seconds and return what was found so far, marked partial",
+    },
+}
+
+# Accepted by every tool
+TIMING_PROPERTIES = {
+    "timings": {
+        "type": "boolean",
+        "description": "Append a per-phase timing breakdown (ping, DNS, ARP, connects, ...) to the response",
+        "default": False,
+    },
+}
+
+
+class _ScanReporter:
+    """Streams sweep progress and partial device batches to the client of the current call.
+
+    Progress goes out as progress notifications when the client sent a
+    progress token; device batches go out as log messages tied to the
+    request. Outside a request (or if the client has gone) this does nothing.
+    """
+
+    def __init__(self, progress: SweepProgress) -> None:
+        self.progress = progress
+        try:
+            context = server.request_context
+        except LookupError:
+            context = None
+        self._session = context.session if context else None
+        self._request_id = context.request_id if context else None
+        self._token = context.meta.progressToken if context and context.meta else None
+
+    async def send_progress(self) -> None:
+        if self._session is None or self._token is None:
+            return
+        eta = self.progress.eta()
+        message = f"{self.progress.probed}/{self.progress.total} hosts probed, {self.progress.found} found"
+        if eta is not None:
+            message += f", about {eta:.0f}s left"
+        try:
+            await self._session.send_progress_notification(
+                self._token, self.progress.probed, self.progress.total, message=message
+            )
+        except Exception as e:
+            logger.debug(f"Cannot send progress notification: {e}")
+
+    async def send_devices(self, network: str, devices: list[NetworkDevice]) -> None:
+        if self._session is None or not devices:
+            return
+        try:
+            await self._session.send_log_message(
+                level="info",
+                data={"network": network, "partial": True, "devices": [_device_info(d) for d in devices]},
+                logger="network-discovery",
+                related_request_id=self._request_id,
+            )
+        except Exception as e:
+            logger.debug(f"Cannot send partial results: {e}")
+        await self.send_progress()
+
+    @asynccontextmanager
+    async def running(self) -> AsyncIterator["_ScanReporter"]:
+        """Send progress every PROGRESS_INTERVAL while the block runs."""
+        async def tick() -> None:
+            while True:
+                await asyncio.sleep(PROGRESS_INTERVAL)
+                await self.send_progress()
+
+        ticker = asyncio.create_task(tick())
+        try:
+            yield self
+        finally:
+            ticker.cancel()
+            await asyncio.wait([ticker])
+            await self.send_progress()
+
+
+def _device_page(summary: str, devices: list[NetworkDevice], arguments: dict[str, Any]) -> Page:
+    """Encode devices once in the requested format and return the first page."""
+    encoded = EncodedRows.encode(
+        [_device_info(device) for device in devices],
+        arguments.get("format", FORMAT_JSON),
+        arguments.get("fields"),
+    )
+    return results.first_page(summary, encoded, arguments.get("page_size"))
+
+
+def _page_result(page: Page) -> CallToolResult:
+    text = f"{page.summary}\n\nDevices:\n{page.text}"
+    if page.next_cursor is not None:
+        text += f"\n\nShowing {page.start + 1}-{page.end} of {page.total}; next cursor: {page.next_cursor}"
+    return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
+def _device_info(device: NetworkDevice) -> dict[str, Any]:
+    device_info = device.to_dict()
+    device_info["device_type"] = scanner.guess_device_type(device)
+    return device_info
+
+
+async def _sweep_with_progress(
+    networks: list[str],
+    include_ports: bool,
+    reporter: _ScanReporter,
+    timings: dict[str, float] | None = None,
+) -> list[NetworkDevice]:
+    """Sweep ``networks`` concurrently, streaming each batch as it is found."""
+    found: list[tuple[str, NetworkDevice]] = []
+    async with reporter.running():
+        async for network, batch in scanner.iter_networks_batches(
+            networks, include_ports, reporter.progress, timings
+        ):
+            found.extend((network, device) for device in batch)
+            await reporter.send_devices(network, batch)
+    return merge_devices(found)
 
 
 @server.list_tools()
@@ -41,13 +237,49 @@ async def handle_list_tools() -> ListToolsResult:
                     "properties": {
                         "network": {
                             "type": "string",
-                            "description": "Network range in CIDR notation (e.g., '192.168.1.0/24')",
+                            "description": "Network range in CIDR notation (e.g., '192.168.1.0/24'); IPv6 prefixes are discovered via multicast and NDP instead of swept",
                         },
                         "include_ports": {
                             "type": "boolean",
                             "description": "Whether to scan for open ports on discovered devices",
                             "default": False,
                         },
+                        "refresh": {
+                            "type": "boolean",
+                            "description": "Sweep now even if the background monitor has current results",
+                            "default": False,
+                        },
+                        "passive": {
+                            "type": "boolean",
+                            "description": "Send no probes; report the devices already known in the range, "
+                                           "e.g. from passive listening",
+                            "default": False,
+                        },
+                        **OUTPUT_PROPERTIES,
+                        **PAGING_PROPERTIES,
+                        **BUDGET_PROPERTIES,
+                        **TIMING_PROPERTIES,
+                    },
+                },
+            ),
+            Tool(
+                name="rescan_network",
+                description="Re-scan a network range and report devices added, removed and changed "
+                            "since the last scan; only new or changed hosts are probed in depth",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "network": {
+                            "type": "string",
+                            "description": "Network range in CIDR notation (e.g., '192.168.1.0/24')",
+                        },
+                        "include_ports": {
+                            "type": "boolean",
+                            "description": "Whether to scan ports on new and changed devices",
+                            "default": False,
+                        },
+                        **BUDGET_PROPERTIES,
+                        **TIMING_PROPERTIES,
                     },
                     "required": ["network"],
                 },
@@ -57,7 +289,7 @@ async def handle_list_tools() -> ListToolsResult:
                 description="Get information about local network interfaces",
                 inputSchema={
                     "type": "object",
-                    "properties": {},
+                    "properties": {**TIMING_PROPERTIES},
                 },
             ),
             Tool(
@@ -75,6 +307,12 @@ async def handle_list_tools() -> ListToolsResult:
                             "items": {"type": "integer"},
                             "description": "List of ports to scan (if not provided, scans common ports)",
                         },
+                        "port_range": {
+                            "type": "string",
+                            "description": "Port spec such as '1-1024,8080'; overrides 'ports'",
+                        },
+                        **BUDGET_PROPERTIES,
+                        **TIMING_PROPERTIES,
                     },
                     "required": ["host"],
                 },
@@ -89,6 +327,14 @@ async def handle_list_tools() -> ListToolsResult:
                             "type": "string",
                             "description": "IP address of the device to analyze",
                         },
+                        "max_age": {
+                            "type": "number",
+                            "description": "Re-probe anything cached longer than this many seconds "
+                                           "(defaults to per-field TTLs with background refresh)",
+                        },
+                        **OUTPUT_PROPERTIES,
+                        **BUDGET_PROPERTIES,
+                        **TIMING_PROPERTIES,
                     },
                     "required": ["ip_address"],
                 },
@@ -104,10 +350,11 @@ async def handle_list_tools() -> ListToolsResult:
                             "description": "IP address or hostname to ping",
                         },
                         "timeout": {
-                            "type": "integer",
-                            "description": "Ping timeout in seconds",
-                            "default": 1,
+                            "type": "number",
+                            "description": "Ping timeout in seconds (defaults to an RTT-derived timeout)",
                         },
+                        **BUDGET_PROPERTIES,
+                        **TIMING_PROPERTIES,
                     },
                     "required": ["host"],
                 },
@@ -123,6 +370,32 @@ async def handle_list_tools() -> ListToolsResult:
                             "description": "Whether to scan for open ports on discovered devices",
                             "default": False,
                         },
+                        **OUTPUT_PROPERTIES,
+                        **PAGING_PROPERTIES,
+                        **BUDGET_PROPERTIES,
+                        **TIMING_PROPERTIES,
+                    },
+                },
+            ),
+            Tool(
+                name="get_scanner_metrics",
+                description="Report per-phase probe statistics (latency histograms, timeouts, retries, "
+                            "in-flight probes), per-tool call latency, background monitor sweeps and "
+                            "passive capture counts",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "format": {
+                            "type": "string",
+                            "enum": ["json", "prometheus"],
+                            "description": "'json' or the Prometheus text exposition format",
+                            "default": "json",
+                        },
+                        "reset": {
+                            "type": "boolean",
+                            "description": "Clear the statistics after reporting them",
+                            "default": False,
+                        },
                     },
                 },
             ),
@@ -135,21 +408,24 @@ async def handle_call_tool(request: CallToolRequest) -> CallToolResult:
     """Handle tool execution requests."""
     try:
         arguments = request.params.arguments or {}
-
-        if request.params.name == "scan_network":
-            return await _scan_network(arguments)
-        elif request.params.name == "get_network_interfaces":
-            return await _get_network_interfaces(arguments)
-        elif request.params.name == "scan_device_ports":
-            return await _scan_device_ports(arguments)
-        elif request.params.name == "get_device_details":
-            return await _get_device_details(arguments)
-        elif request.params.name == "ping_host":
-            return await _ping_host(arguments)
-        elif request.params.name == "discover_local_network":
-            return await _discover_local_network(arguments)
-        else:
+        budget = arguments.get("budget", DEFAULT_BUDGET)
+        handler = TOOL_HANDLERS.get(request.params.name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {request.params.name}")
+
+        # A cancelled request unwinds through here: the scanner tears down its
+        # probes, and devices found so far are already in the inventory.
+        timings = phase_breakdown() if arguments.get("timings", False) else nullcontext()
+        with scanner.metrics.tool(request.params.name), time_budget(budget) as spent, timings as breakdown:
+            result = await handler(arguments)
+        if spent.exhausted:
+            result.content.append(TextContent(
+                type="text",
+                text=f"Partial results: the {budget:g}s time budget ran out before {request.params.name} finished",
+            ))
+        if breakdown is not None:
+            result.content.append(TextContent(type="text", text=breakdown.summary()))
+        return result
     except Exception as e:
         logger.error(f"Error executing tool {request.params.name}: {e}")
         return CallToolResult(
@@ -167,26 +443,66 @@ async def _scan_network(arguments: dict[str, Any]) -> CallToolResult:
     network = arguments.get("network")
     include_ports = arguments.get("include_ports", False)
 
+    if arguments.get("cursor"):
+        return _page_result(results.page(arguments["cursor"]))
     if not network:
         raise ValueError("Network parameter is required")
 
+    if arguments.get("passive", False):
+        devices = [device for device in scanner.devices.in_network(network) if device.online]
+        summary = f"Found {len(devices)} known devices on network {network} (no probes sent)"
+        if passive is not None:
+            summary += f"; passive listener has seen {passive.packets} packets"
+        return _page_result(_device_page(summary, devices, arguments))
+
+    covered = None
+    if monitor is not None and not arguments.get("refresh", False):
+        covered = monitor.covers(network, include_ports)
+    if covered is not None:
+        logger.info(f"Answering {network} from the background monitor")
+        devices = [device for device in scanner.devices.in_network(network) if device.online]
+        summary = (
+            f"Found {len(devices)} active devices on network {network} "
+            f"(background sweep {time.time() - covered.last_sweep:.0f}s ago)"
+        )
+        return _page_result(_device_page(summary, devices, arguments))
+
     logger.info(f"Scanning network: {network}")
-    devices = await scanner.scan_network_range(network, include_ports)
+    progress = SweepProgress()
+    progress.add_network(network)
+    devices = await _sweep_with_progress([network], include_ports, _ScanReporter(progress))
 
-    # Format results
-    results = []
-    for device in devices:
-        device_info = device.to_dict()
+    summary = f"Found {len(devices)} active devices on network {network}"
+    return _page_result(_device_page(summary, devices, arguments))
+
+
+async def _rescan_network(arguments: dict[str, Any]) -> CallToolResult:
+    """Re-scan a network range and report the differences."""
+    network = arguments.get("network")
+    include_ports = arguments.get("include_ports", False)
+
+    if not network:
+        raise ValueError("Network parameter is required")
+
+    logger.info(f"Rescanning network: {network}")
+    diff = await scanner.rescan_network(network, include_ports)
+
+    report = diff.to_dict()
+    for device_info, device in zip(report["added"], diff.added, strict=True):
         device_info["device_type"] = scanner.guess_device_type(device)
-        results.append(device_info)
 
-    summary = f"Found {len(devices)} active devices on network {network}"
+    summary = (
+        f"Rescan of {diff.network}: {len(diff.added)} added, {len(diff.removed)} removed, "
+        f"{len(diff.changed)} changed, {diff.unchanged} unchanged"
+    )
+    if diff.partial:
+        summary += " (liveness pass cut short by the time budget; nothing is reported removed)"
 
     return CallToolResult(
         content=[
             TextContent(
                 type="text",
-                text=f"{summary}\n\nDevices:\n{json.dumps(results, indent=2)}"
+                text=f"{summary}\n\n{json.dumps(report, indent=2)}"
             )
         ]
     )
@@ -223,23 +539,22 @@ async def _get_network_interfaces(arguments: dict[str, Any]) -> CallToolResult:
 async def _scan_device_ports(arguments: dict[str, Any]) -> CallToolResult:
     """Scan specific ports on a target device."""
     host = arguments.get("host")
-    ports = arguments.get("ports")
+    ports = arguments.get("port_range") or arguments.get("ports")
 
     if not host:
         raise ValueError("Host parameter is required")
 
     logger.info(f"Scanning ports on host: {host}")
-    open_ports = await scanner.scan_common_ports(host, ports)
-
-    services = {}
-    if open_ports:
-        services = await scanner.identify_device_services(host, open_ports)
+    states, services = await scanner.scan_and_identify(host, ports)
+    open_ports = [port for port, state in states.items() if state == PORT_OPEN]
 
     result = {
         "host": host,
         "open_ports": open_ports,
         "services": services,
-        "total_open_ports": len(open_ports)
+        "total_open_ports": len(open_ports),
+        "closed_ports": sum(1 for state in states.values() if state == PORT_CLOSED),
+        "filtered_ports": sum(1 for state in states.values() if state == PORT_FILTERED),
     }
 
     return CallToolResult(
@@ -255,12 +570,13 @@ async def _scan_device_ports(arguments: dict[str, Any]) -> CallToolResult:
 async def _get_device_details(arguments: dict[str, Any]) -> CallToolResult:
     """Get detailed information about a specific device."""
     ip_address = arguments.get("ip_address")
+    max_age = arguments.get("max_age")
 
     if not ip_address:
         raise ValueError("IP address parameter is required")
 
     logger.info(f"Getting device details for: {ip_address}")
-    device = await scanner.get_device_details(ip_address)
+    device = await scanner.get_device_details(ip_address, max_age)
 
     if not device:
         return CallToolResult(
@@ -272,14 +588,14 @@ async def _get_device_details(arguments: dict[str, Any]) -> CallToolResult:
             ]
         )
 
-    device_info = device.to_dict()
-    device_info["device_type"] = scanner.guess_device_type(device)
+    encoded = EncodedRows.encode([_device_info(device)], arguments.get("format", FORMAT_JSON), arguments.get("fields"))
+    details = encoded.render() if encoded.output_format == FORMAT_TABLE else encoded.rows[0]
 
     return CallToolResult(
         content=[
             TextContent(
                 type="text",
-                text=f"Device details for {ip_address}:\n{json.dumps(device_info, indent=2)}"
+                text=f"Device details for {ip_address}:\n{details}"
             )
         ]
     )
@@ -288,7 +604,7 @@ async def _get_device_details(arguments: dict[str, Any]) -> CallToolResult:
 async def _ping_host(arguments: dict[str, Any]) -> CallToolResult:
     """Ping a specific host to check if it's reachable."""
     host = arguments.get("host")
-    timeout = arguments.get("timeout", 1)
+    timeout = arguments.get("timeout")
 
     if not host:
         raise ValueError("Host parameter is required")
@@ -319,6 +635,9 @@ async def _discover_local_network(arguments: dict[str, Any]) -> CallToolResult:
     """Automatically discover and scan the local network."""
     include_ports = arguments.get("include_ports", False)
 
+    if arguments.get("cursor"):
+        return _page_result(results.page(arguments["cursor"]))
+
     logger.info("Discovering local network")
 
     # Get network interfaces
@@ -334,58 +653,166 @@ async def _discover_local_network(arguments: dict[str, Any]) -> CallToolResult:
             ]
         )
 
-    all_devices = []
-    scanned_networks = []
-
-    # Scan each network
-    for interface in interfaces:
-        if interface.network and not interface.network.startswith("127."):
-            logger.info(f"Scanning network: {interface.network}")
-            devices = await scanner.scan_network_range(interface.network, include_ports)
-            all_devices.extend(devices)
-            scanned_networks.append(interface.network)
-
-    # Format results
-    device_results = []
-    for device in all_devices:
-        device_info = device.to_dict()
-        device_info["device_type"] = scanner.guess_device_type(device)
-        device_results.append(device_info)
+    # Interfaces on the same or nested networks would otherwise probe hosts twice.
+    scanned_networks = collapse_networks([
+        interface.network for interface in interfaces
+        if interface.network and not interface.network.startswith("127.")
+    ])
+    progress = SweepProgress()
+    for network in scanned_networks:
+        progress.add_network(network)
+
+    logger.info(f"Scanning networks: {', '.join(scanned_networks)}")
+    # IPv6 prefixes cannot be swept; one link-level discovery covers all of them.
+    ipv4_networks = [network for network in scanned_networks if ":" not in network]
+    ipv6_networks = [network for network in scanned_networks if ":" in network]
+    timings: dict[str, float] = {}
+    reporter = _ScanReporter(progress)
+    all_devices = await _sweep_with_progress(ipv4_networks, include_ports, reporter, timings)
+    if ipv6_networks:
+        started = time.monotonic()
+        ipv6_devices = await scanner.discover_ipv6()
+        await reporter.send_devices(", ".join(ipv6_networks), ipv6_devices)
+        timings.update(dict.fromkeys(ipv6_networks, time.monotonic() - started))
+        # Dual-stack hosts come back as their IPv4 device, now carrying IPv6 addresses.
+        merged = {device.ip_address: device for device in all_devices}
+        merged.update((device.ip_address, device) for device in ipv6_devices)
+        all_devices = list(merged.values())
+
+    summary = (
+        f"Local network discovery complete: found {len(all_devices)} active devices "
+        f"on {', '.join(scanned_networks) or 'no scannable networks'}"
+    )
+    if timings:
+        summary += "\nSweep time per network: " + ", ".join(
+            f"{network} {timings[network]:.1f}s" for network in scanned_networks if network in timings
+        )
+    return _page_result(_device_page(summary, all_devices, arguments))
 
-    summary = {
-        "scanned_networks": scanned_networks,
-        "total_devices_found": len(all_devices),
-        "devices": device_results
-    }
 
-    return CallToolResult(
-        content=[
-            TextContent(
-                type="text",
-                text=f"Local network discovery complete:\n{json.dumps(summary, indent=2)}"
-            )
+async def _get_scanner_metrics(arguments: dict[str, Any]) -> CallToolResult:
+    """Report probe phase and tool call statistics, and the background monitor and passive listener."""
+    output_format = arguments.get("format", "json")
+    scheduler = scanner.scheduler.stats()
+    if output_format == "prometheus":
+        gauges = {
+            f"scheduler_{key}": value for key, value in scheduler.items() if isinstance(value, int | float)
+        }
+        gauges["inventory_devices"] = len(scanner.devices)
+        if monitor is not None:
+            gauges["monitor_running"] = int(monitor.running)
+        if passive is not None:
+            gauges["passive_packets"] = passive.packets
+            gauges["passive_sightings"] = passive.sightings
+        text = scanner.metrics.to_prometheus(gauges)
+    elif output_format == "json":
+        report = scanner.metrics.snapshot()
+        report["scheduler"] = scheduler
+        report["inventory_devices"] = len(scanner.devices)
+        if monitor is not None:
+            report["monitor"] = monitor.status()
+        if passive is not None:
+            report["passive"] = passive.status()
+        text = f"Scanner metrics:\n{json.dumps(report, indent=2)}"
+    else:
+        raise ValueError(f"Unknown metrics format: {output_format} (expected 'json' or 'prometheus')")
+
+    if arguments.get("reset", False):
+        scanner.metrics.reset()
+    return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
+TOOL_HANDLERS = {
+    "scan_network": _scan_network,
+    "rescan_network": _rescan_network,
+    "get_network_interfaces": _get_network_interfaces,
+    "scan_device_ports": _scan_device_ports,
+    "get_device_details": _get_device_details,
+    "ping_host": _ping_host,
+    "discover_local_network": _discover_local_network,
+    "get_scanner_metrics": _get_scanner_metrics,
+}
+
+
+async def _start_monitor() -> NetworkMonitor | None:
+    """Start the background monitor configured through the environment, if any.
+
+    NETWORK_DISCOVERY_MONITOR is a comma-separated list of CIDRs, or "auto"
+    for the networks of the local interfaces.
+    """
+    setting = os.environ.get("NETWORK_DISCOVERY_MONITOR", "").strip()
+    if not setting:
+        return None
+    if setting == "auto":
+        networks = [
+            interface.network for interface in await scanner.get_network_interfaces()
+            if interface.network and ":" not in interface.network and not interface.network.startswith("127.")
         ]
+    else:
+        networks = [network.strip() for network in setting.split(",") if network.strip()]
+    if not networks:
+        logger.warning("Background monitor enabled but there are no networks to monitor")
+        return None
+
+    background = NetworkMonitor(
+        scanner,
+        networks,
+        interval=float(os.environ.get("NETWORK_DISCOVERY_MONITOR_INTERVAL", DEFAULT_INTERVAL)),
+        jitter=float(os.environ.get("NETWORK_DISCOVERY_MONITOR_JITTER", DEFAULT_JITTER)),
+        packet_rate=float(os.environ.get("NETWORK_DISCOVERY_MONITOR_PPS", DEFAULT_PACKET_RATE)),
+        cpu_budget=float(os.environ.get("NETWORK_DISCOVERY_MONITOR_CPU", DEFAULT_CPU_BUDGET)),
+        include_ports=os.environ.get("NETWORK_DISCOVERY_MONITOR_PORTS", "").lower() in ("1", "true", "yes"),
     )
+    background.start()
+    return background
+
+
+def _start_passive() -> PassiveListener | None:
+    """Start the passive listener configured through the environment, if any.
+
+    NETWORK_DISCOVERY_PASSIVE is an interface name, or "all" for every interface.
+    """
+    setting = os.environ.get("NETWORK_DISCOVERY_PASSIVE", "").strip()
+    if not setting:
+        return None
+    listener = PassiveListener(scanner.devices, interface=None if setting == "all" else setting)
+    try:
+        listener.start()
+    except OSError as e:
+        logger.warning(f"Passive listening unavailable (needs CAP_NET_RAW on Linux): {e}")
+        return None
+    return listener
 
 
 async def main():
     """Main entry point for the MCP server."""
+    global monitor, passive
     # Import here to avoid issues with imports
     from mcp.server.stdio import stdio_server
 
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="network-discovery",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    passive = _start_passive()
+    monitor = await _start_monitor()
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="network-discovery",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        if monitor is not None:
+            await monitor.stop()
+            monitor = None
+        if passive is not None:
+            passive.close()
+            passive = None
 
 
 if __name__ == "__main__":
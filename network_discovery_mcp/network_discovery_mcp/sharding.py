@@ -0,0 +1,377 @@
+"""Multi-process sharded sweeps for address spaces too large for one event loop.
+
+The target networks are cut into power-of-two chunks that worker processes
+pull from a shared queue, so a worker that lands on a busy chunk does not
+hold the others back. Each worker runs its own event loop, probe engine and
+enrichment, and streams its batches back over a pipe in a compact binary
+encoding (see ``encode_batch``).
+
+Run ``network-discovery-scan --help`` for the command-line interface.
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import logging
+import math
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import aclosing
+from multiprocessing.connection import Connection
+
+from .output import FORMAT_COMPACT, FORMATS, EncodedRows
+from .scanner import (
+    SWEEP_CONCURRENCY,
+    NetworkDevice,
+    NetworkScanner,
+    ProbeScheduler,
+    SweepProgress,
+    collapse_networks,
+)
+
+logger = logging.getLogger(__name__)
+
+# Chunks queued per worker; more chunks balance better but cost a name query and a setup each
+CHUNKS_PER_WORKER = 8
+# Smallest chunk worth handing to a worker (addresses)
+MIN_CHUNK = 256
+
+# Batch header: hosts probed since the previous batch, device count
+_BATCH = struct.Struct("!IH")
+# Device: IPv4 address, MAC, flags, RTT (seconds), last seen
+_DEVICE = struct.Struct("!4s6sBfd")
+_COUNT = struct.Struct("!H")
+_PORT = struct.Struct("!H")
+
+_HAS_MAC = 0x01
+_HAS_RTT = 0x02
+_HOSTNAME_REFRESHED = 0x04
+_PORTS_REFRESHED = 0x08
+_SERVICES_REFRESHED = 0x10
+
+
+def _pack_text(text: str | None) -> bytes:
+    encoded = (text or "").encode("utf-8")[:0xFFFF]
+    return _COUNT.pack(len(encoded)) + encoded
+
+
+def _unpack_text(data: bytes, offset: int) -> tuple[str | None, int]:
+    (length,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    return data[offset:offset + length].decode("utf-8", errors="replace") or None, offset + length
+
+
+def encode_batch(probed: int, devices: list[NetworkDevice]) -> bytes:
+    """Encode a batch of IPv4 devices and the number of hosts probed to find them.
+
+    A device costs 23 fixed bytes plus its hostname, vendor, open ports and
+    service descriptions. Fields a sweep does not collect (aliases, IPv6
+    addresses, OS guess) are not carried.
+    """
+    parts = [_BATCH.pack(probed, len(devices))]
+    for device in devices:
+        flags = 0
+        mac = b"\0" * 6
+        if device.mac_address:
+            flags |= _HAS_MAC
+            mac = bytes.fromhex(device.mac_address.replace(":", ""))
+        if device.response_time is not None:
+            flags |= _HAS_RTT
+        for name, flag in (
+            ("hostname", _HOSTNAME_REFRESHED), ("ports", _PORTS_REFRESHED), ("services", _SERVICES_REFRESHED)
+        ):
+            if name in device.refreshed:
+                flags |= flag
+        parts.append(_DEVICE.pack(
+            ipaddress.IPv4Address(device.ip_address).packed, mac, flags,
+            device.response_time or 0.0, device.last_seen,
+        ))
+        parts.append(_pack_text(device.hostname) + _pack_text(device.vendor))
+        parts.append(_COUNT.pack(len(device.open_ports)))
+        parts.extend(_PORT.pack(port) for port in device.open_ports)
+        parts.append(_COUNT.pack(len(device.services)))
+        parts.extend(_PORT.pack(port) + _pack_text(service) for port, service in device.services.items())
+    return b"".join(parts)
+
+
+def decode_batch(data: bytes) -> tuple[int, list[NetworkDevice]]:
+    """Decode ``encode_batch`` output into ``(probed, devices)``."""
+    probed, count = _BATCH.unpack_from(data)
+    offset = _BATCH.size
+    devices = []
+    for _ in range(count):
+        address, mac, flags, rtt, last_seen = _DEVICE.unpack_from(data, offset)
+        offset += _DEVICE.size
+        hostname, offset = _unpack_text(data, offset)
+        vendor, offset = _unpack_text(data, offset)
+        (port_count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        open_ports = list(struct.unpack_from(f"!{port_count}H", data, offset))
+        offset += port_count * _PORT.size
+        (service_count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        services = {}
+        for _ in range(service_count):
+            (port,) = _PORT.unpack_from(data, offset)
+            services[port], offset = _unpack_text(data, offset + _PORT.size)
+
+        refreshed = {"liveness": last_seen}
+        for name, flag in (
+            ("hostname", _HOSTNAME_REFRESHED), ("ports", _PORTS_REFRESHED), ("services", _SERVICES_REFRESHED)
+        ):
+            if flags & flag:
+                refreshed[name] = last_seen
+        devices.append(NetworkDevice(
+            ip_address=str(ipaddress.IPv4Address(address)),
+            mac_address=":".join(f"{b:02x}" for b in mac) if flags & _HAS_MAC else None,
+            hostname=hostname,
+            vendor=vendor,
+            open_ports=open_ports,
+            services=services,
+            last_seen=last_seen,
+            response_time=rtt if flags & _HAS_RTT else None,
+            refreshed=refreshed,
+        ))
+    return probed, devices
+
+
+def split_networks(networks: list[str], parts: int) -> Iterator[tuple[str, str]]:
+    """Cut IPv4 networks into about ``parts`` chunks, yielding ``(chunk, network)``.
+
+    Chunks are aligned power-of-two blocks of at least ``MIN_CHUNK``
+    addresses. The enclosing network is kept so a worker can leave out its
+    network and broadcast addresses, and only those.
+    """
+    valid = []
+    for network in networks:
+        try:
+            net = ipaddress.ip_network(network, strict=False)
+        except ValueError as e:
+            logger.error(f"Invalid network range: {network}: {e}")
+            continue
+        if net.version == 4:
+            valid.append(str(net))
+    collapsed = [ipaddress.IPv4Network(network) for network in collapse_networks(valid)]
+    total = sum(net.num_addresses for net in collapsed)
+    if not total:
+        return
+    chunk_size = max(MIN_CHUNK, 2 ** int(math.log2(max(1, total // max(1, parts)))))
+    prefix = 32 - int(math.log2(chunk_size))
+    for net in collapsed:
+        if net.prefixlen >= prefix:
+            yield str(net), str(net)
+        else:
+            for chunk in net.subnets(new_prefix=prefix):
+                yield str(chunk), str(net)
+
+
+def _chunk_hosts(chunk: ipaddress.IPv4Network, net: ipaddress.IPv4Network) -> Iterator[ipaddress.IPv4Address]:
+    """The addresses of ``chunk`` that ``net.hosts()`` would include."""
+    if net.prefixlen >= 31:
+        return iter(chunk)
+    ends = (net.network_address, net.broadcast_address)
+    return (address for address in chunk if address not in ends)
+
+
+async def _run_worker(
+    chunks: multiprocessing.Queue, conn: Connection, include_ports: bool, rate: float, concurrency: int
+) -> None:
+    scanner = NetworkScanner(scheduler=ProbeScheduler(rate=rate))
+    progress = SweepProgress()
+    reported = 0
+    try:
+        # Blocking here is fine: nothing else runs on this loop between chunks.
+        while (work := chunks.get()) is not None:
+            chunk, network = (ipaddress.IPv4Network(item) for item in work)
+            hosts = _chunk_hosts(chunk, network)
+            batches = scanner.iter_network_batches(str(chunk), include_ports, concurrency, progress, hosts)
+            async with aclosing(batches):
+                async for batch in batches:
+                    conn.send_bytes(encode_batch(progress.probed - reported, batch))
+                    reported = progress.probed
+            conn.send_bytes(encode_batch(progress.probed - reported, []))
+            reported = progress.probed
+    finally:
+        scanner.close()
+
+
+def _worker(
+    chunks: multiprocessing.Queue,
+    conn: Connection,
+    include_ports: bool,
+    rate: float,
+    concurrency: int,
+    log_level: int,
+) -> None:
+    """Worker process entry point: sweep chunks until the end marker, then send an empty message."""
+    logging.basicConfig(level=log_level, stream=sys.stderr)
+    try:
+        asyncio.run(_run_worker(chunks, conn, include_ports, rate, concurrency))
+        conn.send_bytes(b"")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+
+
+async def iter_shard_batches(
+    networks: list[str],
+    workers: int,
+    include_ports: bool = False,
+    rate: float = 2000.0,
+    progress: SweepProgress | None = None,
+    concurrency: int = SWEEP_CONCURRENCY,
+) -> AsyncIterator[list[NetworkDevice]]:
+    """Sweep IPv4 ``networks`` with ``workers`` processes, yielding batches as they arrive.
+
+    ``rate`` is each worker's packet rate. ``progress``, if given, counts
+    the hosts probed and found by every worker; its ``total`` is left to
+    the caller. Stopping early terminates the workers.
+    """
+    loop = asyncio.get_running_loop()
+    # Workers must not inherit this process's event loop and sockets.
+    context = multiprocessing.get_context("spawn")
+    chunks = context.Queue()
+    queued = 0
+    for work in split_networks(networks, workers * CHUNKS_PER_WORKER):
+        chunks.put(work)
+        queued += 1
+    if not queued:
+        return
+    workers = min(workers, queued)
+    for _ in range(workers):
+        chunks.put(None)
+
+    found: asyncio.Queue[list[NetworkDevice] | None] = asyncio.Queue()
+    processes: list[multiprocessing.Process] = []
+    readers: dict[int, Connection] = {}
+
+    def finish(conn: Connection) -> None:
+        loop.remove_reader(conn.fileno())
+        del readers[conn.fileno()]
+        conn.close()
+        if not readers:
+            found.put_nowait(None)
+
+    def on_readable(conn: Connection) -> None:
+        try:
+            while conn.poll():
+                data = conn.recv_bytes()
+                if not data:
+                    finish(conn)
+                    return
+                probed, batch = decode_batch(data)
+                if progress is not None:
+                    progress.probed += probed
+                    progress.found += len(batch)
+                if batch:
+                    found.put_nowait(batch)
+        except (EOFError, OSError) as e:
+            logger.warning(f"Shard worker exited before finishing its chunks: {e}")
+            finish(conn)
+
+    log_level = logging.getLogger().getEffectiveLevel()
+    try:
+        for _ in range(workers):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_worker, args=(chunks, sender, include_ports, rate, concurrency, log_level), daemon=True
+            )
+            process.start()
+            # Only the worker holds the sending end, so its exit shows up as EOF here.
+            sender.close()
+            processes.append(process)
+            readers[receiver.fileno()] = receiver
+            loop.add_reader(receiver.fileno(), on_readable, receiver)
+        logger.debug(f"Sharded sweep: {queued} chunks across {workers} workers")
+
+        while (batch := await found.get()) is not None:
+            yield batch
+    finally:
+        for conn in list(readers.values()):
+            loop.remove_reader(conn.fileno())
+            conn.close()
+        readers.clear()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        await asyncio.gather(*(asyncio.to_thread(process.join) for process in processes))
+        chunks.cancel_join_thread()
+        chunks.close()
+
+
+async def _scan(
+    networks: list[str], workers: int, include_ports: bool, rate: float
+) -> tuple[list[NetworkDevice], float, SweepProgress]:
+    scanner = NetworkScanner(scheduler=ProbeScheduler(rate=rate))
+    progress = SweepProgress()
+    for network in networks:
+        progress.add_network(network)
+    started = time.monotonic()
+    try:
+        if workers > 1:
+            batches = scanner.iter_sharded_batches(networks, workers, include_ports, progress)
+        else:
+            batches = (batch async for _, batch in scanner.iter_networks_batches(networks, include_ports, progress))
+        async with aclosing(batches):
+            devices = [device async for batch in batches for device in batch]
+    finally:
+        scanner.close()
+    return devices, time.monotonic() - started, progress
+
+
+def _scaling_steps(workers: int) -> list[int]:
+    steps = [1]
+    while steps[-1] * 2 < workers:
+        steps.append(steps[-1] * 2)
+    if workers > 1:
+        steps.append(workers)
+    return steps
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point: sweep networks across worker processes."""
+    parser = argparse.ArgumentParser(
+        prog="network-discovery-scan", description="Sweep IPv4 networks across several worker processes."
+    )
+    parser.add_argument("networks", nargs="+", help="CIDR ranges to sweep")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("-p", "--ports", action="store_true", help="also scan common ports")
+    parser.add_argument("-r", "--rate", type=float, default=2000.0,
+                        help="total probe packets per second, shared by the workers (default: 2000)")
+    parser.add_argument("-f", "--format", choices=FORMATS, default=FORMAT_COMPACT, help="device output format")
+    parser.add_argument("--scaling", action="store_true",
+                        help="repeat the sweep with 1, 2, 4, ... workers and report throughput instead of devices")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, stream=sys.stderr)
+
+    if args.scaling:
+        baseline = None
+        for workers in _scaling_steps(max(1, args.workers)):
+            devices, elapsed, progress = asyncio.run(_scan(args.networks, workers, args.ports, args.rate))
+            rate = progress.probed / elapsed if elapsed else 0.0
+            baseline = baseline or rate
+            print(json.dumps({
+                "workers": workers,
+                "hosts_probed": progress.probed,
+                "devices_found": len(devices),
+                "seconds": round(elapsed, 3),
+                "hosts_per_second": round(rate, 1),
+                "speedup": round(rate / baseline, 2) if baseline else None,
+            }))
+        return
+
+    devices, elapsed, progress = asyncio.run(_scan(args.networks, max(1, args.workers), args.ports, args.rate))
+    print(EncodedRows.encode([device.to_dict() for device in devices], args.format).render())
+    print(f"Found {len(devices)} devices in {progress.probed} hosts probed ({elapsed:.1f}s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Shared fixtures: a fake network for scanner tests."""
+
+import asyncio
+
+import pytest
+
+from network_discovery_mcp import scanner as scanner_module
+from network_discovery_mcp.scanner import NetworkScanner
+
+
+class FakeNetwork:
+    """Answers scanner probes in place of the real network.
+
+    ``hosts`` maps the addresses that answer pings to their RTT and
+    ``hostnames`` holds their PTR names; tests may change both as they go.
+    Every ping and reverse lookup is recorded, as is how many pings were in
+    flight at once.
+    """
+
+    def __init__(self, hosts: dict[str, float]) -> None:
+        self.hosts = hosts
+        self.hostnames: dict[str, str] = {}
+        # Seconds each ping takes, whether or not it is answered
+        self.delay = 0.0
+        self.probed: list[str] = []
+        self.resolved: list[str] = []
+        self.in_flight: list[str] = []
+        self.peak = 0
+        # Most /24s with a ping in flight at the same time
+        self.peak_networks = 0
+
+    async def ping(self, host: str) -> float | None:
+        self.probed.append(host)
+        self.in_flight.append(host)
+        self.peak = max(self.peak, len(self.in_flight))
+        self.peak_networks = max(
+            self.peak_networks, len({address.rsplit(".", 1)[0] for address in self.in_flight})
+        )
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight.remove(host)
+        return self.hosts.get(host)
+
+    async def resolve(self, ip_address: str) -> str | None:
+        self.resolved.append(ip_address)
+        return self.hostnames.get(ip_address)
+
+
+@pytest.fixture
+def live_hosts() -> dict[str, float] | None:
+    """Address -> RTT of the hosts that answer on the fake network.
+
+    Modules override this. ``None`` leaves ``ping_host`` itself alone, for
+    tests that replace the ICMP engine underneath it instead.
+    """
+    return {}
+
+
+@pytest.fixture
+def fake_network(monkeypatch, live_hosts) -> FakeNetwork:
+    """Keep every scanner off the real network: no scapy, no kernel tables, no name lookups."""
+    network = FakeNetwork({} if live_hosts is None else live_hosts)
+
+    async def ping_host(self, host, timeout=None):
+        with self.metrics.phase("ping") as timer:
+            response_time = await network.ping(host)
+            if response_time is None:
+                timer.timed_out()
+        return response_time is not None, response_time
+
+    async def resolve(self, ip_address):
+        return await network.resolve(ip_address)
+
+    async def no_link_local_names(self, addresses, unicast=True, broadcast=None):
+        return {}
+
+    monkeypatch.setattr(scanner_module, "scapy_available", False)
+    monkeypatch.setattr(scanner_module, "kernel_neighbour_table", lambda: {})
+    if live_hosts is not None:
+        monkeypatch.setattr(NetworkScanner, "ping_host", ping_host)
+    monkeypatch.setattr(scanner_module.ReverseResolver, "resolve", resolve)
+    monkeypatch.setattr(scanner_module.MulticastNameResolver, "resolve_many", no_link_local_names)
+    return network
+
+
+@pytest.fixture
+def scanner(fake_network):
+    scanner = NetworkScanner()
+    yield scanner
+    scanner.close()
@@ -0,0 +1,181 @@
+"""Tests for time budgets, cancellation teardown and partial results."""
+
+import asyncio
+import time
+
+import pytest
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+from network_discovery_mcp import server as server_module
+from network_discovery_mcp.budget import iter_within, out_of_time, run_within, time_budget
+from network_discovery_mcp.scanner import NetworkDevice
+
+
+class SlowIcmp:
+    """Answers the hosts in ``rtts`` after their RTT and lets everything else time out."""
+
+    def __init__(self, rtts: dict[str, float]) -> None:
+        self.rtts = rtts
+        self.timeouts: list[float] = []
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    async def ping(self, host: str, timeout: float = 1.0) -> float | None:
+        self.timeouts.append(timeout)
+        rtt = self.rtts.get(host)
+        if rtt is None or rtt > timeout:
+            await asyncio.sleep(timeout)
+            return None
+        await asyncio.sleep(rtt)
+        return rtt
+
+
+@pytest.fixture
+def live_hosts():
+    # These tests put a SlowIcmp under the real ping_host.
+    return None
+
+
+@pytest.mark.asyncio
+async def test_run_within_cancels_what_is_left_at_the_deadline():
+    finished, torn_down = [], []
+
+    async def job(seconds: float) -> None:
+        try:
+            await asyncio.sleep(seconds)
+            finished.append(seconds)
+        finally:
+            torn_down.append(seconds)
+
+    with time_budget(0.1) as budget:
+        await run_within(job(0.01), job(5), job(5))
+        assert out_of_time()
+
+    assert finished == [0.01]
+    assert len(torn_down) == 3
+    assert budget.exhausted
+
+
+@pytest.mark.asyncio
+async def test_nested_budgets_report_to_the_outer_one():
+    with time_budget(10) as outer:
+        with time_budget(0.05) as inner:
+            await run_within(asyncio.sleep(1))
+        with time_budget() as unbounded_part:
+            await run_within(asyncio.sleep(0))
+
+    assert inner.exhausted and outer.exhausted
+    assert not unbounded_part.exhausted
+    assert inner.expires < outer.expires
+
+
+@pytest.mark.asyncio
+async def test_iter_within_closes_the_iterator_at_the_deadline():
+    closed = []
+
+    async def ticks():
+        try:
+            for tick in range(100):
+                await asyncio.sleep(0.02)
+                yield tick
+        finally:
+            closed.append(True)
+
+    with time_budget(0.1) as budget:
+        seen = [tick async for tick in iter_within(ticks())]
+
+    assert 0 < len(seen) < 10
+    assert closed == [True]
+    assert budget.exhausted
+
+
+@pytest.mark.asyncio
+async def test_sweep_returns_what_it_found_by_the_deadline(scanner):
+    # Hosts .1-.40 answer within 10ms; the rest never do.
+    scanner._icmp = SlowIcmp({f"10.5.0.{i}": 0.01 for i in range(1, 41)})
+    scanner.scheduler.initial_timeout = 2.0
+
+    started = time.monotonic()
+    with time_budget(0.3) as budget:
+        devices = await scanner.scan_network_range("10.5.0.0/22")
+    elapsed = time.monotonic() - started
+
+    assert budget.exhausted
+    assert elapsed < 0.6
+    assert 0 < len(devices) <= 40
+    # Probes in flight at the deadline were clamped to it, and nothing is left running.
+    assert max(scanner._icmp.timeouts) <= 0.3
+    assert not [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    # Budget cuts are not mistaken for congestion.
+    assert scanner.scheduler.stats()["probes_timed_out"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rescan_cut_short_reports_nothing_removed(scanner):
+    scanner._icmp = SlowIcmp({"10.6.0.1": 0.001})
+    for last in (1, 2, 3):
+        device = NetworkDevice(ip_address=f"10.6.0.{last}", response_time=0.001)
+        device.mark_refreshed("liveness")
+        scanner.devices.put_many([device])
+
+    with time_budget(0.05):
+        diff = await scanner.rescan_network("10.6.0.0/24")
+
+    assert diff.partial
+    assert diff.removed == []
+    assert scanner.devices["10.6.0.3"].online
+
+
+@pytest.mark.asyncio
+async def test_refresh_cut_short_keeps_the_last_known_values(scanner):
+    scanner._icmp = SlowIcmp({})
+    device = NetworkDevice(ip_address="10.7.0.1", hostname="nas.lan", open_ports=[22])
+    device.mark_refreshed("liveness", "hostname", "ports")
+    refreshed = dict(device.refreshed)
+
+    with time_budget(0.05):
+        await scanner._refresh_device(device, ["liveness", "hostname"])
+
+    assert device.refreshed == refreshed
+    assert device.hostname == "nas.lan"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_system_ping_is_killed(scanner, monkeypatch):
+    spawned = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def sleep_instead(*args, **kwargs):
+        process = await create_subprocess_exec("sleep", "30", **kwargs)
+        spawned.append(process)
+        return process
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", sleep_instead)
+    ping = asyncio.create_task(scanner._ping_subprocess("192.0.2.1", 30))
+    await asyncio.sleep(0.2)
+    ping.cancel()
+    await asyncio.wait([ping])
+
+    assert ping.cancelled()
+    assert await asyncio.wait_for(spawned[0].wait(), 2) != 0
+
+
+@pytest.mark.asyncio
+async def test_tool_results_are_marked_partial(scanner, monkeypatch):
+    scanner._icmp = SlowIcmp({})
+    monkeypatch.setattr(server_module, "scanner", scanner)
+    request = CallToolRequest(
+        method="tools/call",
+        params=CallToolRequestParams(name="ping_host", arguments={"host": "192.0.2.1", "budget": 0.05}),
+    )
+
+    started = time.monotonic()
+    result = await server_module.handle_call_tool(request)
+
+    assert time.monotonic() - started < 0.5
+    assert '"is_reachable": false' in result.content[0].text
+    assert result.content[-1].text.startswith("Partial results: the 0.05s time budget ran out")
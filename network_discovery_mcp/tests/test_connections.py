@@ -0,0 +1,100 @@
+"""Tests for the scanner-wide connection budget."""
+
+import asyncio
+
+import pytest
+
+from network_discovery_mcp.scanner import ConnectionBudget, NetworkScanner, default_connection_limit
+
+
+def test_default_limit_leaves_headroom_below_rlimit():
+    """The default budget stays well inside the process file-descriptor limit."""
+    resource = pytest.importorskip("resource")
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    limit = default_connection_limit()
+    assert 8 <= limit
+    if soft != resource.RLIM_INFINITY:
+        assert limit < soft
+
+
+@pytest.mark.asyncio
+async def test_slots_are_granted_round_robin_across_hosts():
+    """A host with a deep queue does not hold up hosts queued behind it."""
+    budget = ConnectionBudget(limit=1, per_host=1)
+    order = []
+    gate = asyncio.Event()
+
+    async def connect(host: str) -> None:
+        async with budget.connection(host):
+            order.append(host)
+            await gate.wait()
+
+    blocker = asyncio.create_task(connect("busy"))
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(connect("busy")) for _ in range(3)]
+    tasks += [asyncio.create_task(connect(host)) for host in ("a", "b")]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *tasks)
+
+    assert order == ["busy", "busy", "a", "b", "busy", "busy"]
+    assert budget.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_head_waiter_does_not_strand_the_queue():
+    """A waiter cancelled just before a slot frees up passes the slot on."""
+    budget = ConnectionBudget(limit=1, per_host=1)
+    release = asyncio.Event()
+    granted = []
+
+    async def connect(name: str) -> None:
+        async with budget.connection("host"):
+            granted.append(name)
+            await release.wait()
+
+    holder = asyncio.create_task(connect("holder"))
+    await asyncio.sleep(0)
+    timed_out = asyncio.create_task(connect("timed out"))
+    waiting = asyncio.create_task(connect("waiting"))
+    await asyncio.sleep(0)
+
+    # Cancelling marks the head waiter done at once, but its task only leaves
+    # the queue when it next runs, after the holder has freed the slot.
+    holder.cancel()
+    timed_out.cancel()
+    await asyncio.wait([holder, timed_out])
+    release.set()
+    await asyncio.wait_for(waiting, 1)
+
+    assert granted == ["holder", "waiting"]
+    assert budget.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_port_scans_across_hosts_respect_the_budget():
+    """Concurrent multi-host scans against loopback listeners never exceed the cap."""
+    async def accept(reader, writer):
+        writer.close()
+
+    servers = []
+    ports = []
+    for i in range(1, 5):
+        server = await asyncio.start_server(accept, f"127.0.0.{i}", 0)
+        servers.append(server)
+        ports.append(server.sockets[0].getsockname()[1])
+
+    scanner = NetworkScanner(max_connections=6, max_connections_per_host=4)
+    try:
+        results = await asyncio.gather(
+            *(scanner.scan_common_ports(f"127.0.0.{i}", ports) for i in range(1, 5))
+        )
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+    for i, open_ports in enumerate(results):
+        assert ports[i] in open_ports
+    assert scanner.connections.peak == 6
+    assert scanner.connections.in_flight == 0
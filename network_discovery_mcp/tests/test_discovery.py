@@ -0,0 +1,78 @@
+"""Tests for concurrent, de-duplicated multi-network discovery."""
+
+import pytest
+
+from network_discovery_mcp import server as server_module
+from network_discovery_mcp.scanner import (
+    NetworkDevice,
+    NetworkInterface,
+    collapse_networks,
+    merge_devices,
+)
+
+
+def test_collapse_networks():
+    assert collapse_networks(["10.0.1.0/24", "10.0.0.0/16", "192.168.1.7/24", "192.168.1.0/24"]) == [
+        "10.0.0.0/16",
+        "192.168.1.0/24",
+    ]
+    # Adjacent interface subnets are not merged into one range.
+    assert collapse_networks(["10.0.1.0/24", "10.0.0.0/24", "10.0.0.0/24"]) == ["10.0.0.0/24", "10.0.1.0/24"]
+
+
+def test_merge_by_ip_and_cross_network_mac():
+    router_a = NetworkDevice(ip_address="10.0.0.1", mac_address="aa:aa:aa:00:00:01")
+    router_b = NetworkDevice(ip_address="10.1.0.1", mac_address="AA:AA:AA:00:00:01")
+    proxied = NetworkDevice(ip_address="10.0.0.9", mac_address="aa:aa:aa:00:00:01")
+
+    merged = merge_devices([
+        ("10.0.0.0/24", router_a),
+        ("10.0.0.0/24", proxied),
+        ("10.1.0.0/24", router_b),
+        ("10.0.0.0/24", NetworkDevice(ip_address="10.0.0.1")),
+    ])
+
+    assert [d.ip_address for d in merged] == ["10.0.0.1", "10.0.0.9"]
+    assert router_a.aliases == ["10.1.0.1"]
+
+
+@pytest.fixture
+def live_hosts():
+    return {"10.5.0.1": 0.001, "10.6.0.1": 0.001}
+
+
+@pytest.mark.asyncio
+async def test_networks_are_swept_concurrently_with_timings(scanner, fake_network):
+    fake_network.delay = 0.01
+    timings = {}
+
+    found = [
+        (network, device.ip_address)
+        async for network, batch in scanner.iter_networks_batches(["10.5.0.0/28", "10.6.0.0/28"], timings=timings)
+        for device in batch
+    ]
+
+    assert sorted(found) == [("10.5.0.0/28", "10.5.0.1"), ("10.6.0.0/28", "10.6.0.1")]
+    assert fake_network.peak_networks > 1
+    assert set(timings) == {"10.5.0.0/28", "10.6.0.0/28"}
+
+
+@pytest.mark.asyncio
+async def test_discover_local_network_probes_overlapping_interfaces_once(scanner, fake_network, monkeypatch):
+
+    async def interfaces():
+        return [
+            NetworkInterface(name="eth0", ip_address="10.5.0.2", netmask="255.255.255.240", network="10.5.0.0/28"),
+            NetworkInterface(name="eth1", ip_address="10.5.0.3", netmask="255.255.255.240", network="10.5.0.0/28"),
+            NetworkInterface(name="wlan0", ip_address="10.5.0.5", netmask="255.255.255.248", network="10.5.0.0/29"),
+        ]
+
+    monkeypatch.setattr(scanner, "get_network_interfaces", interfaces)
+    monkeypatch.setattr(server_module, "scanner", scanner)
+
+    result = await server_module._discover_local_network({"format": "compact"})
+
+    assert len(fake_network.probed) == len(set(fake_network.probed)) == 14
+    text = result.content[0].text
+    assert "found 1 active devices on 10.5.0.0/28" in text
+    assert "Sweep time per network: 10.5.0.0/28" in text
@@ -0,0 +1,116 @@
+"""Tests for the service-probe fingerprint database."""
+
+import asyncio
+
+import pytest
+
+from network_discovery_mcp.fingerprints import (
+    DEFAULT_DATABASE,
+    ServiceProbeDatabase,
+)
+from network_discovery_mcp.scanner import NetworkScanner
+
+SAMPLE = r"""
+Probe TCP NULL q||
+match SSH m|^SSH-([\d.]+)-OpenSSH_([\w.]+)| p/OpenSSH/ v/$2/ i/protocol $1/
+match FTP m|^220[- ][^\r\n]*ftp|i
+match MySQL m|^.\0\0\0\x0a([\d.]+)|s p/MySQL/ v/$1/
+softmatch TLS m|^\x16\x03|
+
+Probe TCP GetRequest q|GET / HTTP/1.0\r\n\r\n|
+ports 80,8000-8001
+rarity 1
+match HTTP m|^HTTP/1\.[01] \d\d\d .*\r\nServer: nginx/([\d.]+)|s p/nginx/ v/$1/
+"""
+
+
+def test_parse_sample_database():
+    database = ServiceProbeDatabase.parse(SAMPLE)
+
+    assert len(database) == 5
+    get = database.probe("GetRequest")
+    assert get.payload == b"GET / HTTP/1.0\r\n\r\n"
+    assert get.ports == {80, 8000, 8001}
+    assert [probe.name for probe in database.probes_for_port(8001)] == ["GetRequest"]
+    assert database.probes_for_port(22) == []
+
+
+def test_matches_are_indexed_by_first_byte():
+    null = ServiceProbeDatabase.parse(SAMPLE).probe("NULL")
+
+    candidates = [match.service for match in null.candidates(b"SSH-2.0-OpenSSH_9.6\r\n")]
+
+    # The MySQL pattern starts with "." and is always a candidate; FTP and TLS are skipped.
+    assert candidates == ["SSH", "MySQL"]
+
+
+def test_match_fills_version_fields():
+    database = ServiceProbeDatabase.parse(SAMPLE)
+
+    ssh = database.match(b"SSH-2.0-OpenSSH_9.6p1 Ubuntu-3\r\n")
+    http = database.match(b"HTTP/1.1 200 OK\r\nServer: nginx/1.24.0\r\n\r\n", "GetRequest")
+
+    assert str(ssh) == "SSH (OpenSSH 9.6p1; protocol 2.0)"
+    assert str(http) == "HTTP (nginx 1.24.0)"
+    assert database.match(b"\x16\x03\x03\x00").soft
+    assert database.match(b"nothing known") is None
+
+
+def test_malformed_line_reports_line_number():
+    with pytest.raises(ValueError, match="line 2"):
+        ServiceProbeDatabase.parse("Probe TCP NULL q||\nmatch SSH m|^SSH-")
+
+
+def test_load_reuses_serialized_copy(tmp_path):
+    source = tmp_path / "probes"
+    source.write_text(SAMPLE)
+    cache = tmp_path / "cache"
+
+    first = ServiceProbeDatabase.load(source, cache_dir=cache)
+    assert len(list(cache.glob("probes.*.pickle"))) == 1
+
+    second = ServiceProbeDatabase.load(source, cache_dir=cache)
+    assert second is not first
+    assert str(second.match(b"SSH-2.0-OpenSSH_9.6\r\n")) == "SSH (OpenSSH 9.6; protocol 2.0)"
+
+
+def test_bundled_database_parses():
+    database = ServiceProbeDatabase.parse(DEFAULT_DATABASE.read_text())
+
+    assert database.probe("NULL") is not None
+    assert database.probes_for_port(80)
+
+
+@pytest.mark.asyncio
+async def test_identify_loopback_services():
+    """A banner is matched directly; a silent HTTP server is sent its hinted probe."""
+    async def ssh_service(reader, writer):
+        writer.write(b"SSH-2.0-OpenSSH_9.6\r\n")
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def http_service(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.0 200 OK\r\nServer: nginx/1.24.0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    ssh = await asyncio.start_server(ssh_service, "127.0.0.1", 0)
+    http = await asyncio.start_server(http_service, "127.0.0.1", 0)
+    ssh_port = ssh.sockets[0].getsockname()[1]
+    http_port = http.sockets[0].getsockname()[1]
+    database = ServiceProbeDatabase.parse(SAMPLE.replace("ports 80,", f"ports {http_port},"))
+    try:
+        services = await NetworkScanner(fingerprints=database).identify_device_services(
+            "127.0.0.1", [ssh_port, http_port]
+        )
+    finally:
+        for server in (ssh, http):
+            server.close()
+            await server.wait_closed()
+
+    assert services == {
+        ssh_port: "SSH (OpenSSH 9.6; protocol 2.0)",
+        http_port: "HTTP (nginx 1.24.0)",
+    }
@@ -0,0 +1,130 @@
+"""Tests for freshness-aware device detail caching."""
+
+import asyncio
+import time
+
+import pytest
+
+from network_discovery_mcp.budget import time_budget
+from network_discovery_mcp.portscan import PORT_OPEN
+from network_discovery_mcp.scanner import FRESHNESS_TTLS, NetworkDevice
+
+
+@pytest.fixture
+def live_hosts():
+    return {"10.0.0.5": 0.002}
+
+
+@pytest.fixture
+def scanner(scanner, fake_network, monkeypatch):
+    """The shared scanner, counting its probes, with port scans that find a changing port set."""
+    fake_network.hostnames["10.0.0.5"] = "server.lan"
+    ports_scanned = []
+
+    async def fake_scan_and_identify(host, ports=None):
+        ports_scanned.append(host)
+        await asyncio.sleep(0.01)
+        return {22: PORT_OPEN, 80: PORT_OPEN}, {22: "SSH", 80: "HTTP"}
+
+    monkeypatch.setattr(scanner, "scan_and_identify", fake_scan_and_identify)
+    scanner.calls = lambda: {
+        "ping": len(fake_network.probed),
+        "ports": len(ports_scanned),
+        "hostname": len(fake_network.resolved),
+    }
+    return scanner
+
+
+def _cached_device(age: float) -> NetworkDevice:
+    device = NetworkDevice(ip_address="10.0.0.5", hostname="old.lan", open_ports=[22], services={22: "SSH"})
+    device.refreshed = {name: time.time() - age for name in FRESHNESS_TTLS}
+    return device
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_is_served_without_probing(scanner):
+    scanner.devices["10.0.0.5"] = _cached_device(age=1)
+
+    device = await scanner.get_device_details("10.0.0.5")
+
+    assert device.open_ports == [22]
+    assert scanner.calls() == {"ping": 0, "ports": 0, "hostname": 0}
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_then_revalidated(scanner):
+    scanner.devices["10.0.0.5"] = _cached_device(age=7200)
+
+    device = await scanner.get_device_details("10.0.0.5")
+
+    # The caller gets the cached copy straight away...
+    assert device.open_ports == [22]
+    assert device.hostname == "old.lan"
+    # ...and a second caller does not start another refresh.
+    await scanner.get_device_details("10.0.0.5")
+    await asyncio.gather(*scanner._refreshing.values())
+
+    assert scanner.calls() == {"ping": 1, "ports": 1, "hostname": 1}
+    refreshed = scanner.devices["10.0.0.5"]
+    assert refreshed.open_ports == [22, 80]
+    assert refreshed.hostname == "server.lan"
+
+
+@pytest.mark.asyncio
+async def test_max_age_forces_a_synchronous_refresh(scanner):
+    scanner.devices["10.0.0.5"] = _cached_device(age=5)
+
+    device = await scanner.get_device_details("10.0.0.5", max_age=1)
+
+    assert device.open_ports == [22, 80]
+    assert scanner.calls() == {"ping": 1, "ports": 1, "hostname": 1}
+    assert not scanner._refreshing
+
+
+@pytest.mark.asyncio
+async def test_sweep_keeps_what_it_did_not_probe(scanner):
+    cached = _cached_device(age=5)
+    cached.vendor = "Synology Incorporated"
+    scanner.devices["10.0.0.5"] = cached
+
+    await scanner.scan_network_range("10.0.0.5/32")
+
+    device = scanner.devices["10.0.0.5"]
+    assert (device.open_ports, device.services, device.vendor) == ([22], {22: "SSH"}, "Synology Incorporated")
+    assert device.refreshed["ports"] == cached.refreshed["ports"]
+    assert device.age("liveness") < 1
+    # Fresh ports mean a detail request is answered from the inventory.
+    await scanner.get_device_details("10.0.0.5")
+    assert scanner.calls()["ports"] == 0
+
+
+@pytest.mark.asyncio
+async def test_liveness_refresh_updates_online(scanner, monkeypatch):
+    device = _cached_device(age=5)
+    device.online = False
+    scanner.devices["10.0.0.5"] = device
+
+    assert (await scanner.get_device_details("10.0.0.5", max_age=0)).online
+    assert scanner.devices["10.0.0.5"].online
+
+    async def no_answer(host, timeout=None):
+        return False, None
+
+    monkeypatch.setattr(scanner, "ping_host", no_answer)
+    await scanner.get_device_details("10.0.0.5", max_age=0)
+    assert not scanner.devices["10.0.0.5"].online
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_outlives_the_callers_budget(scanner):
+    scanner.devices["10.0.0.5"] = _cached_device(age=7200)
+
+    with time_budget(0.001) as budget:
+        await scanner.get_device_details("10.0.0.5")
+        await asyncio.sleep(0.002)
+    await asyncio.gather(*scanner._refreshing.values())
+
+    assert not budget.exhausted
+    refreshed = scanner.devices["10.0.0.5"]
+    assert refreshed.open_ports == [22, 80]
+    assert refreshed.age("ports") < 1
@@ -0,0 +1,63 @@
+"""Tests for the in-process ICMP echo engine."""
+
+import asyncio
+import struct
+
+import pytest
+
+from network_discovery_mcp.icmp import (
+    ICMP_ECHO_REPLY,
+    IcmpEngine,
+    build_echo_request,
+    icmp_checksum,
+    parse_echo_reply,
+)
+
+
+def _open_engine_or_skip(engine: IcmpEngine) -> None:
+    try:
+        engine.open()
+    except OSError as e:
+        pytest.skip(f"ICMP sockets not permitted here: {e}")
+
+
+def test_echo_request_checksum_verifies():
+    """A packet with its checksum filled in must sum to zero."""
+    packet = build_echo_request(0x1234, 7)
+    assert icmp_checksum(packet) == 0
+
+
+def test_parse_echo_reply_with_and_without_ip_header():
+    """Replies are parsed from raw (IP header) and datagram sockets alike."""
+    reply = struct.pack("!BBHHH", ICMP_ECHO_REPLY, 0, 0, 0xBEEF, 42) + b"x"
+    ip_header = bytes([0x45]) + bytes(19)
+
+    assert parse_echo_reply(reply, has_ip_header=False) == (0xBEEF, 42)
+    assert parse_echo_reply(ip_header + reply, has_ip_header=True) == (0xBEEF, 42)
+    # Our own echo requests show up on raw sockets over loopback and are ignored.
+    assert parse_echo_reply(build_echo_request(1, 1), has_ip_header=False) is None
+
+
+@pytest.mark.asyncio
+async def test_engine_pings_loopback():
+    """Concurrent probes over the shared socket are matched back to each host."""
+    engine = IcmpEngine()
+    _open_engine_or_skip(engine)
+    try:
+        hosts = [f"127.0.0.{i}" for i in range(1, 21)]
+        rtts = await asyncio.gather(*(engine.ping(host, timeout=1) for host in hosts))
+        assert all(rtt is not None and rtt >= 0 for rtt in rtts)
+        assert not engine._pending
+    finally:
+        engine.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_times_out_unanswered_probe():
+    """An unanswered probe returns None instead of raising."""
+    engine = IcmpEngine()
+    _open_engine_or_skip(engine)
+    try:
+        assert await engine.ping("198.51.100.254", timeout=0.2) is None
+    finally:
+        engine.close()
@@ -0,0 +1,97 @@
+"""Tests for the cached interface snapshot."""
+
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import pytest
+
+from network_discovery_mcp import netlink
+from network_discovery_mcp.interfaces import InterfaceCache, is_change_event, read_snapshot
+
+
+def _message(msg_type: int, payload: bytes = b"\0" * 8) -> bytes:
+    return netlink.NLMSG_HEADER.pack(netlink.NLMSG_HEADER.size + len(payload), msg_type, 0, 0, 0) + payload
+
+
+def fake_netifaces(calls):
+    addresses = {
+        "lo": {2: [{"addr": "127.0.0.1", "netmask": "255.0.0.0"}]},
+        "eth0": {
+            17: [{"addr": "02:00:00:00:00:01"}],
+            2: [
+                {"addr": "192.168.1.10", "netmask": "255.255.255.0"},
+                {"addr": "10.20.0.5", "netmask": "255.255.0.0"},
+            ],
+        },
+        "wlan0": {17: [{"addr": "02:00:00:00:00:02"}]},
+    }
+
+    def gateways():
+        calls.append("gateways")
+        return {"default": {2: ("192.168.1.1", "eth0")}, 2: [("192.168.1.1", "eth0", True)]}
+
+    return SimpleNamespace(
+        AF_INET=2,
+        AF_LINK=17,
+        interfaces=lambda: list(addresses),
+        ifaddresses=lambda name: addresses[name],
+        gateways=gateways,
+    )
+
+
+def test_snapshot_reads_gateways_once():
+    calls = []
+
+    snapshot = read_snapshot(fake_netifaces(calls))
+
+    assert calls == ["gateways"]
+    assert [(i.name, i.network, i.gateway) for i in snapshot.interfaces] == [
+        ("eth0", "192.168.1.0/24", "192.168.1.1"),
+        ("eth0", "10.20.0.0/16", "192.168.1.1"),
+    ]
+    assert snapshot.interfaces[0].mac_address == "02:00:00:00:00:01"
+
+
+def test_change_events_are_recognised():
+    assert is_change_event(_message(netlink.RTM_NEWADDR))
+    assert is_change_event(_message(netlink.RTM_NEWNEIGH) + _message(netlink.RTM_DELROUTE))
+    assert not is_change_event(_message(netlink.RTM_NEWNEIGH))
+
+
+def test_ttl_expiry_without_notifications(monkeypatch):
+    calls = []
+    cache = InterfaceCache(lambda: read_snapshot(fake_netifaces(calls)), ttl=30, subscribe=False)
+    now = [1000.0]
+    monkeypatch.setattr("network_discovery_mcp.interfaces.time.monotonic", lambda: now[0])
+
+    cache.get()
+    cache.get()
+    now[0] += 31
+    cache.get()
+
+    assert cache.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_netlink_events_invalidate_the_snapshot():
+    calls = []
+    cache = InterfaceCache(lambda: read_snapshot(fake_netifaces(calls)))
+    kernel, listener = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    cache.watch(listener)
+    try:
+        cache.get()
+        cache.get()
+
+        kernel.send(_message(netlink.RTM_NEWNEIGH))
+        await asyncio.sleep(0.01)
+        cache.get()
+        assert cache.loads == 1
+
+        kernel.send(_message(netlink.RTM_NEWADDR))
+        await asyncio.sleep(0.01)
+        cache.get()
+        assert cache.loads == 2
+    finally:
+        cache.close()
+        kernel.close()
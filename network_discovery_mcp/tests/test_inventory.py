@@ -0,0 +1,48 @@
+"""Tests for the SQLite device inventory."""
+
+import time
+
+from network_discovery_mcp.inventory import DeviceInventory
+from network_discovery_mcp.scanner import NetworkDevice
+
+
+def test_roundtrip_and_indexes():
+    inventory = DeviceInventory()
+    inventory.put_many([
+        NetworkDevice(ip_address="10.0.1.20", mac_address="AA:BB:CC:00:00:01", services={22: "SSH"}),
+        NetworkDevice(ip_address="10.0.1.3"),
+        NetworkDevice(ip_address="10.0.2.1", mac_address="aa:bb:cc:00:00:01"),
+    ])
+
+    device = inventory["10.0.1.20"]
+    assert device.services == {22: "SSH"}
+    assert "10.0.1.3" in inventory and "10.0.9.9" not in inventory
+    assert list(inventory) == ["10.0.1.3", "10.0.1.20", "10.0.2.1"]
+    assert [d.ip_address for d in inventory.in_network("10.0.1.0/24")] == ["10.0.1.3", "10.0.1.20"]
+    assert sorted(d.ip_address for d in inventory.by_mac("aa:bb:cc:00:00:01")) == ["10.0.1.20", "10.0.2.1"]
+
+
+def test_retention_and_size_limit():
+    now = time.time()
+    inventory = DeviceInventory(retention=3600, max_devices=2)
+    inventory.put_many([
+        NetworkDevice(ip_address="10.0.0.1", last_seen=now - 7200),
+        NetworkDevice(ip_address="10.0.0.2", last_seen=now - 60),
+        NetworkDevice(ip_address="10.0.0.3", last_seen=now - 30),
+        NetworkDevice(ip_address="10.0.0.4", last_seen=now),
+    ])
+
+    assert sorted(inventory) == ["10.0.0.3", "10.0.0.4"]
+    assert [d.ip_address for d in inventory.seen_since(now - 45)] == ["10.0.0.4", "10.0.0.3"]
+
+
+def test_warm_start_from_file(tmp_path):
+    path = str(tmp_path / "inventory.db")
+    first = DeviceInventory(path)
+    first["192.168.1.5"] = NetworkDevice(ip_address="192.168.1.5", hostname="printer", open_ports=[631])
+    first.close()
+
+    reopened = DeviceInventory(path)
+    device = reopened["192.168.1.5"]
+    assert (device.hostname, device.open_ports) == ("printer", [631])
+    assert len(reopened) == 1
@@ -0,0 +1,152 @@
+"""Tests for IPv6 discovery and its merge with IPv4 devices."""
+
+import socket
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from network_discovery_mcp import scanner as scanner_module
+from network_discovery_mcp.interfaces import read_snapshot
+from network_discovery_mcp.ipv6 import (
+    Ipv6Neighbour,
+    NeighbourCollector,
+    discover_neighbours,
+    parse_ndp,
+)
+from network_discovery_mcp.neighbours import parse_neighbour_dump
+from network_discovery_mcp.scanner import NetworkDevice, NetworkScanner, collapse_networks
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _fixture(name: str) -> bytes:
+    return (FIXTURES / name).read_bytes()
+
+
+def test_parse_ndp_fixtures():
+    """Advertisements describe their target, solicitations and RAs their sender."""
+    assert parse_ndp(_fixture("icmpv6_neighbor_advert.bin"), "fe80::a8bb:ccff:fe00:10%eth0") == (
+        "fe80::a8bb:ccff:fe00:10%eth0",
+        "aa:bb:cc:00:00:10",
+    )
+    assert parse_ndp(_fixture("icmpv6_neighbor_solicit.bin"), "2001:db8::20") == (
+        "2001:db8::20",
+        "aa:bb:cc:00:00:20",
+    )
+    assert parse_ndp(_fixture("icmpv6_router_advert.bin"), "fe80::1%eth0") == ("fe80::1%eth0", "aa:bb:cc:00:00:01")
+    assert parse_ndp(_fixture("icmpv6_dad_solicit.bin"), "::") is None
+
+
+def test_collector_matches_echo_identifier():
+    collector = NeighbourCollector(identifier=0x1234, sent=10.0)
+    collector.feed(bytes.fromhex("81001111123400010a0b"), "2001:db8::20", received=10.25)
+    collector.feed(bytes.fromhex("81001111999900010a0b"), "2001:db8::99", received=10.5)
+    collector.feed(_fixture("icmpv6_neighbor_solicit.bin"), "2001:db8::20")
+
+    assert collector.neighbours == {"2001:db8::20": Ipv6Neighbour("2001:db8::20", "aa:bb:cc:00:00:20", 0.25)}
+
+
+@pytest.mark.asyncio
+async def test_echo_over_loopback():
+    try:
+        neighbours = await discover_neighbours("lo", destination="::1", listen_time=0.3)
+    except OSError as e:
+        pytest.skip(f"IPv6 loopback unavailable: {e}")
+
+    assert neighbours["::1"].response_time is not None
+
+
+def test_parse_neighbour_dump_scopes_link_local():
+    data = (FIXTURES / "netlink_neigh_dump.bin").read_bytes()
+    [(address, mac)] = parse_neighbour_dump(data, socket.AF_INET6, scoped=True).items()
+    assert address.startswith("fe80::1%")
+    assert mac == "aa:bb:cc:00:00:01"
+
+
+def test_snapshot_includes_ipv6_addresses():
+    addresses = {
+        "lo": {10: [{"addr": "::1", "netmask": "ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff/128"}]},
+        "eth0": {
+            2: [{"addr": "192.168.1.10", "netmask": "255.255.255.0"}],
+            10: [
+                {"addr": "2001:db8::10", "netmask": "ffff:ffff:ffff:ffff::/64"},
+                {"addr": "fe80::10%eth0", "netmask": "ffff:ffff:ffff:ffff::"},
+            ],
+        },
+    }
+    netifaces = SimpleNamespace(
+        AF_INET=2,
+        AF_INET6=10,
+        AF_LINK=17,
+        interfaces=lambda: list(addresses),
+        ifaddresses=lambda name: addresses[name],
+        gateways=lambda: {"default": {2: ("192.168.1.1", "eth0"), 10: ("fe80::1", "eth0")}},
+    )
+
+    snapshot = read_snapshot(netifaces)
+
+    assert [(i.ip_address, i.network, i.gateway) for i in snapshot.interfaces] == [
+        ("192.168.1.10", "192.168.1.0/24", "192.168.1.1"),
+        ("2001:db8::10", "2001:db8::/64", "fe80::1"),
+        ("fe80::10%eth0", "fe80::/64", "fe80::1"),
+    ]
+    assert collapse_networks([i.network for i in snapshot.interfaces] + ["10.0.0.0/8"]) == [
+        "10.0.0.0/8",
+        "192.168.1.0/24",
+        "2001:db8::/64",
+        "fe80::/64",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_discover_ipv6_merges_dual_stack_hosts_by_mac(monkeypatch):
+    async def fake_discover(interface, listen_time):
+        return {
+            "fe80::10%eth0": Ipv6Neighbour("fe80::10%eth0", "aa:bb:cc:00:00:10", 0.002),
+            "2001:db8::10": Ipv6Neighbour("2001:db8::10", None, 0.003),
+            "2001:db8::30": Ipv6Neighbour("2001:db8::30", None, 0.004),
+        }
+
+    monkeypatch.setattr(scanner_module, "discover_neighbours", fake_discover)
+    monkeypatch.setattr(
+        scanner_module,
+        "kernel_ipv6_neighbour_table",
+        lambda: {"2001:db8::10": "aa:bb:cc:00:00:10", "fe80::20%eth0": "aa:bb:cc:00:00:20"},
+    )
+    scanner = NetworkScanner()
+    lookups = []
+
+    async def resolve_many(addresses):
+        addresses = list(addresses)
+        lookups.extend(addresses)
+        return dict.fromkeys(addresses)
+
+    monkeypatch.setattr(scanner.resolver, "resolve_many", resolve_many)
+    monkeypatch.setattr(scanner.names, "resolve_many", lambda addresses: resolve_many(addresses))
+    scanner.devices["192.168.1.10"] = NetworkDevice(ip_address="192.168.1.10", mac_address="aa:bb:cc:00:00:10")
+
+    devices = await scanner.discover_ipv6(["eth0"], listen_time=0)
+
+    dual = scanner.devices["192.168.1.10"]
+    assert dual.ipv6_addresses == ["2001:db8::10", "fe80::10%eth0"]
+    # fe80::20 is only in the kernel table, which may be stale: not a live host.
+    assert sorted(scanner.devices) == ["192.168.1.10", "2001:db8::30"]
+    assert scanner.devices["2001:db8::30"].response_time == 0.004
+    assert {d.ip_address for d in devices} == set(scanner.devices)
+    assert "fe80::20%eth0" not in lookups
+    scanner.close()
+
+
+def test_ipv4_sweep_adopts_ipv6_only_record():
+    scanner = NetworkScanner()
+    scanner.devices["2001:db8::10"] = NetworkDevice(
+        ip_address="2001:db8::10", mac_address="aa:bb:cc:00:00:10", ipv6_addresses=["2001:db8::10"]
+    )
+    device = NetworkDevice(ip_address="192.168.1.10", mac_address="aa:bb:cc:00:00:10")
+
+    scanner._adopt_ipv6_records([device])
+
+    assert device.ipv6_addresses == ["2001:db8::10"]
+    assert "2001:db8::10" not in scanner.devices
+    scanner.close()
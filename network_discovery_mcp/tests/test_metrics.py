@@ -0,0 +1,179 @@
+"""Tests for per-phase scanner metrics and the get_scanner_metrics tool."""
+
+import asyncio
+import json
+import socket
+
+import pytest
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+from network_discovery_mcp import server as server_module
+from network_discovery_mcp.metrics import _NULL_TIMER, ScannerMetrics, phase_breakdown
+from network_discovery_mcp.resolver import ReverseResolver
+from network_discovery_mcp.scanner import NetworkScanner
+
+
+def test_phase_histogram_counters_and_gauges():
+    metrics = ScannerMetrics()
+    with metrics.phase("ping") as timer:
+        timer.record_as(0.0015)
+        assert metrics.phases["ping"].in_flight == 1
+    with metrics.phase("ping") as timer:
+        timer.record_as(0.3)
+        timer.timed_out()
+        timer.retried(2)
+    with pytest.raises(OSError), metrics.phase("ping"):
+        raise OSError("unreachable")
+
+    ping = metrics.snapshot()["phases"]["ping"]
+    assert (ping["calls"], ping["timeouts"], ping["errors"], ping["retries"]) == (3, 1, 1, 2)
+    assert (ping["in_flight"], ping["max_in_flight"]) == (0, 1)
+    assert ping["p99_ms"] == pytest.approx(409.6)
+
+    metrics.reset()
+    assert metrics.snapshot()["phases"]["ping"]["calls"] == 0
+
+
+def test_reset_keeps_timers_that_are_still_running():
+    metrics = ScannerMetrics()
+    with metrics.tool("get_scanner_metrics"):
+        with metrics.phase("ping"):
+            pass
+        metrics.reset()
+        assert metrics.tools["get_scanner_metrics"].in_flight == 1
+
+    tool = metrics.tools["get_scanner_metrics"]
+    assert (tool.in_flight, tool.calls) == (0, 1)
+    assert metrics.phases["ping"].calls == 0
+
+
+def test_disabled_metrics_record_only_into_a_breakdown():
+    metrics = ScannerMetrics(enabled=False)
+    assert metrics.phase("ping") is _NULL_TIMER
+    assert metrics.tool("ping_host") is _NULL_TIMER
+
+    with phase_breakdown() as breakdown:
+        with metrics.phase("dns") as timer:
+            timer.timed_out()
+        metrics.observe("banner", 0.01)
+
+    assert metrics.phases == {}
+    assert breakdown.phases["dns"].timeouts == 1
+    assert breakdown.phases["banner"].calls == 1
+
+
+@pytest.mark.asyncio
+async def test_breakdown_collects_phases_from_child_tasks():
+    metrics = ScannerMetrics()
+
+    async def probe() -> None:
+        with metrics.phase("connect"):
+            await asyncio.sleep(0.01)
+
+    with phase_breakdown() as breakdown:
+        await asyncio.gather(*(probe() for _ in range(4)))
+    # Phases timed outside the block are not attributed to it.
+    await probe()
+
+    assert breakdown.phases["connect"].calls == 4
+    assert metrics.phases["connect"].calls == 5
+    assert metrics.phases["connect"].max_in_flight == 4
+    summary = breakdown.summary()
+    assert summary.startswith("Timings: ") and "connect 4x" in summary
+
+
+def test_prometheus_exposition():
+    metrics = ScannerMetrics()
+    with metrics.phase("ping") as timer:
+        timer.record_as(0.002)
+        timer.timed_out()
+    with metrics.tool("ping_host"):
+        pass
+
+    text = metrics.to_prometheus({"scheduler_window": 256.0})
+
+    assert "# TYPE network_discovery_phase_seconds histogram" in text
+    assert 'network_discovery_phase_seconds_bucket{phase="ping",le="0.0016"} 0' in text
+    assert 'network_discovery_phase_seconds_bucket{phase="ping",le="0.0032"} 1' in text
+    assert 'network_discovery_phase_seconds_bucket{phase="ping",le="+Inf"} 1' in text
+    assert 'network_discovery_phase_seconds_count{phase="ping"} 1' in text
+    assert 'network_discovery_phase_timeouts_total{phase="ping"} 1' in text
+    assert 'network_discovery_tool_seconds_count{tool="ping_host"} 1' in text
+    assert "network_discovery_scheduler_window 256.0" in text
+
+
+def test_prometheus_label_values_are_escaped():
+    metrics = ScannerMetrics()
+    with metrics.phase('odd "phase"\nname\\'):
+        pass
+
+    text = metrics.to_prometheus()
+
+    assert 'network_discovery_phase_seconds_count{phase="odd \\"phase\\"\\nname\\\\"} 1' in text
+    assert all(line.count('"') % 2 == 0 for line in text.splitlines())
+
+
+@pytest.mark.asyncio
+async def test_dns_timeouts_and_retries_are_counted():
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+    metrics = ScannerMetrics()
+    resolver = ReverseResolver(
+        nameservers=["127.0.0.1"], port=silent.getsockname()[1], timeout=0.05, attempts=2, metrics=metrics
+    )
+    try:
+        assert await resolver.resolve("10.0.0.1") is None
+    finally:
+        resolver.close()
+        silent.close()
+
+    dns = metrics.phases["dns"]
+    assert (dns.calls, dns.timeouts, dns.retries) == (1, 1, 1)
+
+
+@pytest.fixture
+def metered_server(fake_network, monkeypatch):
+    scanner = NetworkScanner(metrics=ScannerMetrics())
+    monkeypatch.setattr(server_module, "scanner", scanner)
+    yield scanner
+    scanner.close()
+
+
+async def _call(name: str, arguments: dict):
+    request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments))
+    return await server_module.handle_call_tool(request)
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_report_timings_on_request(metered_server):
+    plain = await _call("ping_host", {"host": "192.0.2.1"})
+    timed = await _call("ping_host", {"host": "192.0.2.1", "timings": True})
+
+    assert len(plain.content) == 1
+    assert timed.content[-1].text.startswith("Timings: ")
+    assert "ping 1x" in timed.content[-1].text and "(1 timed out)" in timed.content[-1].text
+    assert metered_server.metrics.tools["ping_host"].calls == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_tools_are_not_timed(metered_server):
+    result = await _call("no_such_tool", {})
+
+    assert result.content[0].text.startswith("Error executing no_such_tool")
+    assert metered_server.metrics.tools == {}
+
+
+@pytest.mark.asyncio
+async def test_get_scanner_metrics_tool(metered_server):
+    await _call("ping_host", {"host": "192.0.2.1"})
+
+    result = await _call("get_scanner_metrics", {})
+    report = json.loads(result.content[0].text.split("\n", 1)[1])
+    assert report["phases"]["ping"]["timeouts"] == 1
+    assert report["tools"]["ping_host"]["calls"] == 1
+    assert "window" in report["scheduler"]
+
+    result = await _call("get_scanner_metrics", {"format": "prometheus", "reset": True})
+    assert 'network_discovery_phase_timeouts_total{phase="ping"} 1' in result.content[0].text
+    assert "network_discovery_scheduler_window" in result.content[0].text
+    assert metered_server.metrics.phases["ping"].calls == 0
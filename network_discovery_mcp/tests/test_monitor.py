@@ -0,0 +1,83 @@
+"""Tests for the background network monitor."""
+
+import asyncio
+import json
+
+import pytest
+
+from network_discovery_mcp import server as server_module
+from network_discovery_mcp.monitor import NetworkMonitor
+from network_discovery_mcp.scanner import NetworkScanner
+
+
+@pytest.fixture
+def live_hosts():
+    return {"10.4.0.2": 0.001, "10.4.0.5": 0.001}
+
+
+async def _until(condition, timeout=5.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_monitor_keeps_inventory_warm_and_stops_cleanly(scanner):
+    monitor = NetworkMonitor(scanner, ["10.4.0.0/29"], interval=0.05, packet_rate=1000)
+
+    monitor.start()
+    await _until(lambda: monitor.networks["10.4.0.0/29"].sweeps >= 2)
+    await monitor.stop()
+
+    assert not monitor.running
+    assert sorted(scanner.devices) == ["10.4.0.2", "10.4.0.5"]
+    assert monitor.covers("10.4.0.0/30").network == "10.4.0.0/29"
+    assert monitor.covers("10.4.0.0/24") is None
+    assert monitor.covers("10.4.0.0/29", include_ports=True) is None
+
+
+@pytest.mark.asyncio
+async def test_scan_network_answers_from_monitor(scanner, fake_network, monkeypatch):
+    monitor = NetworkMonitor(scanner, ["10.4.0.0/29"], interval=60, packet_rate=1000)
+    monkeypatch.setattr(server_module, "scanner", scanner)
+    monkeypatch.setattr(server_module, "monitor", monitor)
+
+    monitor.start()
+    await _until(lambda: monitor.networks["10.4.0.0/29"].sweeps >= 1)
+    probes_after_sweep = len(fake_network.probed)
+    try:
+        result = await server_module._scan_network({"network": "10.4.0.0/29", "format": "compact"})
+    finally:
+        await monitor.stop()
+
+    assert "Found 2 active devices" in result.content[0].text
+    assert "background sweep" in result.content[0].text
+    assert len(fake_network.probed) == probes_after_sweep
+
+
+@pytest.mark.asyncio
+async def test_scanner_metrics_report_the_monitor(scanner, monkeypatch):
+    monitor = NetworkMonitor(scanner, ["10.4.0.0/29"], interval=60, packet_rate=1000)
+    monkeypatch.setattr(server_module, "scanner", scanner)
+    monkeypatch.setattr(server_module, "monitor", monitor)
+
+    monitor.start()
+    await _until(lambda: monitor.networks["10.4.0.0/29"].sweeps >= 1)
+    try:
+        result = await server_module._get_scanner_metrics({})
+        exposition = await server_module._get_scanner_metrics({"format": "prometheus"})
+    finally:
+        await monitor.stop()
+
+    report = json.loads(result.content[0].text.split("\n", 1)[1])
+    assert report["monitor"]["running"]
+    assert report["monitor"]["networks"][0]["network"] == "10.4.0.0/29"
+    assert report["monitor"]["networks"][0]["devices"] == 2
+    assert "network_discovery_monitor_running 1" in exposition.content[0].text
+
+
+def test_invalid_jitter_is_rejected():
+    with pytest.raises(ValueError, match="jitter"):
+        NetworkMonitor(NetworkScanner(), ["10.4.0.0/29"], jitter=1.5)
@@ -0,0 +1,187 @@
+"""Tests for batched mDNS / NetBIOS / LLMNR name resolution against loopback stand-in responders."""
+
+import asyncio
+import ipaddress
+import struct
+
+import pytest
+import pytest_asyncio
+
+from network_discovery_mcp.names import (
+    TYPE_NBSTAT,
+    MulticastNameResolver,
+    build_mdns_queries,
+    build_nbstat_query,
+    decode_netbios_name,
+    encode_netbios_name,
+    parse_nbstat_response,
+)
+from network_discovery_mcp.resolver import CLASS_IN, TYPE_PTR, decode_name, encode_name
+from network_discovery_mcp.scanner import NetworkScanner
+
+
+def _questions(message: bytes) -> list[tuple[str, int, int]]:
+    count = struct.unpack_from("!H", message, 4)[0]
+    offset = 12
+    questions = []
+    for _ in range(count):
+        name, offset = decode_name(message, offset)
+        qtype, qclass = struct.unpack_from("!HH", message, offset)
+        offset += 4
+        questions.append((name, qtype, qclass))
+    return questions
+
+
+def _ptr_response(query_id: int, answers: dict[str, str]) -> bytes:
+    records = b""
+    for name, hostname in answers.items():
+        rdata = encode_name(hostname)
+        records += encode_name(name) + struct.pack("!HHIH", TYPE_PTR, CLASS_IN | 0x8000, 120, len(rdata)) + rdata
+    return struct.pack("!HHHHHH", query_id, 0x8400, 0, len(answers), 0, 0) + records
+
+
+def _nbstat_response(query_id: int, names: list[tuple[str, int, int]]) -> bytes:
+    rdata = bytes([len(names)])
+    for name, suffix, flags in names:
+        rdata += name.ljust(15).encode("ascii") + bytes([suffix]) + struct.pack("!H", flags)
+    rdata += bytes(46)
+    question = encode_name("CK" + "A" * 30)
+    header = struct.pack("!HHHHHH", query_id, 0x8400, 0, 1, 0, 0)
+    return header + question + struct.pack("!HHIH", TYPE_NBSTAT, CLASS_IN, 0, len(rdata)) + rdata
+
+
+class Responder(asyncio.DatagramProtocol):
+    """Answer each datagram with whatever ``reply(data)`` returns (None stays silent)."""
+
+    def __init__(self, reply) -> None:
+        self.reply = reply
+        self.received: list[bytes] = []
+        self.transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.received.append(data)
+        response = self.reply(data)
+        if response is not None:
+            self.transport.sendto(response, addr)
+
+
+@pytest_asyncio.fixture
+async def responders():
+    """Start stand-in responders on loopback addresses."""
+    loop = asyncio.get_running_loop()
+    transports = []
+
+    async def start(host: str, port: int, reply) -> tuple[Responder, int]:
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: Responder(reply), local_addr=(host, port)
+        )
+        transports.append(transport)
+        return protocol, transport.get_extra_info("sockname")[1]
+
+    yield start
+    for transport in transports:
+        transport.close()
+
+
+def test_mdns_queries_compress_and_split():
+    addresses = [f"10.0.{i // 256}.{i % 256}" for i in range(300)]
+
+    queries = build_mdns_queries(0x1234, addresses)
+
+    assert len(queries) > 1
+    assert all(len(query) <= 1400 for query in queries)
+    questions = [question for query in queries for question in _questions(query)]
+    assert [name for name, _, _ in questions] == [ipaddress.ip_address(a).reverse_pointer for a in addresses]
+    assert {(qtype, qclass) for _, qtype, qclass in questions} == {(TYPE_PTR, CLASS_IN | 0x8000)}
+    # Compressed questions cost well under the ~30 bytes of a spelled-out name.
+    assert sum(map(len, queries)) < 300 * 20
+
+
+def test_netbios_names_round_trip():
+    assert decode_netbios_name(encode_netbios_name("fileserver", 0x20)) == ("FILESERVER", 0x20)
+    assert decode_netbios_name("short") is None
+    assert _questions(build_nbstat_query(7)) == [("CK" + "A" * 30, TYPE_NBSTAT, CLASS_IN)]
+
+    response = _nbstat_response(
+        7, [("WORKGROUP", 0x00, 0x8400), ("DESKTOP-01", 0x20, 0x0400), ("DESKTOP-01", 0x00, 0x0400)]
+    )
+    assert parse_nbstat_response(response) == "DESKTOP-01"
+
+
+@pytest.mark.asyncio
+async def test_resolver_collects_answers_from_every_protocol(responders):
+    def mdns(data):
+        query_id = struct.unpack_from("!H", data)[0]
+        return _ptr_response(query_id, {"2.0.0.127.in-addr.arpa": "printer.local"})
+
+    def nbstat(data):
+        return _nbstat_response(struct.unpack_from("!H", data)[0], [("DESKTOP-01", 0x00, 0x0400)])
+
+    def llmnr(data):
+        query_id = struct.unpack_from("!H", data)[0]
+        return _ptr_response(query_id, {"4.0.0.127.in-addr.arpa": "laptop"})
+
+    mdns_server, mdns_port = await responders("127.0.0.1", 0, mdns)
+    _, nbns_port = await responders("127.0.0.3", 0, nbstat)
+    llmnr_server, llmnr_port = await responders("127.0.0.4", 0, llmnr)
+    names = MulticastNameResolver(
+        window=0.3, mdns_address=("127.0.0.1", mdns_port), nbns_port=nbns_port, llmnr_port=llmnr_port
+    )
+
+    addresses = ["127.0.0.2", "127.0.0.3", "127.0.0.4", "127.0.0.5"]
+    assert await names.resolve_many(addresses) == {
+        "127.0.0.2": "printer.local",
+        "127.0.0.3": "DESKTOP-01",
+        "127.0.0.4": "laptop",
+        "127.0.0.5": None,
+    }
+    # One mDNS datagram asked about every address.
+    assert len(mdns_server.received) == 1
+    assert len(_questions(mdns_server.received[0])) == 4
+    assert struct.unpack_from("!H", llmnr_server.received[0], 2)[0] == 0
+
+    # Answers and silence are both cached: nothing goes out the second time.
+    assert await names.resolve_many(addresses) == {
+        "127.0.0.2": "printer.local",
+        "127.0.0.3": "DESKTOP-01",
+        "127.0.0.4": "laptop",
+        "127.0.0.5": None,
+    }
+    assert len(mdns_server.received) == 1
+
+
+@pytest.mark.asyncio
+async def test_multicast_only_round_does_not_cache_silence(responders):
+    mdns_server, mdns_port = await responders("127.0.0.1", 0, lambda data: None)
+    names = MulticastNameResolver(window=0.05, mdns_address=("127.0.0.1", mdns_port))
+
+    assert await names.resolve_many(["127.0.0.9"], unicast=False) == {"127.0.0.9": None}
+    assert names.cached("127.0.0.9") == (False, None)
+    assert len(mdns_server.received) == 1
+
+
+@pytest.mark.asyncio
+async def test_lookup_hostnames_falls_back_to_ptr_for_unnamed_hosts(monkeypatch):
+    scanner = NetworkScanner()
+    ptr_lookups = []
+
+    async def names(addresses, unicast=True, broadcast=None):
+        return {address: "nas.local" if address == "192.168.1.2" else None for address in addresses}
+
+    async def ptr(addresses):
+        addresses = list(addresses)
+        ptr_lookups.extend(addresses)
+        return dict.fromkeys(addresses, "host.example")
+
+    monkeypatch.setattr(scanner.names, "resolve_many", names)
+    monkeypatch.setattr(scanner.resolver, "resolve_many", ptr)
+
+    assert await scanner.lookup_hostnames(["192.168.1.2", "192.168.1.3"]) == {
+        "192.168.1.2": "nas.local",
+        "192.168.1.3": "host.example",
+    }
+    assert ptr_lookups == ["192.168.1.3"]
+    scanner.close()
@@ -0,0 +1,63 @@
+"""Tests for kernel neighbour table readers and batched MAC resolution."""
+
+import socket
+from pathlib import Path
+
+import pytest
+
+from network_discovery_mcp import scanner as scanner_module
+from network_discovery_mcp.neighbours import parse_neighbour_dump, read_proc_arp
+from network_discovery_mcp.scanner import NetworkDevice, NetworkScanner
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def test_read_proc_arp_skips_incomplete_entries():
+    """Only complete entries are returned, with normalised MACs."""
+    entries = read_proc_arp(str(FIXTURES / "proc_net_arp"))
+    assert entries == {
+        "192.168.1.1": "aa:bb:cc:00:00:01",
+        "192.168.1.20": "aa:bb:cc:00:00:14",
+        "192.168.1.40": "aa:bb:cc:00:00:28",
+    }
+
+
+def test_read_proc_arp_missing_file_is_empty(tmp_path):
+    """A missing table (non-Linux hosts) is treated as empty."""
+    assert read_proc_arp(str(tmp_path / "missing")) == {}
+
+
+def test_parse_neighbour_dump_fixture():
+    """Reachable and permanent IPv4 entries are kept; failed/incomplete are not."""
+    data = (FIXTURES / "netlink_neigh_dump.bin").read_bytes()
+    assert parse_neighbour_dump(data) == {
+        "192.168.1.50": "aa:bb:cc:00:00:32",
+        "192.168.1.51": "aa:bb:cc:00:00:33",
+    }
+    assert parse_neighbour_dump(data, socket.AF_INET6) == {"fe80::1": "aa:bb:cc:00:00:01"}
+
+
+@pytest.mark.asyncio
+async def test_resolve_mac_addresses_probes_only_unknown_hosts(monkeypatch):
+    """Kernel-known hosts skip probing; the rest share one ARP sweep."""
+    monkeypatch.setattr(
+        scanner_module, "kernel_neighbour_table", lambda: {"10.0.0.1": "aa:bb:cc:00:00:01"}
+    )
+    monkeypatch.setattr(scanner_module, "scapy_available", True)
+    monkeypatch.setattr(scanner_module, "ARP", object())
+    monkeypatch.setattr(scanner_module, "Ether", object())
+    monkeypatch.setattr(scanner_module, "srp", object())
+
+    sweeps = []
+
+    def fake_sweep(addresses, timeout):
+        sweeps.append(list(addresses))
+        return {"10.0.0.2": "aa:bb:cc:00:00:02"}
+
+    monkeypatch.setattr(NetworkScanner, "_arp_sweep", staticmethod(fake_sweep))
+
+    devices = [NetworkDevice(ip_address=f"10.0.0.{i}") for i in (1, 2, 3)]
+    await NetworkScanner().resolve_mac_addresses(devices)
+
+    assert sweeps == [["10.0.0.2", "10.0.0.3"]]
+    assert [d.mac_address for d in devices] == ["aa:bb:cc:00:00:01", "aa:bb:cc:00:00:02", None]
@@ -0,0 +1,87 @@
+"""Tests for the memory-mapped MAC vendor index."""
+
+import pytest
+
+from network_discovery_mcp.oui import (
+    DEFAULT_INDEX,
+    DEFAULT_REGISTRY,
+    VendorIndex,
+    build_index,
+    read_registry,
+    write_index,
+)
+from network_discovery_mcp.scanner import NetworkDevice, NetworkScanner
+
+REGISTRY = """\
+Registry,Assignment,Organization Name,Organization Address
+MA-L,70B3D5,IEEE Registration Authority,
+MA-L,001B21,Intel Corporate,
+MA-M,001B21A,Nested Vendor,
+MA-S,70B3D5123,"Tiny Devices, Inc.",
+MA-S,70B3D5FFF,"Tiny Devices, Inc.",
+MA-L,ZZZZZZ,Broken,
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    registry = tmp_path / "registry.csv"
+    registry.write_text(REGISTRY)
+    path = tmp_path / "oui.bin"
+    assert write_index([registry], path) == 4
+    index = VendorIndex(path)
+    yield index
+    index.close()
+
+
+def test_longest_prefix_wins(index):
+    assert index.lookup("00:1b:21:01:02:03") == "Intel Corporate"
+    assert index.lookup("00-1B-21-A1-02-03") == "Nested Vendor"
+    assert index.lookup("70:b3:d5:12:34:56") == "Tiny Devices, Inc."
+    assert index.lookup("70:b3:d5:ff:f0:00") == "Tiny Devices, Inc."
+    # The registrar's own block is not a vendor.
+    assert index.lookup("70:b3:d5:00:00:01") is None
+    assert index.lookup("00:00:00:00:00:01") is None
+    assert index.lookup("ff:ff:ff:ff:ff:ff") is None
+
+
+def test_rejects_local_and_malformed_addresses(index):
+    assert index.lookup("02:1b:21:01:02:03") is None
+    assert index.lookup("not a mac") is None
+    assert index.lookup_many(["00:1b:21:00:00:01", None, "00:1b:21:00:00:01", "02:00:00:00:00:01"]) == {
+        "00:1b:21:00:00:01": "Intel Corporate",
+        "02:00:00:00:00:01": None,
+    }
+
+
+def test_names_are_stored_once(tmp_path):
+    entries = [(prefix << 24, 24, "Same Vendor") for prefix in range(100)]
+    assert len(build_index(entries)) < 100 * 12 + 12 + 20
+
+    path = tmp_path / "oui.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        VendorIndex(path)
+
+
+def test_bundled_index_matches_registry():
+    assert DEFAULT_INDEX.read_bytes() == build_index(read_registry(DEFAULT_REGISTRY))
+    index = VendorIndex()
+    assert index.lookup("00:50:56:aa:bb:cc") == "VMware, Inc."
+    index.close()
+
+
+def test_scanner_assigns_vendors_per_batch(index):
+    scanner = NetworkScanner(vendors=index)
+    devices = [
+        NetworkDevice(ip_address="10.0.0.1", mac_address="00:1b:21:00:00:01"),
+        # A passive hint does not keep the registry from being consulted.
+        NetworkDevice(ip_address="10.0.0.2", mac_address="70:b3:d5:12:30:00", vendor_hint="MSFT 5.0"),
+        NetworkDevice(ip_address="10.0.0.3"),
+    ]
+
+    scanner.assign_vendors(devices)
+
+    assert [device.vendor for device in devices] == ["Intel Corporate", "Tiny Devices, Inc.", None]
+    assert devices[1].vendor_hint == "MSFT 5.0"
+    scanner.close()
@@ -0,0 +1,76 @@
+"""Tests for compact, projected and paginated tool output."""
+
+import json
+
+import pytest
+
+from network_discovery_mcp import server as server_module
+from network_discovery_mcp.output import EncodedRows, ResultStore
+from network_discovery_mcp.scanner import NetworkDevice
+
+ROWS = [
+    {"ip_address": "10.0.0.1", "open_ports": [22], "hostname": "a"},
+    {"ip_address": "10.0.0.2", "open_ports": [], "hostname": None},
+    {"ip_address": "10.0.0.3", "open_ports": [80, 443], "hostname": "c"},
+]
+
+
+def test_compact_projection():
+    encoded = EncodedRows.encode(ROWS, "compact", ["ip_address", "open_ports"])
+
+    assert encoded.render() == (
+        '[{"ip_address":"10.0.0.1","open_ports":[22]},'
+        '{"ip_address":"10.0.0.2","open_ports":[]},'
+        '{"ip_address":"10.0.0.3","open_ports":[80,443]}]'
+    )
+
+
+def test_table_layout():
+    encoded = EncodedRows.encode(ROWS, "table", ["ip_address", "hostname"])
+
+    assert encoded.render(0, 2).splitlines() == [
+        '["ip_address","hostname"]',
+        '["10.0.0.1","a"]',
+        '["10.0.0.2",null]',
+    ]
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Unknown output format"):
+        EncodedRows.encode(ROWS, "yaml")
+
+
+def test_pages_are_slices_of_one_encoding():
+    store = ResultStore()
+    encoded = EncodedRows.encode(ROWS, "json")
+
+    first = store.first_page("3 devices", encoded, page_size=2)
+    second = store.page(first.next_cursor)
+
+    assert [row["ip_address"] for row in json.loads(first.text)] == ["10.0.0.1", "10.0.0.2"]
+    assert [row["ip_address"] for row in json.loads(second.text)] == ["10.0.0.3"]
+    assert (second.start, second.end, second.total, second.next_cursor) == (2, 3, 3, None)
+    with pytest.raises(ValueError, match="Unknown or expired cursor"):
+        store.page("r999:0")
+
+
+@pytest.mark.asyncio
+async def test_scan_network_pages_without_rescanning(monkeypatch):
+    sweeps = []
+
+    async def fake_sweep(networks, include_ports, reporter):
+        sweeps.append(networks)
+        return [NetworkDevice(ip_address=f"10.0.0.{i}") for i in range(1, 6)]
+
+    monkeypatch.setattr(server_module, "_sweep_with_progress", fake_sweep)
+
+    first = await server_module._scan_network(
+        {"network": "10.0.0.0/29", "format": "table", "fields": ["ip_address"], "page_size": 3}
+    )
+    text = first.content[0].text
+    cursor = text.rsplit("next cursor: ", 1)[1]
+    second = await server_module._scan_network({"cursor": cursor})
+
+    assert text.splitlines()[3:7] == ['["ip_address"]', '["10.0.0.1"]', '["10.0.0.2"]', '["10.0.0.3"]']
+    assert second.content[0].text.splitlines()[4:] == ['["10.0.0.4"]', '["10.0.0.5"]']
+    assert len(sweeps) == 1
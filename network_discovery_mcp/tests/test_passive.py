@@ -0,0 +1,192 @@
+"""Tests for passive discovery: frame parsing, BPF filtering, pcap replay and live capture."""
+
+import asyncio
+import json
+import socket
+import struct
+from pathlib import Path
+
+import pytest
+
+from network_discovery_mcp import server as server_module
+from network_discovery_mcp.inventory import DeviceInventory
+from network_discovery_mcp.passive import (
+    PassiveListener,
+    Sighting,
+    apply_sightings,
+    build_filter,
+    parse_frames,
+    read_pcap,
+    replay_pcap,
+    write_pcap,
+)
+from network_discovery_mcp.resolver import encode_name
+from network_discovery_mcp.scanner import NetworkDevice
+
+# ARP reply, ARP probe, DHCP request and ACK, mDNS response, SSDP NOTIFY,
+# LLMNR query, NBNS refresh, NetBIOS browser datagram, IPv6 mDNS query,
+# a TCP segment and a truncated frame.
+CAPTURE = Path(__file__).parent / "fixtures" / "passive.pcap"
+
+
+def run_filter(program, frame):
+    """Interpret the subset of classic BPF that build_filter emits."""
+    a = x = pc = 0
+    while True:
+        code, jt, jf, k = program[pc]
+        pc += 1
+        if code == 0x28:
+            a = struct.unpack_from("!H", frame, k)[0]
+        elif code == 0x30:
+            a = frame[k]
+        elif code == 0x48:
+            a = struct.unpack_from("!H", frame, x + k)[0]
+        elif code == 0xB1:
+            x = (frame[k] & 0x0F) * 4
+        elif code == 0x15:
+            pc += jt if a == k else jf
+        elif code == 0x45:
+            pc += jt if a & k else jf
+        elif code == 0x06:
+            return k
+        else:
+            raise AssertionError(f"unexpected opcode {code:#x}")
+
+
+def test_filter_keeps_only_discovery_traffic():
+    program = build_filter()
+    frames = list(read_pcap(str(CAPTURE)))[:-1]
+    accepted = [bool(run_filter(program, frame)) for frame in frames]
+    # Everything but the TCP segment.
+    assert accepted == [True] * 10 + [False]
+
+
+def test_filter_and_parser_see_through_a_vlan_tag():
+    program = build_filter()
+    frames = list(read_pcap(str(CAPTURE)))[:-1]
+    tagged = [frame[:12] + struct.pack("!HH", 0x8100, 42) + frame[12:] for frame in frames]
+
+    assert [bool(run_filter(program, frame)) for frame in tagged] == [True] * 10 + [False]
+    assert parse_frames(tagged) == parse_frames(frames)
+
+
+def test_replay_fills_inventory():
+    inventory = DeviceInventory()
+    inventory["192.168.1.24"] = NetworkDevice(ip_address="192.168.1.24", vendor="Sonos")
+
+    stats = replay_pcap(str(CAPTURE), inventory, batch_size=4)
+
+    assert stats.packets == 12
+    assert stats.packets_per_second > 0
+    by_ip = {ip: inventory[ip] for ip in inventory}
+    assert sorted(by_ip, key=lambda ip: (":" in ip, ip)) == [
+        "192.168.1.1", "192.168.1.20", "192.168.1.21", "192.168.1.22", "192.168.1.23",
+        "192.168.1.24", "192.168.1.25", "192.168.1.26", "192.168.1.27", "fe80::1c",
+    ]
+    assert (by_ip["192.168.1.21"].hostname, by_ip["192.168.1.21"].vendor_hint) == ("laptop", "MSFT 5.0")
+    # Announced software never stands in for the MAC registry's manufacturer.
+    assert by_ip["192.168.1.21"].vendor is None
+    assert by_ip["192.168.1.22"].mac_address == "aa:bb:cc:00:00:16"
+    assert by_ip["192.168.1.23"].hostname == "printer.local"
+    assert by_ip["192.168.1.23"].ipv6_addresses == ["2001:db8::17"]
+    assert by_ip["192.168.1.24"].vendor == "Sonos"
+    assert by_ip["192.168.1.26"].hostname == "DESKTOP-01"
+    assert by_ip["192.168.1.27"].hostname == "FILESERVER"
+    assert by_ip["fe80::1c"].mac_address == "aa:bb:cc:00:00:1c"
+
+
+def test_ipv6_sighting_joins_known_device_by_mac():
+    inventory = DeviceInventory()
+    inventory["192.168.1.28"] = NetworkDevice(ip_address="192.168.1.28", mac_address="aa:bb:cc:00:00:1c")
+
+    frames = list(read_pcap(str(CAPTURE)))
+    apply_sightings(inventory, parse_frames(frames[9:10]))
+
+    assert list(inventory) == ["192.168.1.28"]
+    assert inventory["192.168.1.28"].ipv6_addresses == ["fe80::1c"]
+
+
+def test_reused_address_takes_the_new_hosts_mac():
+    inventory = DeviceInventory()
+    inventory["192.168.1.50"] = NetworkDevice(
+        ip_address="192.168.1.50", mac_address="aa:bb:cc:00:00:01", vendor="Old Corp", vendor_hint="MSFT 5.0"
+    )
+
+    apply_sightings(inventory, [
+        Sighting("dhcp", "192.168.1.50", "aa:bb:cc:00:00:02"),
+        Sighting("mdns", "fe80::2", "aa:bb:cc:00:00:02"),
+        Sighting("mdns", "2001:db8::2", "aa:bb:cc:00:00:02"),
+    ])
+
+    device = inventory["192.168.1.50"]
+    assert device.mac_address == "aa:bb:cc:00:00:02"
+    assert (device.vendor, device.vendor_hint) == (None, None)
+    assert device.ipv6_addresses == ["2001:db8::2", "fe80::2"]
+
+
+def test_read_pcap_rejects_other_files(tmp_path):
+    path = tmp_path / "not.pcap"
+    path.write_bytes(b"\0" * 32)
+    with pytest.raises(ValueError):
+        list(read_pcap(str(path)))
+
+    write_pcap(str(path), [b"\x01" * 20])
+    assert list(read_pcap(str(path))) == [b"\x01" * 20]
+
+
+@pytest.mark.asyncio
+async def test_listener_on_loopback():
+    inventory = DeviceInventory()
+    listener = PassiveListener(inventory, interface="lo")
+    try:
+        listener.start()
+    except OSError as e:
+        pytest.skip(f"packet capture unavailable: {e}")
+
+    response = struct.pack("!HHHHHH", 0, 0x8400, 0, 1, 0, 0) + encode_name("nas.local")
+    response += struct.pack("!HHIH", 1, 0x8001, 120, 4) + socket.inet_aton("127.0.0.7")
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+        sender.bind(("127.0.0.7", 0))
+        sender.sendto(response, ("127.0.0.1", 5353))
+        sender.sendto(b"ignored", ("127.0.0.1", 9))
+        for _ in range(50):
+            if "127.0.0.7" in inventory:
+                break
+            await asyncio.sleep(0.02)
+    listener.close()
+
+    assert inventory["127.0.0.7"].hostname == "nas.local"
+    assert listener.packets == 1
+
+
+@pytest.mark.asyncio
+async def test_scan_network_passive_sends_nothing(monkeypatch):
+    inventory = DeviceInventory()
+    replay_pcap(str(CAPTURE), inventory)
+    monkeypatch.setattr(server_module.scanner, "devices", inventory)
+
+    async def no_probes(*args, **kwargs):
+        raise AssertionError("passive scan sent a probe")
+
+    monkeypatch.setattr(server_module.scanner, "ping_host", no_probes)
+
+    result = await server_module._scan_network(
+        {"network": "192.168.1.0/24", "passive": True, "format": "compact", "fields": ["ip_address"]}
+    )
+
+    assert result.content[0].text.startswith("Found 9 known devices on network 192.168.1.0/24 (no probes sent)")
+
+
+@pytest.mark.asyncio
+async def test_scanner_metrics_report_the_passive_listener(monkeypatch):
+    listener = PassiveListener(DeviceInventory())
+    listener.ingest(list(read_pcap(str(CAPTURE))))
+    monkeypatch.setattr(server_module, "passive", listener)
+
+    result = await server_module._get_scanner_metrics({})
+    exposition = await server_module._get_scanner_metrics({"format": "prometheus"})
+
+    report = json.loads(result.content[0].text.split("\n", 1)[1])
+    assert report["passive"] == {"running": False, "interface": None, "packets": 12, "sightings": listener.sightings}
+    assert listener.sightings > 0
+    assert "network_discovery_passive_packets 12" in exposition.content[0].text
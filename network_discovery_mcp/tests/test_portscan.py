@@ -0,0 +1,105 @@
+"""Tests for the low-level TCP connect-scan engine."""
+
+import asyncio
+import socket
+
+import pytest
+
+from network_discovery_mcp.portscan import (
+    PORT_CLOSED,
+    PORT_FILTERED,
+    PORT_OPEN,
+    connect_probe,
+    parse_port_spec,
+)
+from network_discovery_mcp.scanner import NetworkScanner
+
+
+def test_parse_port_spec():
+    """Ranges and single ports are expanded, de-duplicated and sorted."""
+    assert parse_port_spec("8080, 20-22,22") == [20, 21, 22, 8080]
+    assert parse_port_spec([443, 80, 80]) == [80, 443]
+    with pytest.raises(ValueError):
+        parse_port_spec("0-10")
+    with pytest.raises(ValueError):
+        parse_port_spec("100-90")
+
+
+@pytest.mark.asyncio
+async def test_scan_ports_reports_open_and_closed_states():
+    """Listeners are open and everything else on loopback is refused."""
+    servers = [await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0) for _ in range(3)]
+    open_ports = sorted(server.sockets[0].getsockname()[1] for server in servers)
+    # A port we bound and released: nothing listens on it now.
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as released:
+        released.bind(("127.0.0.1", 0))
+        closed_port = released.getsockname()[1]
+    try:
+        spec = ",".join(str(port) for port in open_ports) + f",{closed_port}"
+        states = await NetworkScanner().scan_ports("127.0.0.1", spec)
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+    assert {port: states[port] for port in open_ports} == dict.fromkeys(open_ports, PORT_OPEN)
+    assert states[closed_port] == PORT_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_unanswered_connect_is_filtered():
+    """A connect that neither completes nor is refused times out as filtered."""
+    # A listener whose accept queue is full silently drops further SYNs.
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    port = listener.getsockname()[1]
+    fillers = []
+    try:
+        for _ in range(2):
+            filler = socket.socket()
+            filler.setblocking(False)
+            filler.connect_ex(("127.0.0.1", port))
+            fillers.append(filler)
+        await asyncio.sleep(0.05)
+        result = await connect_probe(socket.AF_INET, "127.0.0.1", port, timeout=0.2)
+    finally:
+        for sock in [listener, *fillers]:
+            sock.close()
+    assert result.state == PORT_FILTERED
+    assert result.rtt is None
+
+
+@pytest.mark.asyncio
+async def test_scan_and_identify_uses_one_connection_per_port():
+    """Banners are read on the discovery connection; identification never reconnects."""
+    connections = []
+
+    async def banner_service(reader, writer):
+        connections.append(writer.get_extra_info("peername"))
+        writer.write(b"220 fake service ready\r\n")
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def silent_service(reader, writer):
+        connections.append(writer.get_extra_info("peername"))
+        await reader.read()
+        writer.close()
+
+    talker = await asyncio.start_server(banner_service, "127.0.0.1", 0)
+    quiet = await asyncio.start_server(silent_service, "127.0.0.1", 0)
+    talker_port = talker.sockets[0].getsockname()[1]
+    quiet_port = quiet.sockets[0].getsockname()[1]
+    try:
+        states, services = await NetworkScanner().scan_and_identify("127.0.0.1", [talker_port, quiet_port])
+        await asyncio.sleep(0.05)
+    finally:
+        for server in (talker, quiet):
+            server.close()
+            await server.wait_closed()
+
+    assert states == {talker_port: PORT_OPEN, quiet_port: PORT_OPEN}
+    assert services[talker_port] == "Unknown (220 fake service ready)"
+    assert services[quiet_port] == "Unknown"
+    assert len(connections) == 2
@@ -0,0 +1,64 @@
+"""Tests for progress notifications and partial results from scan tools."""
+
+import pytest
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from mcp.types import RequestParams
+
+from network_discovery_mcp import server as server_module
+
+
+class RecordingSession:
+    """Stands in for the client session and records what the server sends."""
+
+    def __init__(self):
+        self.progress = []
+        self.logs = []
+
+    async def send_progress_notification(self, token, progress, total=None, message=None, related_request_id=None):
+        self.progress.append((token, progress, total, message))
+
+    async def send_log_message(self, level, data, logger=None, related_request_id=None):
+        self.logs.append((related_request_id, data))
+
+
+@pytest.fixture
+def live_hosts():
+    return {"10.3.0.3": 0.001, "10.3.0.9": 0.001}
+
+
+@pytest.fixture
+def session(scanner, monkeypatch):
+    monkeypatch.setattr(server_module, "scanner", scanner)
+
+    session = RecordingSession()
+    context = RequestContext(
+        request_id=7, meta=RequestParams.Meta(progressToken="scan-1"), session=session, lifespan_context=None
+    )
+    token = request_ctx.set(context)
+    yield session
+    request_ctx.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_scan_network_streams_progress_and_batches(session):
+    result = await server_module._scan_network({"network": "10.3.0.0/28"})
+
+    streamed = [device["ip_address"] for _, data in session.logs for device in data["devices"]]
+    assert sorted(streamed) == ["10.3.0.3", "10.3.0.9"]
+    assert all(request_id == 7 and data["partial"] for request_id, data in session.logs)
+
+    token, probed, total, message = session.progress[-1]
+    assert (token, probed, total) == ("scan-1", 14, 14)
+    assert "2 found" in message
+    assert "Found 2 active devices" in result.content[0].text
+
+
+@pytest.mark.asyncio
+async def test_no_progress_without_token(session):
+    request_ctx.get().meta.progressToken = None
+
+    await server_module._scan_network({"network": "10.3.0.0/28"})
+
+    assert session.progress == []
+    assert session.logs
@@ -0,0 +1,51 @@
+"""Tests for incremental network rescans."""
+
+import pytest
+
+
+@pytest.fixture
+def live_hosts():
+    return {"10.2.0.1": 0.001, "10.2.0.2": 0.001, "10.2.0.3": 0.001}
+
+
+@pytest.fixture
+def network(fake_network):
+    """The fake subnet's hosts, each named after its last octet."""
+    fake_network.hostnames.update({f"10.2.0.{last}": f"host-{last}" for last in range(1, 8)})
+    return fake_network.hosts
+
+
+@pytest.mark.asyncio
+async def test_rescan_reports_diff_and_only_deep_probes_changes(scanner, network, fake_network):
+    await scanner.scan_network_range("10.2.0.0/29")
+    fake_network.resolved.clear()
+
+    del network["10.2.0.3"]
+    network["10.2.0.4"] = 0.001
+    network["10.2.0.2"] = 0.05
+
+    diff = await scanner.rescan_network("10.2.0.0/29")
+
+    assert [d.ip_address for d in diff.added] == ["10.2.0.4"]
+    assert [d.ip_address for d in diff.removed] == ["10.2.0.3"]
+    assert [c.ip_address for c in diff.changed] == ["10.2.0.2"]
+    assert diff.changed[0].fields == {"response_time": (0.001, 0.05)}
+    assert diff.unchanged == 1
+    # The unchanged host got no deep probes.
+    assert sorted(fake_network.resolved) == ["10.2.0.2", "10.2.0.4"]
+    assert scanner.devices["10.2.0.4"].hostname == "host-4"
+    assert not scanner.devices["10.2.0.3"].online
+
+
+@pytest.mark.asyncio
+async def test_returning_host_is_reported_as_added(scanner, network):
+    await scanner.scan_network_range("10.2.0.0/29")
+    rtt = network.pop("10.2.0.3")
+    await scanner.rescan_network("10.2.0.0/29")
+    network["10.2.0.3"] = rtt
+
+    diff = await scanner.rescan_network("10.2.0.0/29")
+
+    assert [d.ip_address for d in diff.added] == ["10.2.0.3"]
+    assert diff.removed == [] and diff.changed == []
+    assert scanner.devices["10.2.0.3"].online
@@ -0,0 +1,161 @@
+"""Tests for the non-blocking reverse DNS resolver against a loopback stub server."""
+
+import asyncio
+import struct
+
+import pytest
+import pytest_asyncio
+
+from network_discovery_mcp.resolver import (
+    CLASS_IN,
+    RCODE_NXDOMAIN,
+    TYPE_PTR,
+    ReverseResolver,
+    decode_name,
+    encode_name,
+)
+
+
+class StubDnsServer(asyncio.DatagramProtocol):
+    """Answer PTR queries from a fixed table after an optional delay."""
+
+    def __init__(self, records: dict[str, str], delay: float = 0.0) -> None:
+        self.records = records
+        self.delay = delay
+        self.queries: list[str] = []
+        self.outstanding = 0
+        self.peak_outstanding = 0
+        self.transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        asyncio.ensure_future(self._answer(data, addr))
+
+    async def _answer(self, data: bytes, addr) -> None:
+        query_id = struct.unpack_from("!H", data)[0]
+        name, end = decode_name(data, 12)
+        question = data[12:end + 4]
+        self.queries.append(name)
+        self.outstanding += 1
+        self.peak_outstanding = max(self.peak_outstanding, self.outstanding)
+        await asyncio.sleep(self.delay)
+        self.outstanding -= 1
+
+        hostname = self.records.get(name)
+        if hostname is None:
+            header = struct.pack("!HHHHHH", query_id, 0x8180 | RCODE_NXDOMAIN, 1, 0, 0, 0)
+            self.transport.sendto(header + question, addr)
+            return
+        rdata = encode_name(hostname)
+        answer = b"\xc0\x0c" + struct.pack("!HHIH", TYPE_PTR, CLASS_IN, 600, len(rdata)) + rdata
+        header = struct.pack("!HHHHHH", query_id, 0x8180, 1, 1, 0, 0)
+        self.transport.sendto(header + question + answer, addr)
+
+
+@pytest_asyncio.fixture
+async def stub_dns():
+    async def start(records, delay=0.0):
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: StubDnsServer(records, delay), local_addr=("127.0.0.1", 0)
+        )
+        servers.append(transport)
+        return protocol, transport.get_extra_info("sockname")[1]
+
+    servers = []
+    yield start
+    for transport in servers:
+        transport.close()
+
+
+@pytest.mark.asyncio
+async def test_positive_and_negative_answers_are_cached(stub_dns):
+    """A hit and an NXDOMAIN are each queried once, then served from cache."""
+    server, port = await stub_dns({"1.0.0.10.in-addr.arpa": "router.lan"})
+    resolver = ReverseResolver(nameservers=["127.0.0.1"], port=port)
+    try:
+        for _ in range(3):
+            assert await resolver.resolve("10.0.0.1") == "router.lan"
+            assert await resolver.resolve("10.0.0.2") is None
+        assert sorted(server.queries) == ["1.0.0.10.in-addr.arpa", "2.0.0.10.in-addr.arpa"]
+    finally:
+        resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_resolve_many_honours_concurrency_limit(stub_dns):
+    """Batched lookups run concurrently but never exceed the configured limit."""
+    records = {f"{i}.0.0.10.in-addr.arpa": f"host{i}.lan" for i in range(1, 41)}
+    server, port = await stub_dns(records, delay=0.02)
+    resolver = ReverseResolver(nameservers=["127.0.0.1"], port=port, concurrency=8)
+    try:
+        results = await resolver.resolve_many(f"10.0.0.{i}" for i in range(1, 41))
+        assert results["10.0.0.17"] == "host17.lan"
+        assert len(server.queries) == 40
+        assert 1 < server.peak_outstanding <= 8
+    finally:
+        resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_expiry_and_eviction(stub_dns):
+    """Negative entries expire after their TTL and the cache is LRU-bounded."""
+    server, port = await stub_dns({})
+    resolver = ReverseResolver(nameservers=["127.0.0.1"], port=port, negative_ttl=0.05, max_entries=2)
+    try:
+        for i in (1, 2, 3):
+            await resolver.resolve(f"10.0.0.{i}")
+        assert resolver.cached("10.0.0.1") == (False, None)
+        assert resolver.cached("10.0.0.3") == (True, None)
+
+        await asyncio.sleep(0.06)
+        assert resolver.cached("10.0.0.3") == (False, None)
+        await resolver.resolve("10.0.0.3")
+        assert server.queries.count("3.0.0.10.in-addr.arpa") == 2
+    finally:
+        resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_unanswered_queries_time_out_without_blocking():
+    """A dead nameserver costs the timeout once, then the miss is cached."""
+    resolver = ReverseResolver(nameservers=["127.0.0.1"], port=9, timeout=0.05, attempts=1)
+    try:
+        assert await resolver.resolve("10.0.0.1") is None
+        assert resolver.cached("10.0.0.1") == (True, None)
+    finally:
+        resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_answers_from_elsewhere_or_for_other_names_are_ignored(stub_dns):
+    """A response with the right query ID is not trusted on the ID alone."""
+    records = {"1.0.0.10.in-addr.arpa": "spoofed.lan", "2.0.0.10.in-addr.arpa": "other.lan"}
+
+    server, port = await stub_dns(records)
+    loop = asyncio.get_running_loop()
+    elsewhere, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, local_addr=("127.0.0.1", 0))
+    # Answers leave from a socket other than the one queried.
+    server.transport = elsewhere
+    resolver = ReverseResolver(nameservers=["127.0.0.1"], port=port, timeout=0.1, attempts=1)
+    try:
+        assert await resolver.resolve("10.0.0.1") is None
+    finally:
+        resolver.close()
+        elsewhere.close()
+
+    server, port = await stub_dns(records)
+    answer = server._answer
+
+    async def answer_another_question(data, addr):
+        await answer(data.replace(encode_name("1.0.0.10.in-addr.arpa"), encode_name("2.0.0.10.in-addr.arpa")), addr)
+
+    server._answer = answer_another_question
+    resolver = ReverseResolver(nameservers=["127.0.0.1"], port=port, timeout=0.1, attempts=1)
+    try:
+        assert await resolver.resolve("10.0.0.1") is None
+        assert server.queries == ["2.0.0.10.in-addr.arpa"]
+    finally:
+        resolver.close()
@@ -0,0 +1,91 @@
+"""Tests for the shared probe scheduler."""
+
+import asyncio
+import time
+
+import pytest
+
+from network_discovery_mcp.scanner import ProbeScheduler, RttEstimate
+
+
+def test_rtt_estimate_follows_rfc6298():
+    """The first sample seeds SRTT/RTTVAR; later samples are smoothed."""
+    estimate = RttEstimate.from_sample(0.1)
+    assert estimate.timeout == pytest.approx(0.3)
+
+    estimate.update(0.2)
+    assert estimate.srtt == pytest.approx(0.1125)
+    assert estimate.rttvar == pytest.approx(0.0625)
+
+
+@pytest.mark.asyncio
+async def test_timeouts_derive_from_host_then_subnet_estimates():
+    """Unknown hosts borrow their subnet's estimate before the initial timeout."""
+    scheduler = ProbeScheduler(initial_timeout=1.0, min_timeout=0.01)
+    assert scheduler.timeout_for("10.0.0.5") == 1.0
+
+    async with scheduler.probe("10.0.0.1") as probe:
+        probe.answered(0.02)
+
+    assert scheduler.timeout_for("10.0.0.1") == pytest.approx(0.06)
+    assert scheduler.timeout_for("10.0.0.5") == pytest.approx(0.06)
+    assert scheduler.timeout_for("10.0.1.5") == 1.0
+
+
+@pytest.mark.asyncio
+async def test_window_shrinks_only_when_responsive_hosts_go_quiet():
+    """Silence from never-seen hosts is not congestion; losses from known hosts are."""
+    scheduler = ProbeScheduler(initial_window=32, min_window=4)
+
+    async with scheduler.probe("10.0.0.9") as probe:
+        probe.timed_out()
+    assert scheduler.window == 32
+
+    async with scheduler.probe("10.0.0.1") as probe:
+        probe.answered(0.01)
+    assert scheduler.window == 33
+
+    async with scheduler.probe("10.0.0.1") as probe:
+        probe.timed_out()
+    assert scheduler.window == 16.5
+
+
+@pytest.mark.asyncio
+async def test_window_bounds_in_flight_probes():
+    """No more probes than the congestion window are ever in flight."""
+    scheduler = ProbeScheduler(initial_window=4, min_window=4, max_window=4)
+    peak = 0
+
+    async def one(i: int) -> None:
+        nonlocal peak
+        async with scheduler.probe(f"10.0.0.{i}"):
+            peak = max(peak, scheduler.stats()["in_flight"])
+            await asyncio.sleep(0.001)
+
+    await asyncio.gather(*(one(i) for i in range(20)))
+    assert peak == 4
+    assert scheduler.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate_and_reports_it():
+    """Once the burst is spent, probes are paced at the configured rate."""
+    scheduler = ProbeScheduler(rate=200, burst=1)
+    start = time.monotonic()
+    await scheduler.pace(21)
+    assert time.monotonic() - start >= 0.09
+
+    stats = scheduler.stats()
+    assert stats["probes_sent"] == 21
+    assert 0 < stats["effective_rate"] <= 21
+
+
+@pytest.mark.asyncio
+async def test_rate_window_is_trimmed_as_probes_are_paced():
+    """Send times older than a second are dropped without waiting for stats()."""
+    scheduler = ProbeScheduler(rate=1000, burst=10)
+    scheduler._recent.extend([time.monotonic() - 5] * 1000)
+
+    await scheduler.pace(3)
+
+    assert len(scheduler._recent) == 3
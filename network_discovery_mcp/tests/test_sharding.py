@@ -0,0 +1,86 @@
+"""Tests for multi-process sharded sweeps."""
+
+import ipaddress
+
+import pytest
+
+from network_discovery_mcp import sharding
+from network_discovery_mcp.scanner import NetworkDevice, NetworkScanner, SweepProgress
+from network_discovery_mcp.sharding import _chunk_hosts, decode_batch, encode_batch, split_networks
+
+
+def test_batch_round_trip():
+    devices = [
+        NetworkDevice(
+            ip_address="10.0.0.1",
+            mac_address="aa:bb:cc:00:00:01",
+            hostname="nas.local",
+            vendor="Synology Incorporated",
+            open_ports=[22, 443],
+            services={22: "SSH (OpenSSH 9.6)", 443: "HTTPS"},
+            last_seen=1700000000.5,
+            response_time=0.00125,
+        ),
+        NetworkDevice(ip_address="10.0.0.2", last_seen=1700000001.0),
+    ]
+    devices[0].mark_refreshed("hostname", "ports", "services")
+
+    probed, decoded = decode_batch(encode_batch(40, devices))
+
+    assert probed == 40
+    first, second = decoded
+    assert (first.ip_address, first.mac_address, first.hostname, first.vendor) == (
+        "10.0.0.1", "aa:bb:cc:00:00:01", "nas.local", "Synology Incorporated"
+    )
+    assert first.open_ports == [22, 443]
+    assert first.services == {22: "SSH (OpenSSH 9.6)", 443: "HTTPS"}
+    assert first.response_time == pytest.approx(0.00125)
+    assert set(first.refreshed) == {"liveness", "hostname", "ports", "services"}
+    assert (second.mac_address, second.hostname, second.response_time) == (None, None, None)
+    assert set(second.refreshed) == {"liveness"}
+    # Far smaller than the JSON the same devices would take.
+    assert len(encode_batch(0, devices[1:])) == 37
+
+
+def test_chunks_cover_exactly_the_sweep():
+    chunks = list(split_networks(["10.1.0.0/22", "10.1.2.0/24", "bogus", "2001:db8::/64", "10.2.0.7/32"], 8))
+
+    assert [chunk for chunk, _ in chunks] == [
+        "10.1.0.0/24", "10.1.1.0/24", "10.1.2.0/24", "10.1.3.0/24", "10.2.0.7/32"
+    ]
+    swept = [
+        address
+        for chunk, network in chunks
+        for address in _chunk_hosts(ipaddress.IPv4Network(chunk), ipaddress.IPv4Network(network))
+    ]
+    expected = [*ipaddress.ip_network("10.1.0.0/22").hosts(), ipaddress.IPv4Address("10.2.0.7")]
+    assert swept == expected
+
+
+def test_adjacent_networks_keep_their_own_ends():
+    chunks = list(split_networks(["10.3.0.0/24", "10.3.1.0/24"], 1))
+
+    assert chunks == [("10.3.0.0/24", "10.3.0.0/24"), ("10.3.1.0/24", "10.3.1.0/24")]
+    swept = {
+        str(address)
+        for chunk, network in chunks
+        for address in _chunk_hosts(ipaddress.IPv4Network(chunk), ipaddress.IPv4Network(network))
+    }
+    assert len(swept) == 508
+    assert not swept & {"10.3.0.255", "10.3.1.0"}
+
+
+@pytest.mark.asyncio
+async def test_sharded_sweep_over_loopback(monkeypatch):
+    monkeypatch.setattr(sharding, "MIN_CHUNK", 4)
+    scanner = NetworkScanner()
+    progress = SweepProgress()
+    progress.add_network("127.9.0.0/28")
+
+    batches = [batch async for batch in scanner.iter_sharded_batches(["127.9.0.0/28"], 2, progress=progress)]
+
+    found = sorted(device.ip_address for batch in batches for device in batch)
+    assert found == sorted(str(host) for host in ipaddress.ip_network("127.9.0.0/28").hosts())
+    assert (progress.probed, progress.found) == (14, 14)
+    assert sorted(scanner.devices) == found
+    scanner.close()
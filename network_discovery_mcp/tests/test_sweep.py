@@ -0,0 +1,37 @@
+"""Tests for the streaming network range sweep."""
+
+import asyncio
+
+import pytest
+
+from network_discovery_mcp import scanner as scanner_module
+
+
+@pytest.fixture
+def live_hosts():
+    return {f"10.{second}.{third}.1": 0.001 for second in (1, 2) for third in range(16)}
+
+
+@pytest.mark.asyncio
+async def test_sweep_covers_ranges_larger_than_a_slash_24(scanner, fake_network):
+    """A /20 is swept in full with a bounded number of in-flight probes."""
+    devices = await scanner.scan_network_range("10.1.0.0/20")
+
+    assert len(fake_network.probed) == 4094
+    assert fake_network.peak <= scanner_module.SWEEP_CONCURRENCY
+    assert sorted(d.ip_address for d in devices) == sorted(f"10.1.{i}.1" for i in range(16))
+    assert len(scanner.devices) == 16
+
+
+@pytest.mark.asyncio
+async def test_sweep_iterator_stops_probing_when_closed(scanner, fake_network):
+    """Breaking out of the iterator tears the worker pool down."""
+    sweep = scanner.iter_network_range("10.2.0.0/16", concurrency=8)
+    async for _device in sweep:
+        break
+    await sweep.aclose()
+
+    probed = len(fake_network.probed)
+    await asyncio.sleep(0.01)
+    assert len(fake_network.probed) == probed < 65534
+    assert fake_network.in_flight == []